@@ -4,692 +4,998 @@ Handles natural language processing, response generation, and dynamic dialogue
 """
 
 import re
+import sys
 import random
 import json
-from typing import Dict, List, Optional, Tuple, Any
-from collections import defaultdict
-from difflib import SequenceMatcher
-from datetime import datetime
+import string
+import time
+from bisect import bisect_right
+from functools import lru_cache
+from itertools import islice
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, Optional, Tuple, Any
+from collections import Counter, OrderedDict, defaultdict, deque, namedtuple
 
-from .utils import TextFormatter, Colors
+from .utils import TextFormatter, Colors, BloomFilter
 
-class AIEngine:
+def freeze_table(value: Any) -> Any:
     """
-    Main AI engine that processes player input and generates intelligent responses
-    Uses pattern matching, context awareness, and dynamic response generation
+    Make a static table read-only: dicts become mapping proxies, lists become
+    tuples and strings are interned
     """
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze_table(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze_table(item) for item in value)
+    if isinstance(value, str):
+        return sys.intern(value)
+    return value
+
+# Intent patterns by category, with priority weighting.
+# Alternations are atomic groups (?>...) so matching never backtracks into them.
+INTENT_PATTERNS = freeze_table({
+    # Greetings
+    'greeting': {
+        'patterns': [
+            r'hello', r'hi', r'hey', r'greetings', r'howdy',
+            r'good (?>morning|afternoon|evening)', r'what\'s up'
+        ],
+        'priority': 1
+    },
     
-    def __init__(self, player: Dict, game_flags: Dict):
-        self.player = player
-        self.game_flags = game_flags
-        
-        # Conversation memory
-        self.memory = {
-            'recent_topics': [],
-            'known_facts': set(),
-            'player_reputation': defaultdict(int),
-            'npc_relationships': defaultdict(lambda: {'favor': 0, 'times_talked': 0}),
-            'last_interaction': {},
-            'emotional_state': 'neutral'
-        }
-        
-        # Response patterns by category
-        self.setup_patterns()
-        
-        # Knowledge base
-        self.setup_knowledge_base()
-        
-        # Dynamic response templates
-        self.setup_response_templates()
-        
-        # Personality profiles
-        self.setup_personalities()
-        
-        # Quest-related dialogue
-        self.setup_quest_dialogue()
-        
-        # Emotion responses
-        self.setup_emotions()
-        
-    def setup_patterns(self):
-        """Setup advanced pattern matching for command interpretation"""
-        
-        self.patterns = {
-            # Greetings
-            'greeting': {
-                'patterns': [
-                    r'hello', r'hi', r'hey', r'greetings', r'howdy',
-                    r'good (morning|afternoon|evening)', r'what\'s up'
-                ],
-                'priority': 1
-            },
-            
-            # Farewells
-            'farewell': {
-                'patterns': [
-                    r'bye', r'goodbye', r'farewell', r'see you',
-                    r'take care', r'until next time'
-                ],
-                'priority': 1
-            },
-            
-            # Questions about self
-            'about_self': {
-                'patterns': [
-                    r'who are you', r'what are you', r'tell me about yourself',
-                    r'your name', r'what do you do'
-                ],
-                'priority': 2
-            },
-            
-            # Questions about player
-            'about_player': {
-                'patterns': [
-                    r'who am i', r'what am i', r'my purpose',
-                    r'why am i here', r'what should i do'
-                ],
-                'priority': 2
-            },
-            
-            # Help requests
-            'help_request': {
-                'patterns': [
-                    r'help me', r'i need help', r'can you help',
-                    r' assist ', r'guidance', r'advice'
-                ],
-                'priority': 2
-            },
-            
-            # Quest-related
-            'quest_related': {
-                'patterns': [
-                    r'quest', r'mission', r'task', r'job',
-                    r'favor', r' errand', r'chore'
-                ],
-                'priority': 3
-            },
-            
-            # Location inquiries
-            'location_questions': {
-                'patterns': [
-                    r'where am i', r'what is this place', r'where are we',
-                    r'describe (the|this) (area|place|location)',
-                    r'what\'s around here'
-                ],
-                'priority': 2
-            },
-            
-            # Time inquiries
-            'time_questions': {
-                'patterns': [
-                    r'what time', r'what day', r'how long',
-                    r'when is', r'what hour'
-                ],
-                'priority': 2
-            },
-            
-            # Combat-related
-            'combat_related': {
-                'patterns': [
-                    r'fight', r'battle', r'combat', r'enemy',
-                    r'monster', r'danger', r'threat'
-                ],
-                'priority': 3
-            },
-            
-            # Item-related
-            'item_related': {
-                'patterns': [
-                    r'item', r'object', r'thing', r'loot',
-                    r'treasure', r'equipment', r'weapon', r'armor'
-                ],
-                'priority': 2
-            },
-            
-            # NPC-related
-            'npc_related': {
-                'patterns': [
-                    r'npc', r'person', r'people', r'character',
-                    r'villager', r'guard', r'merchant'
-                ],
-                'priority': 2
-            },
-            
-            # Emotional expressions
-            'emotion': {
-                'patterns': [
-                    r'happy', r'sad', r'angry', r'scared',
-                    r'excited', r'tired', r'confused', r'grateful'
-                ],
-                'priority': 1
-            },
-            
-            # Opinion requests
-            'ask_opinion': {
-                'patterns': [
-                    r'what do you think', r'your opinion', r'do you think',
-                    r'how do you feel', r'what\'s your take'
-                ],
-                'priority': 2
-            },
-            
-            # Story/lore
-            'ask_story': {
-                'patterns': [
-                    r'tell me a story', r'history', r'lore',
-                    r'legend', r'tale', r'myth', r'rumor'
-                ],
-                'priority': 3
-            },
-            
-            # Trading
-            'trading': {
-                'patterns': [
-                    r'trade', r'buy', r'sell', r'price',
-                    r'cost', r'how much', r'merchant'
-                ],
-                'priority': 3
-            },
-            
-            # Jokes/humor
-            'joke': {
-                'patterns': [
-                    r'joke', r'funny', r'make me laugh',
-                    r'humor', r'comedy'
+    # Farewells
+    'farewell': {
+        'patterns': [
+            r'bye', r'goodbye', r'farewell', r'see you',
+            r'take care', r'until next time'
+        ],
+        'priority': 1
+    },
+    
+    # Questions about self
+    'about_self': {
+        'patterns': [
+            r'who are you', r'what are you', r'tell me about yourself',
+            r'your name', r'what do you do'
+        ],
+        'priority': 2
+    },
+    
+    # Questions about player
+    'about_player': {
+        'patterns': [
+            r'who am i', r'what am i', r'my purpose',
+            r'why am i here', r'what should i do'
+        ],
+        'priority': 2
+    },
+    
+    # Help requests
+    'help_request': {
+        'patterns': [
+            r'help me', r'i need help', r'can you help',
+            r' assist ', r'guidance', r'advice'
+        ],
+        'priority': 2
+    },
+    
+    # Quest-related
+    'quest_related': {
+        'patterns': [
+            r'quest', r'mission', r'task', r'job',
+            r'favor', r' errand', r'chore'
+        ],
+        'priority': 3
+    },
+    
+    # Location inquiries
+    'location_questions': {
+        'patterns': [
+            r'where am i', r'what is this place', r'where are we',
+            r'describe (?>the|this) (?>area|place|location)',
+            r'what\'s around here'
+        ],
+        'priority': 2
+    },
+    
+    # Time inquiries
+    'time_questions': {
+        'patterns': [
+            r'what time', r'what day', r'how long',
+            r'when is', r'what hour'
+        ],
+        'priority': 2
+    },
+    
+    # Combat-related
+    'combat_related': {
+        'patterns': [
+            r'fight', r'battle', r'combat', r'enemy',
+            r'monster', r'danger', r'threat'
+        ],
+        'priority': 3
+    },
+    
+    # Item-related
+    'item_related': {
+        'patterns': [
+            r'item', r'object', r'thing', r'loot',
+            r'treasure', r'equipment', r'weapon', r'armor'
+        ],
+        'priority': 2
+    },
+    
+    # NPC-related
+    'npc_related': {
+        'patterns': [
+            r'npc', r'person', r'people', r'character',
+            r'villager', r'guard', r'merchant'
+        ],
+        'priority': 2
+    },
+    
+    # Emotional expressions
+    'emotion': {
+        'patterns': [
+            r'happy', r'sad', r'angry', r'scared',
+            r'excited', r'tired', r'confused', r'grateful'
+        ],
+        'priority': 1
+    },
+    
+    # Opinion requests
+    'ask_opinion': {
+        'patterns': [
+            r'what do you think', r'your opinion', r'do you think',
+            r'how do you feel', r'what\'s your take'
+        ],
+        'priority': 2
+    },
+    
+    # Story/lore
+    'ask_story': {
+        'patterns': [
+            r'tell me a story', r'history', r'lore',
+            r'legend', r'tale', r'myth', r'rumor'
+        ],
+        'priority': 3
+    },
+    
+    # Trading
+    'trading': {
+        'patterns': [
+            r'trade', r'buy', r'sell', r'price',
+            r'cost', r'how much', r'merchant'
+        ],
+        'priority': 3
+    },
+    
+    # Jokes/humor
+    'joke': {
+        'patterns': [
+            r'joke', r'funny', r'make me laugh',
+            r'humor', r'comedy'
+        ],
+        'priority': 2
+    },
+    
+    # Compliments
+    'compliment': {
+        'patterns': [
+            r'nice', r'great', r'amazing', r'wonderful',
+            r'you\'re (?>good|kind|helpful)', r'i like you'
+        ],
+        'priority': 2
+    },
+    
+    # Insults
+    'insult': {
+        'patterns': [
+            r'stupid', r'dumb', r'idiot', r'fool',
+            r'you\'re (?>bad|terrible|awful)', r'i hate you'
+        ],
+        'priority': 2
+    }
+})
+
+@lru_cache(maxsize=None)
+def load_knowledge_base() -> Mapping:
+    """Game world knowledge for AI responses"""
+    return freeze_table({
+        'world_facts': {
+            'age': 'ancient',
+            'magic_level': 'high',
+            'main_threat': 'darkness spreading from the east',
+            'recent_events': [
+                'The old king passed away',
+                'Strange creatures have been seen in the forest',
+                'Trade routes have become dangerous',
+                'A mysterious comet appeared in the sky'
+            ]
+        },
+        
+        'locations': {
+            'town_square': {
+                'facts': [
+                    'Built over 500 years ago',
+                    'Center of local trade and politics',
+                    'Fountain said to grant wishes'
                 ],
-                'priority': 2
+                'rumors': [
+                    'Secret tunnels run beneath the square',
+                    'The fountain water has healing properties',
+                    'Merchants gather here from distant lands'
+                ]
             },
-            
-            # Compliments
-            'compliment': {
-                'patterns': [
-                    r'nice', r'great', r'amazing', r'wonderful',
-                    r'you\'re (good|kind|helpful)', r'i like you'
+            'tavern': {
+                'facts': [
+                    'Run by the cheerful innkeeper Greta',
+                    'Famous for its honeyed mead',
+                    'Gathering place for adventurers'
                 ],
-                'priority': 2
+                'rumors': [
+                    'Secret meetings happen in the back room',
+                    'A treasure map is hidden under the bar',
+                    'Ghost of a former patron haunts the cellar'
+                ]
             },
-            
-            # Insults
-            'insult': {
-                'patterns': [
-                    r'stupid', r'dumb', r'idiot', r'fool',
-                    r'you\'re (bad|terrible|awful)', r'i hate you'
+            'forest': {
+                'facts': [
+                    'Ancient woodland older than the town',
+                    'Home to many mystical creatures',
+                    'Contains ruins of old civilization'
                 ],
-                'priority': 2
-            }
-        }
-        
-        # Compile regex patterns
-        for category, data in self.patterns.items():
-            compiled = []
-            for pattern in data['patterns']:
-                try:
-                    compiled.append(re.compile(pattern, re.IGNORECASE))
-                except re.error:
-                    continue
-            self.patterns[category]['compiled'] = compiled
-    
-    def setup_knowledge_base(self):
-        """Setup game world knowledge for AI responses"""
-        
-        self.knowledge_base = {
-            'world_facts': {
-                'age': 'ancient',
-                'magic_level': 'high',
-                'main_threat': 'darkness spreading from the east',
-                'recent_events': [
-                    'The old king passed away',
-                    'Strange creatures have been seen in the forest',
-                    'Trade routes have become dangerous',
-                    'A mysterious comet appeared in the sky'
+                'rumors': [
+                    'A druid circle meets at the full moon',
+                    'Talking animals live deep within',
+                    'Portal to the feywild hidden somewhere'
                 ]
-            },
-            
-            'locations': {
-                'town_square': {
-                    'facts': [
-                        'Built over 500 years ago',
-                        'Center of local trade and politics',
-                        'Fountain said to grant wishes'
-                    ],
-                    'rumors': [
-                        'Secret tunnels run beneath the square',
-                        'The fountain water has healing properties',
-                        'Merchants gather here from distant lands'
-                    ]
-                },
-                'tavern': {
-                    'facts': [
-                        'Run by the cheerful innkeeper Greta',
-                        'Famous for its honeyed mead',
-                        'Gathering place for adventurers'
-                    ],
-                    'rumors': [
-                        'Secret meetings happen in the back room',
-                        'A treasure map is hidden under the bar',
-                        'Ghost of a former patron haunts the cellar'
-                    ]
-                },
-                'forest': {
-                    'facts': [
-                        'Ancient woodland older than the town',
-                        'Home to many mystical creatures',
-                        'Contains ruins of old civilization'
-                    ],
-                    'rumors': [
-                        'A druid circle meets at the full moon',
-                        'Talking animals live deep within',
-                        'Portal to the feywild hidden somewhere'
-                    ]
-                }
-            },
-            
-            'npcs': {
-                'generic_knowledge': {
-                    'traits': [
-                        'People here are generally friendly',
-                        'Most fear the increasing monster attacks',
-                        'They respect brave adventurers'
-                    ]
-                }
-            },
-            
-            'quest_knowledge': {
-                'common_needs': [
-                    'protection from monsters',
-                    'rare ingredients',
-                    'lost family heirlooms',
-                    'information from distant lands',
-                    'help with local disputes'
+            }
+        },
+        
+        'npcs': {
+            'generic_knowledge': {
+                'traits': [
+                    'People here are generally friendly',
+                    'Most fear the increasing monster attacks',
+                    'They respect brave adventurers'
                 ]
             }
+        },
+        
+        'quest_knowledge': {
+            'common_needs': [
+                'protection from monsters',
+                'rare ingredients',
+                'lost family heirlooms',
+                'information from distant lands',
+                'help with local disputes'
+            ]
         }
-    
-    def setup_response_templates(self):
-        """Setup dynamic response templates for various situations"""
+    })
+
+@lru_cache(maxsize=None)
+def load_response_templates() -> Mapping:
+    """Dynamic response templates for various situations"""
+    return freeze_table({
+        'greeting': [
+            "Hello there, {player_name}! How can I help you today?",
+            "Greetings, traveler! What brings you to {location}?",
+            "Well met, {player_name}! It's good to see a friendly face.",
+            "Ah, a visitor! Welcome to {location}.",
+            "Hey there! Looking for something specific?"
+        ],
+        
+        'farewell': [
+            "Safe travels, {player_name}! May your path be clear.",
+            "Farewell! Come back anytime.",
+            "Take care out there. It's dangerous these days.",
+            "Until we meet again, adventurer!",
+            "Goodbye! Remember to visit the tavern for a drink!"
+        ],
+        
+        'about_self': [
+            "I'm just a simple {npc_profession} in {location}. Nothing special about me.",
+            "Me? I've lived here my whole life. Seen many adventurers come and go.",
+            "I'm {npc_name}, the {npc_profession}. If you need {profession_service}, I'm your {npc_race}.",
+            "Just another face in the crowd. But I know these parts well."
+        ],
+        
+        'about_player': [
+            "You're {player_name}, the {player_class}. I've heard tales of your kind.",
+            "An adventurer seeking glory and gold, I presume?",
+            "You look like someone who's seen their share of danger.",
+            "A {player_class}? We don't get many of those around here."
+        ],
+        
+        'help_request': {
+            'friendly': [
+                "I'd be happy to help! What do you need?",
+                "Of course! What seems to be the trouble?",
+                "I'll do what I can. What's the matter?"
+            ],
+            'neutral': [
+                "I might be able to assist. What is it?",
+                "Depends on what you need. Tell me more.",
+                "I'm listening. What's your problem?"
+            ],
+            'grumpy': [
+                "What now? Make it quick.",
+                "I'm busy, but fine. What is it?",
+                "You adventurers are always needing something."
+            ]
+        },
+        
+        'quest_related': {
+            'has_quest': [
+                "Actually, I do have a task for someone brave enough...",
+                "Now that you mention it, there IS something you could help with.",
+                "Funny you should ask. I need {quest_item} from {quest_location}.",
+                "Yes! I've been looking for someone to {quest_task}."
+            ],
+            'no_quest': [
+                "Sorry, no tasks at the moment. Check back later.",
+                "Nothing right now, but things change fast around here.",
+                "I wish I had work for you, but all is quiet for now."
+            ],
+            'progress': [
+                "How goes the {quest_name}? Any luck?",
+                "Have you made progress on that task I gave you?",
+                "Find that {quest_item} yet? I'm counting on you!"
+            ]
+        },
         
-        self.response_templates = {
-            'greeting': [
-                "Hello there, {player_name}! How can I help you today?",
-                "Greetings, traveler! What brings you to {location}?",
-                "Well met, {player_name}! It's good to see a friendly face.",
-                "Ah, a visitor! Welcome to {location}.",
-                "Hey there! Looking for something specific?"
+        'location_info': {
+            'town': [
+                "This town has stood for generations. Safe place, mostly.",
+                "The heart of our community. You'll find everything you need here.",
+                "We take care of our own here. Outsiders are welcome if they're friendly."
             ],
-            
-            'farewell': [
-                "Safe travels, {player_name}! May your path be clear.",
-                "Farewell! Come back anytime.",
-                "Take care out there. It's dangerous these days.",
-                "Until we meet again, adventurer!",
-                "Goodbye! Remember to visit the tavern for a drink!"
+            'wilderness': [
+                "Dangerous lands, these. Many have ventured in and never returned.",
+                "The wild places hold both beauty and terror. Stay alert.",
+                "Nature here is untamed. Respect it, or it'll swallow you whole."
             ],
-            
-            'about_self': [
-                "I'm just a simple {npc_profession} in {location}. Nothing special about me.",
-                "Me? I've lived here my whole life. Seen many adventurers come and go.",
-                "I'm {npc_name}, the {npc_profession}. If you need {profession_service}, I'm your {npc_race}.",
-                "Just another face in the crowd. But I know these parts well."
+            'dungeon': [
+                "Dark places hold dark things. Are you sure you want to go in?",
+                "Legends say great treasure lies within. Also great danger.",
+                "I wouldn't go in there without proper preparation."
+            ]
+        },
+        
+        'combat_advice': [
+            "Watch their movements. Every enemy has a pattern.",
+            "Aim for weak points! Even monsters have them.",
+            "Sometimes running away is the smart choice.",
+            "Use the environment to your advantage.",
+            "Don't forget to use items in battle!"
+        ],
+        
+        'item_advice': [
+            "That {item_name} could be useful for {item_purpose}.",
+            "Be careful with that! It's more valuable than it looks.",
+            "Where did you find that? I haven't seen one in years.",
+            "That belongs in a museum! Or maybe your pocket..."
+        ],
+        
+        'rumor': [
+            "I heard that {rumor_content}. Can't say if it's true or not.",
+            "There's talk that {rumor_content}. Make of that what you will.",
+            "The strangest thing... {rumor_content}. Weird, right?",
+            "Word around town is {rumor_content}. Interesting times."
+        ],
+        
+        'joke': [
+            "Why don't adventurers play cards in the forest? Too many cheetahs!",
+            "What's a goblin's favorite drink? Goblin-ade!",
+            "Why did the dragon hoard so much gold? It had a burning desire!",
+            "How do you organize a space party? You planet!",
+            "What do you call a dwarf who just escaped prison? A fugitive!"
+        ],
+        
+        'compliment_response': {
+            'friendly': [
+                "You're too kind! Just doing my job.",
+                "Aw shucks, you're making me blush!",
+                "Well thank you! You're not so bad yourself."
             ],
-            
-            'about_player': [
-                "You're {player_name}, the {player_class}. I've heard tales of your kind.",
-                "An adventurer seeking glory and gold, I presume?",
-                "You look like someone who's seen their share of danger.",
-                "A {player_class}? We don't get many of those around here."
+            'neutral': [
+                "Thanks, I suppose.",
+                "Appreciate that.",
+                "Good to know."
             ],
-            
-            'help_request': {
-                'friendly': [
-                    "I'd be happy to help! What do you need?",
-                    "Of course! What seems to be the trouble?",
-                    "I'll do what I can. What's the matter?"
-                ],
-                'neutral': [
-                    "I might be able to assist. What is it?",
-                    "Depends on what you need. Tell me more.",
-                    "I'm listening. What's your problem?"
-                ],
-                'grumpy': [
-                    "What now? Make it quick.",
-                    "I'm busy, but fine. What is it?",
-                    "You adventurers are always needing something."
-                ]
-            },
-            
-            'quest_related': {
-                'has_quest': [
-                    "Actually, I do have a task for someone brave enough...",
-                    "Now that you mention it, there IS something you could help with.",
-                    "Funny you should ask. I need {quest_item} from {quest_location}.",
-                    "Yes! I've been looking for someone to {quest_task}."
-                ],
-                'no_quest': [
-                    "Sorry, no tasks at the moment. Check back later.",
-                    "Nothing right now, but things change fast around here.",
-                    "I wish I had work for you, but all is quiet for now."
-                ],
-                'progress': [
-                    "How goes the {quest_name}? Any luck?",
-                    "Have you made progress on that task I gave you?",
-                    "Find that {quest_item} yet? I'm counting on you!"
-                ]
-            },
-            
-            'location_info': {
-                'town': [
-                    "This town has stood for generations. Safe place, mostly.",
-                    "The heart of our community. You'll find everything you need here.",
-                    "We take care of our own here. Outsiders are welcome if they're friendly."
-                ],
-                'wilderness': [
-                    "Dangerous lands, these. Many have ventured in and never returned.",
-                    "The wild places hold both beauty and terror. Stay alert.",
-                    "Nature here is untamed. Respect it, or it'll swallow you whole."
-                ],
-                'dungeon': [
-                    "Dark places hold dark things. Are you sure you want to go in?",
-                    "Legends say great treasure lies within. Also great danger.",
-                    "I wouldn't go in there without proper preparation."
-                ]
-            },
-            
-            'combat_advice': [
-                "Watch their movements. Every enemy has a pattern.",
-                "Aim for weak points! Even monsters have them.",
-                "Sometimes running away is the smart choice.",
-                "Use the environment to your advantage.",
-                "Don't forget to use items in battle!"
+            'grumpy': [
+                "Flattery won't get you better prices.",
+                "Save your compliments for someone who cares.",
+                "Yeah, yeah. Everyone says that."
+            ]
+        },
+        
+        'insult_response': {
+            'friendly': [
+                "Ouch! That hurts. What did I do to deserve that?",
+                "That's not very nice. I was trying to help.",
+                "I'm sorry you feel that way. Maybe you're just having a bad day?"
             ],
-            
-            'item_advice': [
-                "That {item_name} could be useful for {item_purpose}.",
-                "Be careful with that! It's more valuable than it looks.",
-                "Where did you find that? I haven't seen one in years.",
-                "That belongs in a museum! Or maybe your pocket..."
+            'neutral': [
+                "No need for insults. I'm just trying to help.",
+                "Rude. But I'll ignore that.",
+                "If you're going to be mean, I won't help you."
             ],
-            
-            'rumor': [
-                "I heard that {rumor_content}. Can't say if it's true or not.",
-                "There's talk that {rumor_content}. Make of that what you will.",
-                "The strangest thing... {rumor_content}. Weird, right?",
-                "Word around town is {rumor_content}. Interesting times."
+            'grumpy': [
+                "Get lost then! See how far you get without help.",
+                "Right back at you, friend. Some 'adventurer' you are.",
+                "Oh, you're one of THOSE types. Guards! We have a troublemaker!"
+            ]
+        },
+        
+        'unknown': [
+            "I'm not sure I understand. Could you rephrase that?",
+            "Hmm, I don't know about that. Anything else?",
+            "That's beyond my knowledge. Try asking someone else.",
+            "Interesting question. I'll have to think about that one.",
+            "Not something I can help with, sorry."
+        ]
+    })
+
+@lru_cache(maxsize=None)
+def load_personalities() -> Mapping:
+    """NPC personality profiles"""
+    return freeze_table({
+        'friendly': {
+            'greeting_boost': 2,
+            'help_chance': 0.9,
+            'patience': 10,
+            'topics': ['weather', 'family', 'food', 'celebration'],
+            'speech_pattern': 'warm and welcoming',
+            'response_modifiers': {
+                'formality': 0.3,
+                'enthusiasm': 0.9,
+                'detail': 0.7
+            }
+        },
+        
+        'grumpy': {
+            'greeting_boost': -1,
+            'help_chance': 0.3,
+            'patience': 3,
+            'topics': ['complaints', 'work', 'money', 'trouble'],
+            'speech_pattern': 'curt and dismissive',
+            'response_modifiers': {
+                'formality': 0.5,
+                'enthusiasm': 0.2,
+                'detail': 0.4
+            }
+        },
+        
+        'mysterious': {
+            'greeting_boost': 0,
+            'help_chance': 0.6,
+            'patience': 7,
+            'topics': ['secrets', 'magic', 'dreams', 'fate'],
+            'speech_pattern': 'enigmatic and vague',
+            'response_modifiers': {
+                'formality': 0.8,
+                'enthusiasm': 0.4,
+                'detail': 0.3
+            }
+        },
+        
+        'wise': {
+            'greeting_boost': 1,
+            'help_chance': 0.8,
+            'patience': 12,
+            'topics': ['history', 'advice', 'philosophy', 'nature'],
+            'speech_pattern': 'thoughtful and measured',
+            'response_modifiers': {
+                'formality': 0.9,
+                'enthusiasm': 0.5,
+                'detail': 0.9
+            }
+        },
+        
+        'eager': {
+            'greeting_boost': 3,
+            'help_chance': 0.95,
+            'patience': 8,
+            'topics': ['adventure', 'stories', 'dreams', 'travel'],
+            'speech_pattern': 'excited and enthusiastic',
+            'response_modifiers': {
+                'formality': 0.2,
+                'enthusiasm': 1.0,
+                'detail': 0.8
+            }
+        },
+        
+        'merchant': {
+            'greeting_boost': 2,
+            'help_chance': 0.7,
+            'patience': 6,
+            'topics': ['prices', 'goods', 'trade', 'economy'],
+            'speech_pattern': 'business-like and persuasive',
+            'response_modifiers': {
+                'formality': 0.7,
+                'enthusiasm': 0.6,
+                'detail': 0.8
+            }
+        }
+    })
+
+# How strongly a personality colors its speech, each from 0 to 1
+PersonalityModifiers = namedtuple('PersonalityModifiers', 'enthusiasm formality detail')
+
+@lru_cache(maxsize=None)
+def load_personality_modifiers() -> Mapping:
+    """Response modifiers of each personality, flattened for quick attribute access"""
+    return MappingProxyType({
+        name: PersonalityModifiers(
+            enthusiasm=profile['response_modifiers']['enthusiasm'],
+            formality=profile['response_modifiers']['formality'],
+            detail=profile['response_modifiers']['detail']
+        )
+        for name, profile in load_personalities().items()
+    })
+
+@lru_cache(maxsize=None)
+def load_quest_dialogue() -> Mapping:
+    """Quest-specific dialogue templates"""
+    return freeze_table({
+        'offer': {
+            'simple': [
+                "I need {quest_item} from {quest_location}. Bring it to me and I'll pay {reward} gold.",
+                "Could you {quest_task}? I'd be very grateful.",
+                "There's a {monster_type} causing trouble near {quest_location}. Can you deal with it?"
             ],
-            
-            'joke': [
-                "Why don't adventurers play cards in the forest? Too many cheetahs!",
-                "What's a goblin's favorite drink? Goblin-ade!",
-                "Why did the dragon hoard so much gold? It had a burning desire!",
-                "How do you organize a space party? You planet!",
-                "What do you call a dwarf who just escaped prison? A fugitive!"
+            'story': [
+                "Long ago, {backstory_stub}. Now, I need someone to {quest_task}.",
+                "The {ancient_artifact} has been lost for generations. Find it and claim your reward!",
+                "My {family_member} disappeared in {quest_location}. Please find them!"
             ],
-            
-            'compliment_response': {
-                'friendly': [
-                    "You're too kind! Just doing my job.",
-                    "Aw shucks, you're making me blush!",
-                    "Well thank you! You're not so bad yourself."
-                ],
-                'neutral': [
-                    "Thanks, I suppose.",
-                    "Appreciate that.",
-                    "Good to know."
-                ],
-                'grumpy': [
-                    "Flattery won't get you better prices.",
-                    "Save your compliments for someone who cares.",
-                    "Yeah, yeah. Everyone says that."
-                ]
-            },
-            
-            'insult_response': {
-                'friendly': [
-                    "Ouch! That hurts. What did I do to deserve that?",
-                    "That's not very nice. I was trying to help.",
-                    "I'm sorry you feel that way. Maybe you're just having a bad day?"
-                ],
-                'neutral': [
-                    "No need for insults. I'm just trying to help.",
-                    "Rude. But I'll ignore that.",
-                    "If you're going to be mean, I won't help you."
-                ],
-                'grumpy': [
-                    "Get lost then! See how far you get without help.",
-                    "Right back at you, friend. Some 'adventurer' you are.",
-                    "Oh, you're one of THOSE types. Guards! We have a troublemaker!"
-                ]
-            },
-            
-            'unknown': [
-                "I'm not sure I understand. Could you rephrase that?",
-                "Hmm, I don't know about that. Anything else?",
-                "That's beyond my knowledge. Try asking someone else.",
-                "Interesting question. I'll have to think about that one.",
-                "Not something I can help with, sorry."
+            'urgent': [
+                "Quickly! {urgent_situation}! You're the only one who can help!",
+                "No time to explain! {quest_task} before it's too late!",
+                "This is a matter of life and death! {quest_objective}!"
+            ]
+        },
+        
+        'progress': {
+            'checking': [
+                "Made any progress on {quest_name}?",
+                "How goes the search for {quest_item}?",
+                "Any news about {quest_location}?"
+            ],
+            'encouragement': [
+                "I have faith in you. You can do this!",
+                "Be careful out there, but don't give up!",
+                "The reward is waiting when you succeed!"
+            ],
+            'warning': [
+                "Time is running out! Please hurry!",
+                "Others have tried and failed. Don't be like them.",
+                "If you can't do this, I'll have to find someone else."
+            ]
+        },
+        
+        'completion': {
+            'success': [
+                "You did it! I can't thank you enough! Here's your reward: {reward} gold.",
+                "Amazing! You're a true hero! Take this gold and my eternal gratitude.",
+                "I never doubted you for a moment! Here's what I promised."
+            ],
+            'praise': [
+                "Incredible work! You're even more capable than you look.",
+                "The bards will sing of your deeds!",
+                "You've done what many thought impossible!"
+            ],
+            'reward_extra': [
+                "And here's a little extra for going above and beyond.",
+                "Take this as well. It belonged to {previous_owner}. May it serve you well.",
+                "I've also told the guild about your deeds. You'll find more work there."
             ]
         }
-    
-    def setup_personalities(self):
-        """Setup different NPC personality profiles"""
-        
-        self.personalities = {
-            'friendly': {
-                'greeting_boost': 2,
-                'help_chance': 0.9,
-                'patience': 10,
-                'topics': ['weather', 'family', 'food', 'celebration'],
-                'speech_pattern': 'warm and welcoming',
-                'response_modifiers': {
-                    'formality': 0.3,
-                    'enthusiasm': 0.9,
-                    'detail': 0.7
-                }
-            },
-            
-            'grumpy': {
-                'greeting_boost': -1,
-                'help_chance': 0.3,
-                'patience': 3,
-                'topics': ['complaints', 'work', 'money', 'trouble'],
-                'speech_pattern': 'curt and dismissive',
-                'response_modifiers': {
-                    'formality': 0.5,
-                    'enthusiasm': 0.2,
-                    'detail': 0.4
-                }
-            },
-            
-            'mysterious': {
-                'greeting_boost': 0,
-                'help_chance': 0.6,
-                'patience': 7,
-                'topics': ['secrets', 'magic', 'dreams', 'fate'],
-                'speech_pattern': 'enigmatic and vague',
-                'response_modifiers': {
-                    'formality': 0.8,
-                    'enthusiasm': 0.4,
-                    'detail': 0.3
-                }
-            },
-            
-            'wise': {
-                'greeting_boost': 1,
-                'help_chance': 0.8,
-                'patience': 12,
-                'topics': ['history', 'advice', 'philosophy', 'nature'],
-                'speech_pattern': 'thoughtful and measured',
-                'response_modifiers': {
-                    'formality': 0.9,
-                    'enthusiasm': 0.5,
-                    'detail': 0.9
-                }
-            },
-            
-            'eager': {
-                'greeting_boost': 3,
-                'help_chance': 0.95,
-                'patience': 8,
-                'topics': ['adventure', 'stories', 'dreams', 'travel'],
-                'speech_pattern': 'excited and enthusiastic',
-                'response_modifiers': {
-                    'formality': 0.2,
-                    'enthusiasm': 1.0,
-                    'detail': 0.8
-                }
-            },
-            
-            'merchant': {
-                'greeting_boost': 2,
-                'help_chance': 0.7,
-                'patience': 6,
-                'topics': ['prices', 'goods', 'trade', 'economy'],
-                'speech_pattern': 'business-like and persuasive',
-                'response_modifiers': {
-                    'formality': 0.7,
-                    'enthusiasm': 0.6,
-                    'detail': 0.8
-                }
+    })
+
+@lru_cache(maxsize=None)
+def load_emotions() -> Mapping:
+    """Emotional response system"""
+    return freeze_table({
+        'happy': {
+            'triggers': ['compliment', 'success', 'gift', 'joke'],
+            'responses': [
+                "*smiles warmly*",
+                "*laughs cheerfully*",
+                "*beams with joy*",
+                "*hums a happy tune*"
+            ],
+            'modifiers': {
+                'friendliness': +2,
+                'patience': +3,
+                'helpfulness': +2
+            }
+        },
+        
+        'sad': {
+            'triggers': ['bad_news', 'loss', 'memory'],
+            'responses': [
+                "*sighs heavily*",
+                "*looks downcast*",
+                "*wipes away a tear*",
+                "*voice cracks with emotion*"
+            ],
+            'modifiers': {
+                'friendliness': -1,
+                'patience': +2,
+                'helpfulness': +1
+            }
+        },
+        
+        'angry': {
+            'triggers': ['insult', 'betrayal', 'threat'],
+            'responses': [
+                "*glares angrily*",
+                "*clenches fists*",
+                "*raises voice*",
+                "*stomps foot*"
+            ],
+            'modifiers': {
+                'friendliness': -3,
+                'patience': -4,
+                'helpfulness': -2
+            }
+        },
+        
+        'scared': {
+            'triggers': ['danger', 'monster', 'dark'],
+            'responses': [
+                "*trembles slightly*",
+                "*looks around nervously*",
+                "*voice quivers*",
+                "*jumps at every sound*"
+            ],
+            'modifiers': {
+                'friendliness': +1,
+                'patience': -2,
+                'helpfulness': -1
+            }
+        },
+        
+        'curious': {
+            'triggers': ['question', 'mystery', 'new_item'],
+            'responses': [
+                "*tilts head curiously*",
+                "*leans in with interest*",
+                "*eyes widen*",
+                "*scratches chin thoughtfully*"
+            ],
+            'modifiers': {
+                'friendliness': +1,
+                'patience': +2,
+                'helpfulness': +1
             }
         }
+    })
+
+# Common words skipped when pulling keywords out of a command
+STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'is', 'at', 'which', 'on', 'and', 'or', 'but',
+    'in', 'with', 'to', 'for', 'of', 'from', 'by', 'about', 'as'
+})
+
+# What each profession offers, as mentioned in introductions
+PROFESSION_SERVICES = MappingProxyType({
+    'blacksmith': 'weapons and armor',
+    'merchant': 'goods and supplies',
+    'innkeeper': 'food and lodging',
+    'guard': 'protection',
+    'priest': 'blessings and healing',
+    'farmer': 'fresh produce',
+    'scholar': 'knowledge and lore'
+})
+
+@lru_cache(maxsize=64)
+def profession_service(profession: str) -> str:
+    """Get service description for profession (case-insensitive)"""
+    return PROFESSION_SERVICES.get(profession.lower(), 'services')
+
+# Casual words that formal speakers spell out, replaced in a single pass
+FORMAL_WORDS = MappingProxyType({
+    'gonna': 'going to',
+    'wanna': 'want to'
+})
+FORMAL_PATTERN = re.compile(r'\b(?:' + '|'.join(FORMAL_WORDS) + r')\b')
+
+# Fixed word lists used to vary generated dialogue
+ITEM_PURPOSES = ('crafting', 'trading', 'quests', 'survival', 'combat')
+
+OPINION_TOPICS = (
+    ('adventuring', ("It's a dangerous life, but someone has to do it.",)),
+    ('the town', ("Quiet place. I like it that way.",)),
+    ('the king', ("He does his best, I suppose.",)),
+    ('magic', ("Powerful stuff. Should be respected.",)),
+    ('monsters', ("They're getting bolder lately. Worrying.",)),
+    ('treasure', ("Shiny things attract trouble.",)),
+    ('the weather', ("Could be worse.", "Beautiful day!", "Rain again..."))
+)
+
+STORY_ELEMENTS = MappingProxyType({
+    'hero': ('The Brave Warrior', 'The Wise Mage', 'The Cunning Rogue', 'The Pious Cleric'),
+    'villain': ('a terrible dragon', 'an evil sorcerer', 'a dark cult', 'an ancient curse'),
+    'treasure': ('golden treasure', 'magical artifact', 'sacred relic', 'hidden knowledge'),
+    'twist': ('betrayal', 'sacrifice', 'unexpected ally', 'forgotten truth'),
+    'discovery': ('nothing is as it seems', 'the real enemy was within',
+                  'the treasure was a trap', 'the villain was misunderstood'),
+    'ending': ('the treasure remains unfound', 'the battle echoes in legend',
+               'few dare to follow that path', 'the truth is buried with time')
+})
+
+# Phrase for each hour of the day, expanded from (start, end) ranges
+HOUR_PHRASES = tuple(
+    phrase
+    for (start, end), phrase in (
+        ((0, 5), "dead of night"),
+        ((5, 8), "early morning"),
+        ((8, 12), "morning"),
+        ((12, 17), "afternoon"),
+        ((17, 20), "evening"),
+        ((20, 24), "night")
+    )
+    for _ in range(start, end)
+)
+
+TIME_RESPONSES = (
+    "It's the {time_of_day} of day {day}.",
+    "The {time_of_day} sun casts long shadows. Day {day} of your journey.",
+    "Day {day}, in the {time_of_day}. Time flies when you're adventuring!",
+    "The {time_of_day} air feels {air}."
+)
+
+# Rumor formats, each followed by the choices for its numbered fields
+RUMORS = (
+    ("{location} is haunted by the ghost of a {0}.", ('king', 'thief', 'lover', 'hero')),
+    ("There's {0} nearby.", ('hidden treasure', 'a secret passage', 'an ancient altar', 'magic crystals')),
+    ("The {0} know more than they let on.", ('guards', 'merchants', 'priests', 'children')),
+    ("A {0} was seen recently.", ('strange figure', 'hooded stranger', 'wounded soldier', 'mysterious traveler')),
+    ("The {0} is {1}.", ('well', 'old tree', 'abandoned house', 'cemetery'), ('cursed', 'magical', 'haunted', 'sacred'))
+)
+
+# Words that reveal how the player is feeling, checked in this order
+EMOTION_KEYWORDS = MappingProxyType({
+    'happy': frozenset({'happy', 'glad', 'joy', 'great', 'wonderful', 'excellent'}),
+    'sad': frozenset({'sad', 'unhappy', 'depressed', 'miserable', 'heartbroken'}),
+    'angry': frozenset({'angry', 'mad', 'furious', 'annoyed', 'irritated'}),
+    'scared': frozenset({'scared', 'afraid', 'terrified', 'fear', 'frightened'}),
+    'curious': frozenset({'curious', 'wonder', 'interesting', 'fascinating'})
+})
+
+# What an NPC adds after reacting to each detected emotion
+EMOTION_SUFFIXES = MappingProxyType({
+    'happy': " That's wonderful to hear!",
+    'sad': " I'm sorry you're feeling that way.",
+    'angry': " Let's calm down and talk about this.",
+    'scared': " Don't worry, you're safe here."
+})
+
+def build_intent_matcher(patterns: Dict) -> Tuple[Dict, Dict, re.Pattern, List]:
+    """
+    Compile intent patterns into the lookup structures used by AIEngine
+    Returns (keyword_index, pattern_groups, combined_pattern, pattern_weights)
+    
+    Categories are referred to by their position in pattern_weights, so
+    scoring can count hits in a flat list instead of a dict.
+    """
+    
+    # Plain single-word patterns are matched as whole words with a set
+    # lookup against the command's tokens (word -> categories).
+    #
+    # Everything else is combined into a single alternation so one scan of
+    # the command finds all hits. Each alternative is wrapped in a lookahead
+    # to keep matches zero-width, so overlapping hits are all reported.
+    # Longer patterns go first so they are not shadowed by a shorter pattern
+    # that starts at the same position.
+    categories = [category for category, data in patterns.items() if data['patterns']]
+    
+    keyword_index = {}
+    pattern_groups = {}
+    group_names = {}
+    for index, category in enumerate(categories):
+        for pattern in patterns[category]['patterns']:
+            if pattern != pattern.lower():
+                raise ValueError(f"Intent pattern must be lowercase: {pattern!r}")
+            pattern = sys.intern(pattern)
+            if re.fullmatch(r"[a-z]+", pattern):
+                keyword_index.setdefault(pattern, []).append(index)
+                continue
+            if pattern not in group_names:
+                group_names[pattern] = f"p{len(group_names)}"
+                pattern_groups[group_names[pattern]] = []
+            pattern_groups[group_names[pattern]].append(index)
+    
+    # Patterns are fixed strings, so a bad one should fail loudly.
+    # Commands are lowercased before matching, so no IGNORECASE is needed.
+    alternatives = sorted(group_names.items(), key=lambda item: -len(item[0]))
+    combined_pattern = re.compile(
+        "|".join(f"(?=(?P<{name}>{pattern}))" for pattern, name in alternatives)
+    )
+    
+    # Per-category scoring constants
+    pattern_weights = [
+        (category, len(patterns[category]['patterns']), patterns[category]['priority'] / 3.0)
+        for category in categories
+    ]
+    
+    keyword_index = {word: tuple(indexes) for word, indexes in keyword_index.items()}
+    pattern_groups = {name: tuple(indexes) for name, indexes in pattern_groups.items()}
+    return keyword_index, pattern_groups, combined_pattern, pattern_weights
+
+# Words in a normalized command
+WORD_PATTERN = re.compile(r"[a-z']+")
+
+# Words long enough to count as keywords (more than 3 letters)
+KEYWORD_PATTERN = re.compile(r"[a-z']{4,}")
+
+@lru_cache(maxsize=1024)
+def compile_template(template: str) -> Callable[[Mapping], str]:
+    """
+    Compile a response template into a function that fills it from a mapping
+    The template is parsed once here, so rendering is just lookups and concatenation.
+    Placeholders missing from the mapping are left in the text.
+    """
+    parts = []
+    for literal, field, spec, conversion in string.Formatter().parse(template):
+        if literal:
+            parts.append(repr(literal))
+        if field is None:
+            continue
+        if spec or conversion or not field.isidentifier():
+            # Attribute/index lookups and format specs are left to str.format
+            return lambda fields: template.format_map(TemplateFields(fields))
+        parts.append(f"str(fields.get({field!r}, {'{' + field + '}'!r}))")
+    
+    code = "lambda fields: " + (" + ".join(parts) or "''")
+    return eval(compile(code, '<template>', 'eval'))
+
+@lru_cache(maxsize=None)
+def load_template_pools() -> Mapping:
+    """Every list of response templates, keyed by its path (e.g. ('help_request', 'friendly'))"""
+    
+    pools = {}
+    pending = [((), load_response_templates())]
+    while pending:
+        path, table = pending.pop()
+        if isinstance(table, Mapping):
+            pending.extend((path + (key,), item) for key, item in table.items())
+        else:
+            pools[path] = table
+    return MappingProxyType(pools)
+
+class TemplateFields(dict):
+    """Template values that leave unknown placeholders untouched when formatting"""
+    
+    def __missing__(self, key: str) -> str:
+        return "{" + key + "}"
+
+class ConversationRelationship:
+    """How the player stands with a single NPC they have talked to"""
     
-    def setup_quest_dialogue(self):
-        """Setup quest-specific dialogue templates"""
+    __slots__ = ('favor', 'times_talked')
+    
+    def __init__(self):
+        self.favor = 0
+        self.times_talked = 0
+
+class AIEngine:
+    """
+    Main AI engine that processes player input and generates intelligent responses
+    Uses pattern matching, context awareness, and dynamic response generation
+    """
+    
+    # Static tables are read through properties, so only per-engine state needs a slot
+    __slots__ = (
+        'player', 'game_flags', 'memory',
+        'template_queues',
+        'intent_cache', 'max_cached_intents',
+        'response_handlers', 'command_handlers',
+        'patterns', 'keyword_index', 'pattern_groups',
+        'combined_pattern', 'pattern_weights'
+    )
+    
+    # Compiled intent patterns, built by the first engine and then shared
+    intent_matcher = None
+    
+    def __init__(self, player: Dict, game_flags: Dict):
+        self.player = player
+        self.game_flags = game_flags
         
-        self.quest_dialogue = {
-            'offer': {
-                'simple': [
-                    "I need {quest_item} from {quest_location}. Bring it to me and I'll pay {reward} gold.",
-                    "Could you {quest_task}? I'd be very grateful.",
-                    "There's a {monster_type} causing trouble near {quest_location}. Can you deal with it?"
-                ],
-                'story': [
-                    "Long ago, {backstory_stub}. Now, I need someone to {quest_task}.",
-                    "The {ancient_artifact} has been lost for generations. Find it and claim your reward!",
-                    "My {family_member} disappeared in {quest_location}. Please find them!"
-                ],
-                'urgent': [
-                    "Quickly! {urgent_situation}! You're the only one who can help!",
-                    "No time to explain! {quest_task} before it's too late!",
-                    "This is a matter of life and death! {quest_objective}!"
-                ]
-            },
-            
-            'progress': {
-                'checking': [
-                    "Made any progress on {quest_name}?",
-                    "How goes the search for {quest_item}?",
-                    "Any news about {quest_location}?"
-                ],
-                'encouragement': [
-                    "I have faith in you. You can do this!",
-                    "Be careful out there, but don't give up!",
-                    "The reward is waiting when you succeed!"
-                ],
-                'warning': [
-                    "Time is running out! Please hurry!",
-                    "Others have tried and failed. Don't be like them.",
-                    "If you can't do this, I'll have to find someone else."
-                ]
-            },
-            
-            'completion': {
-                'success': [
-                    "You did it! I can't thank you enough! Here's your reward: {reward} gold.",
-                    "Amazing! You're a true hero! Take this gold and my eternal gratitude.",
-                    "I never doubted you for a moment! Here's what I promised."
-                ],
-                'praise': [
-                    "Incredible work! You're even more capable than you look.",
-                    "The bards will sing of your deeds!",
-                    "You've done what many thought impossible!"
-                ],
-                'reward_extra': [
-                    "And here's a little extra for going above and beyond.",
-                    "Take this as well. It belonged to {previous_owner}. May it serve you well.",
-                    "I've also told the guild about your deeds. You'll find more work there."
-                ]
-            }
+        # Conversation memory
+        self.memory = {
+            'recent_topics': deque(maxlen=10),
+            'known_facts': BloomFilter(capacity=10000, error_rate=0.01),
+            'player_reputation': Counter(),
+            'npc_relationships': defaultdict(ConversationRelationship),
+            'last_interaction': {},
+            'emotional_state': 'neutral'
         }
-    
-    def setup_emotions(self):
-        """Setup emotional response system"""
-        
-        self.emotions = {
-            'happy': {
-                'triggers': ['compliment', 'success', 'gift', 'joke'],
-                'responses': [
-                    "*smiles warmly*",
-                    "*laughs cheerfully*",
-                    "*beams with joy*",
-                    "*hums a happy tune*"
-                ],
-                'modifiers': {
-                    'friendliness': +2,
-                    'patience': +3,
-                    'helpfulness': +2
-                }
-            },
-            
-            'sad': {
-                'triggers': ['bad_news', 'loss', 'memory'],
-                'responses': [
-                    "*sighs heavily*",
-                    "*looks downcast*",
-                    "*wipes away a tear*",
-                    "*voice cracks with emotion*"
-                ],
-                'modifiers': {
-                    'friendliness': -1,
-                    'patience': +2,
-                    'helpfulness': +1
-                }
-            },
-            
-            'angry': {
-                'triggers': ['insult', 'betrayal', 'threat'],
-                'responses': [
-                    "*glares angrily*",
-                    "*clenches fists*",
-                    "*raises voice*",
-                    "*stomps foot*"
-                ],
-                'modifiers': {
-                    'friendliness': -3,
-                    'patience': -4,
-                    'helpfulness': -2
-                }
-            },
-            
-            'scared': {
-                'triggers': ['danger', 'monster', 'dark'],
-                'responses': [
-                    "*trembles slightly*",
-                    "*looks around nervously*",
-                    "*voice quivers*",
-                    "*jumps at every sound*"
-                ],
-                'modifiers': {
-                    'friendliness': +1,
-                    'patience': -2,
-                    'helpfulness': -1
-                }
-            },
-            
-            'curious': {
-                'triggers': ['question', 'mystery', 'new_item'],
-                'responses': [
-                    "*tilts head curiously*",
-                    "*leans in with interest*",
-                    "*eyes widen*",
-                    "*scratches chin thoughtfully*"
-                ],
-                'modifiers': {
-                    'friendliness': +1,
-                    'patience': +2,
-                    'helpfulness': +1
-                }
-            }
+        
+        # Shuffled response templates waiting to be used, keyed by template path
+        self.template_queues = {}
+        
+        # Recently classified commands (normalized text -> intent)
+        self.intent_cache = OrderedDict()
+        self.max_cached_intents = 512
+        
+        # Response patterns by category
+        self.setup_patterns()
+        
+        # Response generators by intent category
+        self.response_handlers = {
+            'greeting': self.generate_greeting,
+            'farewell': self.generate_farewell,
+            'about_self': self.generate_self_introduction,
+            'about_player': self.generate_player_reflection,
+            'help_request': self.generate_help_response,
+            'quest_related': self.generate_quest_response,
+            'location_questions': self.generate_location_info,
+            'time_questions': self.generate_time_response,
+            'combat_related': self.generate_combat_advice,
+            'item_related': self.generate_item_response,
+            'npc_related': self.generate_npc_info,
+            'ask_opinion': self.generate_opinion,
+            'ask_story': self.generate_story,
+            'trading': self.generate_trade_response,
+            'joke': self.generate_joke,
+            'compliment': self.generate_compliment_response,
+            'insult': self.generate_insult_response
+        }
+        
+        # Generators that also need the player's raw command
+        self.command_handlers = {
+            'emotion': self.generate_emotional_response
         }
+        
+    # Static tables are shared and read-only, and only built on first use
+    
+    @property
+    def knowledge_base(self) -> Mapping:
+        return load_knowledge_base()
+    
+    @property
+    def response_templates(self) -> Mapping:
+        return load_response_templates()
+    
+    @property
+    def personalities(self) -> Mapping:
+        return load_personalities()
+    
+    @property
+    def personality_modifiers(self) -> Mapping:
+        return load_personality_modifiers()
+    
+    @property
+    def quest_dialogue(self) -> Mapping:
+        return load_quest_dialogue()
+    
+    @property
+    def emotions(self) -> Mapping:
+        return load_emotions()
+    
+    @property
+    def template_pools(self) -> Mapping:
+        return load_template_pools()
+    
+    def setup_patterns(self):
+        """Setup advanced pattern matching for command interpretation"""
+        
+        self.patterns = INTENT_PATTERNS
+        (self.keyword_index, self.pattern_groups,
+         self.combined_pattern, self.pattern_weights) = self.ensure_patterns()
+    
+    @classmethod
+    def ensure_patterns(cls) -> Tuple[Dict, Dict, re.Pattern, List]:
+        """Compile the intent patterns once and share them with every engine"""
+        
+        if cls.intent_matcher is None:
+            cls.intent_matcher = build_intent_matcher(INTENT_PATTERNS)
+        return cls.intent_matcher
     
     def interpret_command(self, command: str, context: Dict) -> str:
         """
@@ -704,126 +1010,145 @@ class AIEngine:
         npc_personality = context.get('npc_personality', 'neutral')
         
         # Generate response based on category
-        if category == 'greeting':
-            return self.generate_greeting(context, npc_personality)
-        
-        elif category == 'farewell':
-            return self.generate_farewell(context, npc_personality)
-        
-        elif category == 'about_self':
-            return self.generate_self_introduction(context, npc_personality)
-        
-        elif category == 'about_player':
-            return self.generate_player_reflection(context, npc_personality)
-        
-        elif category == 'help_request':
-            return self.generate_help_response(context, npc_personality)
-        
-        elif category == 'quest_related':
-            return self.generate_quest_response(context, npc_personality)
-        
-        elif category == 'location_questions':
-            return self.generate_location_info(context, npc_personality)
+        handler = self.command_handlers.get(category)
+        if handler:
+            return handler(command, context, npc_personality)
         
-        elif category == 'time_questions':
-            return self.generate_time_response(context)
+        handler = self.response_handlers.get(category)
+        if handler:
+            return handler(context, npc_personality)
         
-        elif category == 'combat_related':
-            return self.generate_combat_advice(context, npc_personality)
-        
-        elif category == 'item_related':
-            return self.generate_item_response(context, npc_personality)
-        
-        elif category == 'npc_related':
-            return self.generate_npc_info(context, npc_personality)
-        
-        elif category == 'emotion':
-            return self.generate_emotional_response(command, context, npc_personality)
-        
-        elif category == 'ask_opinion':
-            return self.generate_opinion(context, npc_personality)
-        
-        elif category == 'ask_story':
-            return self.generate_story(context, npc_personality)
-        
-        elif category == 'trading':
-            return self.generate_trade_response(context, npc_personality)
-        
-        elif category == 'joke':
-            return self.generate_joke(context, npc_personality)
-        
-        elif category == 'compliment':
-            return self.generate_compliment_response(context, npc_personality)
-        
-        elif category == 'insult':
-            return self.generate_insult_response(context, npc_personality)
-        
-        else:
-            # Try to generate contextual response
-            return self.generate_contextual_response(command, context, npc_personality)
+        # Try to generate contextual response
+        return self.generate_contextual_response(command, context, npc_personality)
     
     def analyze_command(self, command: str) -> Tuple[str, float]:
         """
         Analyze command to determine intent and confidence
         Returns (category, confidence_score)
         """
+        # Players repeat themselves a lot, so reuse earlier classifications
+        key = self.normalize_command(command)
+        if key in self.intent_cache:
+            self.intent_cache.move_to_end(key)
+            best_category, best_confidence = self.intent_cache[key]
+        else:
+            best_category, best_confidence = self.classify_command(key)
+            self.intent_cache[key] = (best_category, best_confidence)
+            if len(self.intent_cache) > self.max_cached_intents:
+                self.intent_cache.popitem(last=False)
+        
+        # Store in memory
+        if best_confidence > 0.3:
+            self.memory['recent_topics'].append({
+                'category': best_category,
+                'timestamp': time.monotonic_ns(),
+                'command': command
+            })
+        
+        return best_category, best_confidence
+    
+    def normalize_command(self, command: str) -> str:
+        """Trim, lowercase and straighten apostrophes so commands match the patterns"""
+        return command.strip().lower().replace('\u2019', "'")
+    
+    def tokenize_command(self, command: str) -> frozenset:
+        """
+        Split a normalized command into its words
+        Simple plurals also contribute their singular ("quests" -> "quest")
+        """
+        words = WORD_PATTERN.findall(command)
+        return frozenset(words + [w[:-1] for w in words if len(w) > 3 and w.endswith('s')])
+    
+    def classify_command(self, command: str) -> Tuple[str, float]:
+        """
+        Score a normalized command (see normalize_command) against every pattern category
+        Returns (category, confidence_score) without touching memory
+        """
+        # Phrases and regexes, single pass; each distinct pattern counts once
+        groups = {m.lastgroup for m in self.combined_pattern.finditer(command)}
+        return self.score_matches(command, groups)
+    
+    def classify_batch(self, commands: List[str]) -> List[Tuple[str, float]]:
+        """
+        Classify many commands at once (bots, NPC simulation, replays)
+        Returns (category, confidence_score) per command without touching memory
+        """
+        normalized = [self.normalize_command(command) for command in commands]
+        
+        # Scan the whole batch in one pass. Commands are joined by newlines,
+        # which no pattern can match across, and each hit is mapped back to its
+        # command by offset.
+        starts = []
+        offset = 0
+        for command in normalized:
+            starts.append(offset)
+            offset += len(command) + 1
+        
+        groups = [set() for _ in normalized]
+        for match in self.combined_pattern.finditer("\n".join(normalized)):
+            groups[bisect_right(starts, match.start()) - 1].add(match.lastgroup)
+        
+        return [self.score_matches(command, found) for command, found in zip(normalized, groups)]
+    
+    def score_matches(self, command: str, groups: set) -> Tuple[str, float]:
+        """
+        Pick the best category for a normalized command, given the combined
+        pattern groups that matched it
+        """
         best_category = 'unknown'
         best_confidence = 0.0
         
-        for category, data in self.patterns.items():
-            matches = 0
-            total_patterns = len(data['compiled'])
-            
-            if total_patterns == 0:
+        # Hits per category, by position in pattern_weights
+        hits = [0] * len(self.pattern_weights)
+        
+        # Whole-word keywords
+        for word in self.keyword_index.keys() & self.tokenize_command(command):
+            for index in self.keyword_index[word]:
+                hits[index] += 1
+        
+        for group in groups:
+            for index in self.pattern_groups[group]:
+                hits[index] += 1
+        
+        short_command = len(command.split()) <= 3
+        
+        for index, matches in enumerate(hits):
+            # A category with no hits scores zero and can never win
+            if not matches:
                 continue
-            
-            for pattern in data['compiled']:
-                if pattern.search(command):
-                    matches += 1
+            category, total_patterns, weight = self.pattern_weights[index]
             
             # Calculate confidence based on matches and priority
-            confidence = (matches / total_patterns) * (data['priority'] / 3.0)
+            confidence = (matches / total_patterns) * weight
             
             # Boost confidence for exact matches
-            if matches > 0 and len(command.split()) <= 3:
+            if short_command:
                 confidence *= 1.5
             
             if confidence > best_confidence:
                 best_confidence = confidence
                 best_category = category
         
-        # Store in memory
-        if best_confidence > 0.3:
-            self.memory['recent_topics'].append({
-                'category': best_category,
-                'timestamp': datetime.now().isoformat(),
-                'command': command
-            })
-            if len(self.memory['recent_topics']) > 10:
-                self.memory['recent_topics'].pop(0)
-        
         return best_category, best_confidence
     
     def generate_greeting(self, context: Dict, personality: str = 'neutral') -> str:
         """Generate a greeting response"""
         
-        template = random.choice(self.response_templates['greeting'])
-        
         # Check if we've met before
         npc_name = context.get('npc_name', 'stranger')
-        if npc_name in self.memory['npc_relationships']:
-            rel = self.memory['npc_relationships'][npc_name]
-            if rel['times_talked'] > 1:
-                # Return greeting
-                greeting = random.choice([
-                    f"Welcome back, {self.player['name']}!",
-                    f"Good to see you again!",
-                    f"Back so soon? What can I do for you?"
-                ])
-                return greeting
+        rel = self.memory['npc_relationships'].get(npc_name)
+        if rel is not None and rel.times_talked > 1:
+            # Return greeting
+            greeting = random.choice([
+                f"Welcome back, {self.player['name']}!",
+                f"Good to see you again!",
+                f"Back so soon? What can I do for you?"
+            ])
+            return greeting
         
         # Format template
-        response = template.format(
+        response = self.fill_template(
+            'greeting',
             player_name=self.player['name'],
             location=context.get('location', 'this place'),
             npc_name=context.get('npc_name', 'I'),
@@ -836,16 +1161,15 @@ class AIEngine:
         
         # Update memory
         if context.get('npc_name'):
-            self.memory['npc_relationships'][context['npc_name']]['times_talked'] += 1
+            self.get_relationship(context['npc_name']).times_talked += 1
         
         return response
     
     def generate_farewell(self, context: Dict, personality: str = 'neutral') -> str:
         """Generate a farewell response"""
         
-        template = random.choice(self.response_templates['farewell'])
-        
-        response = template.format(
+        response = self.fill_template(
+            'farewell',
             player_name=self.player['name'],
             location=context.get('location', '')
         )
@@ -855,9 +1179,8 @@ class AIEngine:
     def generate_self_introduction(self, context: Dict, personality: str = 'neutral') -> str:
         """Generate self-introduction"""
         
-        template = random.choice(self.response_templates['about_self'])
-        
-        response = template.format(
+        response = self.fill_template(
+            'about_self',
             npc_name=context.get('npc_name', 'I'),
             npc_profession=context.get('npc_profession', 'resident'),
             npc_race=context.get('npc_race', 'person'),
@@ -876,9 +1199,8 @@ class AIEngine:
     def generate_player_reflection(self, context: Dict, personality: str = 'neutral') -> str:
         """Generate reflection about the player"""
         
-        template = random.choice(self.response_templates['about_player'])
-        
-        response = template.format(
+        response = self.fill_template(
+            'about_player',
             player_name=self.player['name'],
             player_class=self.player.get('class', 'adventurer')
         )
@@ -894,14 +1216,8 @@ class AIEngine:
     def generate_help_response(self, context: Dict, personality: str = 'neutral') -> str:
         """Generate help response"""
         
-        # Get personality-specific templates
-        help_templates = self.response_templates['help_request']
-        
         # Choose based on personality or fallback to neutral
-        if personality in help_templates:
-            template = random.choice(help_templates[personality])
-        else:
-            template = random.choice(help_templates['neutral'])
+        template = self.pick_personal_template('help_request', personality)
         
         return self.add_emotional_flourish(template, personality)
     
@@ -913,20 +1229,17 @@ class AIEngine:
         quest_context = context.get('quest_context', {})
         
         if has_quest:
-            template = random.choice(self.response_templates['quest_related']['has_quest'])
-            
             # Check if quest is already active
-            if quest_context.get('active'):
-                template = random.choice(self.response_templates['quest_related']['progress'])
-            
-            response = template.format(
+            quest_stage = 'progress' if quest_context.get('active') else 'has_quest'
+            response = self.fill_template(
+                'quest_related', quest_stage,
                 quest_name=quest_context.get('name', 'task'),
                 quest_item=quest_context.get('item', 'something'),
                 quest_location=quest_context.get('location', 'somewhere'),
                 quest_task=quest_context.get('task', 'help out')
             )
         else:
-            template = random.choice(self.response_templates['quest_related']['no_quest'])
+            template = self.pick_template('quest_related', 'no_quest')
             response = template
         
         return self.add_emotional_flourish(response, personality)
@@ -939,9 +1252,9 @@ class AIEngine:
         
         # Get location-specific templates
         if location_type in self.response_templates['location_info']:
-            template = random.choice(self.response_templates['location_info'][location_type])
+            template = self.pick_template('location_info', location_type)
         else:
-            template = random.choice(self.response_templates['location_info']['town'])
+            template = self.pick_template('location_info', 'town')
         
         response = template
         
@@ -953,40 +1266,25 @@ class AIEngine:
         
         return self.add_emotional_flourish(response, personality)
     
-    def generate_time_response(self, context: Dict) -> str:
+    def generate_time_response(self, context: Dict, personality: str = 'neutral') -> str:
         """Generate response about time"""
         
         hour = context.get('hour', 12)
         day = context.get('day', 1)
         
-        time_phrases = {
-            (0, 5): "dead of night",
-            (5, 8): "early morning",
-            (8, 12): "morning",
-            (12, 17): "afternoon",
-            (17, 20): "evening",
-            (20, 24): "night"
-        }
+        time_of_day = HOUR_PHRASES[int(hour)] if 0 <= hour < 24 else "day"
         
-        time_of_day = "day"
-        for (start, end), phrase in time_phrases.items():
-            if start <= hour < end:
-                time_of_day = phrase
-                break
-        
-        responses = [
-            f"It's the {time_of_day} of day {day}.",
-            f"The {time_of_day} sun casts long shadows. Day {day} of your journey.",
-            f"Day {day}, in the {time_of_day}. Time flies when you're adventuring!",
-            f"The {time_of_day} air feels {random.choice(['fresh', 'heavy', 'cool', 'warm'])}."
-        ]
-        
-        return random.choice(responses)
+        template = random.choice(TIME_RESPONSES)
+        return compile_template(template)({
+            'time_of_day': time_of_day,
+            'day': day,
+            'air': random.choice(('fresh', 'heavy', 'cool', 'warm'))
+        })
     
     def generate_combat_advice(self, context: Dict, personality: str = 'neutral') -> str:
         """Generate combat advice"""
         
-        template = random.choice(self.response_templates['combat_advice'])
+        template = self.pick_template('combat_advice')
         
         # Add specific advice based on player class
         player_class = self.player.get('class', '').lower()
@@ -1006,13 +1304,10 @@ class AIEngine:
         
         item_name = context.get('item_name', 'that item')
         
-        template = random.choice(self.response_templates['item_advice'])
-        
-        response = template.format(
+        response = self.fill_template(
+            'item_advice',
             item_name=item_name,
-            item_purpose=random.choice([
-                'crafting', 'trading', 'quests', 'survival', 'combat'
-            ])
+            item_purpose=random.choice(ITEM_PURPOSES)
         )
         
         return self.add_emotional_flourish(response, personality)
@@ -1024,16 +1319,16 @@ class AIEngine:
         
         if target_npc and target_npc in context.get('known_npcs', []):
             responses = [
-                f"Oh, {target_npc}? They're {random.choice(['nice', 'helpful', 'strange', 'quiet'])}.",
-                f"{target_npc} lives over by the {random.choice(['market', 'temple', 'gates'])}.",
-                f"You can usually find {target_npc} at the {random.choice(['tavern', 'their shop', 'town square'])}."
+                f"Oh, {target_npc}? They're {random.choice(('nice', 'helpful', 'strange', 'quiet'))}.",
+                f"{target_npc} lives over by the {random.choice(('market', 'temple', 'gates'))}.",
+                f"You can usually find {target_npc} at the {random.choice(('tavern', 'their shop', 'town square'))}."
             ]
         else:
-            responses = [
+            responses = (
                 "I don't know much about them, sorry.",
                 "Can't say I've heard of that person.",
                 "You'd have to ask someone else about them."
-            ]
+            )
         
         return random.choice(responses)
     
@@ -1050,57 +1345,35 @@ class AIEngine:
             flourish = random.choice(emotion_data['responses'])
             
             # Generate appropriate response
-            if detected_emotion == 'happy':
-                response = f"{flourish} That's wonderful to hear!"
-            elif detected_emotion == 'sad':
-                response = f"{flourish} I'm sorry you're feeling that way."
-            elif detected_emotion == 'angry':
-                response = f"{flourish} Let's calm down and talk about this."
-            elif detected_emotion == 'scared':
-                response = f"{flourish} Don't worry, you're safe here."
-            else:
-                response = flourish
-            
-            return response
+            return flourish + EMOTION_SUFFIXES.get(detected_emotion, '')
         
         return self.generate_contextual_response(command, context, personality)
     
     def generate_opinion(self, context: Dict, personality: str = 'neutral') -> str:
         """Generate opinion on a topic"""
         
-        topics = [
-            ('adventuring', "It's a dangerous life, but someone has to do it."),
-            ('the town', "Quiet place. I like it that way."),
-            ('the king', "He does his best, I suppose."),
-            ('magic', "Powerful stuff. Should be respected."),
-            ('monsters', "They're getting bolder lately. Worrying."),
-            ('treasure', "Shiny things attract trouble."),
-            ('the weather', random.choice(["Could be worse.", "Beautiful day!", "Rain again..."]))
-        ]
-        
-        topic, opinion = random.choice(topics)
+        topic, opinions = random.choice(OPINION_TOPICS)
+        opinion = random.choice(opinions)
         return f"{topic.title()}? {opinion}"
     
     def generate_story(self, context: Dict, personality: str = 'neutral') -> str:
         """Generate a short story or legend"""
         
-        story_elements = {
-            'hero': ['The Brave Warrior', 'The Wise Mage', 'The Cunning Rogue', 'The Pious Cleric'],
-            'villain': ['a terrible dragon', 'an evil sorcerer', 'a dark cult', 'an ancient curse'],
-            'treasure': ['golden treasure', 'magical artifact', 'sacred relic', 'hidden knowledge'],
-            'twist': ['betrayal', 'sacrifice', 'unexpected ally', 'forgotten truth']
-        }
-        
-        hero = random.choice(story_elements['hero'])
-        villain = random.choice(story_elements['villain'])
-        treasure = random.choice(story_elements['treasure'])
-        twist = random.choice(story_elements['twist'])
+        choice = random.choice
+        hero = choice(STORY_ELEMENTS['hero'])
+        villain = choice(STORY_ELEMENTS['villain'])
+        treasure = choice(STORY_ELEMENTS['treasure'])
+        twist = choice(STORY_ELEMENTS['twist'])
         
-        story = f"Long ago, {hero} ventured forth to defeat {villain} and claim the {treasure}. "
-        story += f"But in a shocking {twist}, they discovered that {random.choice(['nothing is as it seems', 'the real enemy was within', 'the treasure was a trap', 'the villain was misunderstood'])}. "
-        story += f"To this day, {random.choice(['the treasure remains unfound', 'the battle echoes in legend', 'few dare to follow that path', 'the truth is buried with time'])}."
+        discovery = choice(STORY_ELEMENTS['discovery'])
+        ending = choice(STORY_ELEMENTS['ending'])
         
-        return story
+        # Adjacent f-strings compile into a single string build
+        return (
+            f"Long ago, {hero} ventured forth to defeat {villain} and claim the {treasure}. "
+            f"But in a shocking {twist}, they discovered that {discovery}. "
+            f"To this day, {ending}."
+        )
     
     def generate_trade_response(self, context: Dict, personality: str = 'neutral') -> str:
         """Generate trading-related response"""
@@ -1109,51 +1382,41 @@ class AIEngine:
             responses = [
                 f"Everything has a price. What catches your eye?",
                 f"Best prices in town! Take a look at my wares.",
-                f"I've got {random.choice(['rare', 'exotic', 'fine', 'practical'])} goods for sale."
+                f"I've got {random.choice(('rare', 'exotic', 'fine', 'practical'))} goods for sale."
             ]
         else:
-            responses = [
+            responses = (
                 "I'm not a merchant, sorry.",
                 "Don't have anything to trade, but thanks for asking.",
                 "If you need supplies, try the market."
-            ]
+            )
         
         return random.choice(responses)
     
     def generate_joke(self, context: Dict, personality: str = 'neutral') -> str:
         """Generate a joke"""
         
-        return random.choice(self.response_templates['joke'])
+        return self.pick_template('joke')
     
     def generate_compliment_response(self, context: Dict, personality: str = 'neutral') -> str:
         """Generate response to a compliment"""
         
-        comp_templates = self.response_templates['compliment_response']
-        
-        if personality in comp_templates:
-            template = random.choice(comp_templates[personality])
-        else:
-            template = random.choice(comp_templates['neutral'])
+        template = self.pick_personal_template('compliment_response', personality)
         
         # Update relationship
         if context.get('npc_name'):
-            self.memory['npc_relationships'][context['npc_name']]['favor'] += 1
+            self.get_relationship(context['npc_name']).favor += 1
         
         return template
     
     def generate_insult_response(self, context: Dict, personality: str = 'neutral') -> str:
         """Generate response to an insult"""
         
-        insult_templates = self.response_templates['insult_response']
-        
-        if personality in insult_templates:
-            template = random.choice(insult_templates[personality])
-        else:
-            template = random.choice(insult_templates['neutral'])
+        template = self.pick_personal_template('insult_response', personality)
         
         # Update relationship negatively
         if context.get('npc_name'):
-            self.memory['npc_relationships'][context['npc_name']]['favor'] -= 2
+            self.get_relationship(context['npc_name']).favor -= 2
         
         return template
     
@@ -1164,51 +1427,50 @@ class AIEngine:
         keywords = self.extract_keywords(command)
         
         # Check if we have any relevant responses
+        knowledge = self.knowledge_base
+        world_facts = knowledge['world_facts']
         for keyword in keywords:
-            if keyword in self.knowledge_base.get('world_facts', {}):
-                return f"Ah, {keyword}? {random.choice(self.knowledge_base['world_facts']['recent_events'])}"
+            if keyword in world_facts:
+                return f"Ah, {keyword}? {random.choice(world_facts['recent_events'])}"
         
         # Check for location-specific knowledge
-        location = context.get('location', '')
-        if location in self.knowledge_base.get('locations', {}):
-            loc_data = self.knowledge_base['locations'][location]
+        loc_data = knowledge['locations'].get(context.get('location', ''))
+        if loc_data is not None:
             if random.random() < 0.5 and loc_data.get('rumors'):
                 return random.choice(loc_data['rumors'])
         
         # Default responses
-        return random.choice(self.response_templates['unknown'])
+        return self.pick_template('unknown')
     
     def generate_rumor(self, location: str) -> str:
         """Generate a random rumor"""
         
-        rumors = [
-            f"{location} is haunted by the ghost of a {random.choice(['king', 'thief', 'lover', 'hero'])}.",
-            f"There's {random.choice(['hidden treasure', 'a secret passage', 'an ancient altar', 'magic crystals'])} nearby.",
-            f"The {random.choice(['guards', 'merchants', 'priests', 'children'])} know more than they let on.",
-            f"A {random.choice(['strange figure', 'hooded stranger', 'wounded soldier', 'mysterious traveler'])} was seen recently.",
-            f"The {random.choice(['well', 'old tree', 'abandoned house', 'cemetery'])} is {random.choice(['cursed', 'magical', 'haunted', 'sacred'])}."
-        ]
+        # Only the chosen rumor is filled in
+        choice = random.choice
+        rumor, *options = choice(RUMORS)
+        rumor = rumor.format(*map(choice, options), location=location)
         
-        template = random.choice(self.response_templates['rumor'])
-        return template.format(rumor_content=random.choice(rumors))
+        return self.fill_template('rumor', rumor_content=rumor)
     
     def add_emotional_flourish(self, response: str, personality: str = 'neutral') -> str:
         """Add emotional flourishes to response based on personality"""
         
-        if personality in self.personalities:
-            mods = self.personalities[personality]['response_modifiers']
-            
+        # Neutral is the default and has no profile, so there is nothing to add
+        if personality == 'neutral':
+            return response
+        
+        mods = self.personality_modifiers.get(personality)
+        if mods is not None:
             # Add personality-specific phrasing
-            if mods['enthusiasm'] > 0.7:
+            if mods.enthusiasm > 0.7:
                 if random.random() < 0.3:
-                    response += f" {random.choice(['!', '!!', '!!!'])}"
+                    response += f" {random.choice(('!', '!!', '!!!'))}"
             
-            if mods['formality'] > 0.7:
-                response = response.replace("gonna", "going to")
-                response = response.replace("wanna", "want to")
+            if mods.formality > 0.7:
+                response = FORMAL_PATTERN.sub(lambda match: FORMAL_WORDS[match.group()], response)
             
-            if mods['detail'] > 0.7 and random.random() < 0.3:
-                response += f" {random.choice(['Indeed.', 'You see,', 'The truth is,', 'Mark my words,'])}"
+            if mods.detail > 0.7 and random.random() < 0.3:
+                response += f" {random.choice(('Indeed.', 'You see,', 'The truth is,', 'Mark my words,'))}"
         
         return response
     
@@ -1216,31 +1478,21 @@ class AIEngine:
         """Extract important keywords from text"""
         
         # Simple keyword extraction (can be enhanced with NLP)
-        words = text.lower().split()
-        
-        # Filter out common words
-        stop_words = {'the', 'a', 'an', 'is', 'at', 'which', 'on', 'and', 'or', 'but', 
-                      'in', 'with', 'to', 'for', 'of', 'from', 'by', 'about', 'as'}
+        words = KEYWORD_PATTERN.findall(text.lower())
         
-        keywords = [w for w in words if w not in stop_words and len(w) > 3]
+        # Filter out common words, stopping once we have the top 3 keywords
+        keywords = (w for w in words if w not in STOP_WORDS)
         
-        return keywords[:3]  # Return top 3 keywords
+        return list(islice(keywords, 3))
     
     def detect_emotion(self, text: str) -> Optional[str]:
         """Detect emotion from text"""
         
-        emotion_keywords = {
-            'happy': ['happy', 'glad', 'joy', 'great', 'wonderful', 'excellent'],
-            'sad': ['sad', 'unhappy', 'depressed', 'miserable', 'heartbroken'],
-            'angry': ['angry', 'mad', 'furious', 'annoyed', 'irritated'],
-            'scared': ['scared', 'afraid', 'terrified', 'fear', 'frightened'],
-            'curious': ['curious', 'wonder', 'interesting', 'fascinating']
-        }
-        
-        text_lower = text.lower()
+        # Whole words only, so "unhappy" is not read as "happy"
+        words = self.tokenize_command(self.normalize_command(text))
         
-        for emotion, keywords in emotion_keywords.items():
-            if any(keyword in text_lower for keyword in keywords):
+        for emotion, keywords in EMOTION_KEYWORDS.items():
+            if not keywords.isdisjoint(words):
                 return emotion
         
         return None
@@ -1248,28 +1500,60 @@ class AIEngine:
     def get_profession_service(self, profession: str) -> str:
         """Get service description for profession"""
         
-        services = {
-            'blacksmith': 'weapons and armor',
-            'merchant': 'goods and supplies',
-            'innkeeper': 'food and lodging',
-            'guard': 'protection',
-            'priest': 'blessings and healing',
-            'farmer': 'fresh produce',
-            'scholar': 'knowledge and lore'
-        }
-        
-        return services.get(profession.lower(), 'services')
+        return profession_service(profession)
     
     def get_random_fact(self, location: str) -> Optional[str]:
         """Get a random fact about a location"""
         
-        if location in self.knowledge_base.get('locations', {}):
-            facts = self.knowledge_base['locations'][location].get('facts', [])
+        loc_data = self.knowledge_base['locations'].get(location)
+        if loc_data is not None:
+            facts = loc_data.get('facts')
             if facts:
-                return f"Did you know? {random.choice(facts)}"
+                # Prefer facts the player hasn't been told yet
+                known_facts = self.memory['known_facts']
+                new_facts = [fact for fact in facts if fact not in known_facts]
+                fact = random.choice(new_facts or facts)
+                if new_facts:
+                    known_facts.add(fact)
+                return f"Did you know? {fact}"
         
         return None
     
+    def pick_template(self, *path: str) -> str:
+        """
+        Draw the next response template under path (e.g. 'help_request', 'friendly')
+        Each key keeps a shuffled queue, so no template repeats until all have been used
+        """
+        queue = self.template_queues.get(path)
+        if not queue:
+            templates = self.template_pools[path]
+            queue = deque(random.sample(templates, len(templates)))
+            self.template_queues[path] = queue
+        return queue.popleft()
+    
+    def render_template(self, template: str, **fields: Any) -> str:
+        """
+        Fill a response template using its compiled renderer (cached per template)
+        Placeholders missing from fields are left in the text instead of raising
+        """
+        return compile_template(template)(fields)
+    
+    def pick_personal_template(self, category: str, personality: str) -> str:
+        """Draw a template in the NPC's personality, falling back to the neutral ones"""
+        
+        if (category, personality) not in self.template_pools:
+            personality = 'neutral'
+        return self.pick_template(category, personality)
+    
+    def fill_template(self, *path: str, **fields: Any) -> str:
+        """Draw the next template under path and render it with fields"""
+        return self.render_template(self.pick_template(*path), **fields)
+    
+    def get_relationship(self, npc_name: str) -> 'ConversationRelationship':
+        """Get conversation history with an NPC, creating it on first contact"""
+        
+        return self.memory['npc_relationships'][npc_name]
+    
     def update_memory(self, key: str, value: Any):
         """Update AI memory"""
         self.memory[key] = value
@@ -1277,10 +1561,11 @@ class AIEngine:
     def get_conversation_summary(self) -> str:
         """Get summary of current conversation state"""
         
-        summary = f"Topics discussed: {', '.join([t['category'] for t in self.memory['recent_topics'][-3:]])}"
+        latest = [t['category'] for t in islice(reversed(self.memory['recent_topics']), 3)]
+        summary = f"Topics discussed: {', '.join(reversed(latest))}"
         return summary
     
     def reset_conversation(self):
         """Reset conversation memory (for new NPCs)"""
-        self.memory['recent_topics'] = []
+        self.memory['recent_topics'].clear()
         self.memory['emotional_state'] = 'neutral'
\ No newline at end of file
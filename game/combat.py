@@ -3,11 +3,17 @@ Combat system for AI Text Adventure Game
 Handles turn-based combat, enemy AI, special abilities, and battle mechanics
 """
 
+import math
 import random
 import time
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, List, Mapping, NamedTuple, Optional, Tuple, Any
 from enum import Enum
-from collections import defaultdict
+from functools import lru_cache
+from types import MappingProxyType
+from collections import defaultdict, deque
+from itertools import cycle
+
+import numpy as np
 
 from .utils import TextFormatter, Colors, Dice
 
@@ -20,6 +26,9 @@ class CombatState(Enum):
     DEFEAT = "defeat"
     FLEE = "flee"
 
+# States in which a fight is over
+COMBAT_OVER_STATES = frozenset({CombatState.VICTORY, CombatState.DEFEAT, CombatState.FLEE})
+
 class DamageType(Enum):
     """Damage types for attacks"""
     PHYSICAL = "physical"
@@ -31,17 +40,893 @@ class DamageType(Enum):
     DARK = "dark"
     TRUE = "true"  # Ignores resistances
 
+def normalize_damage_table(table: Dict) -> Dict[DamageType, float]:
+    """
+    Key a resistance/weakness table by DamageType
+    Names combat never deals (e.g. 'acid') are dropped, since no hit could use them.
+    """
+    return {
+        DamageType(name): multiplier for name, multiplier in table.items()
+        if isinstance(name, DamageType) or name in DamageType._value2member_map_
+    }
+
+def normalize_enemy_data(data: Dict) -> Dict:
+    """Copy an enemy's stats with resistances and weaknesses keyed by DamageType"""
+    return {**data,
+            'resistances': normalize_damage_table(data.get('resistances', {})),
+            'weaknesses': normalize_damage_table(data.get('weaknesses', {}))}
+
+def normalize_enemy_types(enemy_types: Dict) -> Mapping:
+    """Normalize every enemy's stats into a read-only table"""
+    return MappingProxyType({enemy_type: normalize_enemy_data(data)
+                             for enemy_type, data in enemy_types.items()})
+
+# All possible enemy types and their stats
+# Resistances and weaknesses are keyed by DamageType so hits can look them up directly
+ENEMY_TYPES = normalize_enemy_types({
+    # Tier 1 enemies (level 1-3)
+    'goblin': {
+        'name': 'Goblin',
+        'level': 1,
+        'base_health': 25,
+        'base_damage': 5,
+        'base_defense': 3,
+        'speed': 12,
+        'xp_reward': 15,
+        'gold_reward': (3, 8),
+        'abilities': ['scratch', 'dodge'],
+        'resistances': {},
+        'weaknesses': {'physical': 1.2},
+        'description': 'A small, green, cowardly creature with sharp teeth.',
+        'attack_patterns': ['basic', 'basic', 'dodge'],
+        'loot_table': ['goblin_ear', 'rusty_dagger', 'copper_coin']
+    },
+    
+    'wolf': {
+        'name': 'Wolf',
+        'level': 2,
+        'base_health': 35,
+        'base_damage': 8,
+        'base_defense': 4,
+        'speed': 15,
+        'xp_reward': 25,
+        'gold_reward': (5, 12),
+        'abilities': ['bite', 'howl', 'pack_tactics'],
+        'resistances': {},
+        'weaknesses': {'fire': 1.2},
+        'description': 'A lean, gray wolf with yellow eyes. Hunts in packs.',
+        'attack_patterns': ['basic', 'bite', 'howl'],
+        'loot_table': ['wolf_pelt', 'wolf_tooth', 'raw_meat']
+    },
+    
+    'bandit': {
+        'name': 'Bandit',
+        'level': 2,
+        'base_health': 40,
+        'base_damage': 7,
+        'base_defense': 5,
+        'speed': 10,
+        'xp_reward': 30,
+        'gold_reward': (10, 25),
+        'abilities': ['stab', 'intimidate', 'flee'],
+        'resistances': {},
+        'weaknesses': {},
+        'description': 'A rough-looking outlaw wearing tattered leather armor.',
+        'attack_patterns': ['basic', 'stab', 'basic', 'intimidate'],
+        'loot_table': ['leather_armor', 'short_sword', 'gold_coins']
+    },
+    
+    'giant_spider': {
+        'name': 'Giant Spider',
+        'level': 3,
+        'base_health': 45,
+        'base_damage': 10,
+        'base_defense': 6,
+        'speed': 14,
+        'xp_reward': 40,
+        'gold_reward': (8, 15),
+        'abilities': ['bite', 'web', 'poison'],
+        'resistances': {'poison': 0.5},
+        'weaknesses': {'fire': 1.5},
+        'description': 'A massive spider with glowing red eyes. Venom drips from its fangs.',
+        'attack_patterns': ['basic', 'bite', 'web', 'poison'],
+        'loot_table': ['spider_silk', 'venom_sac', 'chitin']
+    },
+    
+    # Tier 2 enemies (level 4-6)
+    'orc': {
+        'name': 'Orc',
+        'level': 4,
+        'base_health': 65,
+        'base_damage': 15,
+        'base_defense': 10,
+        'speed': 8,
+        'xp_reward': 60,
+        'gold_reward': (15, 30),
+        'abilities': ['cleave', 'charge', 'berserk'],
+        'resistances': {'physical': 0.8},
+        'weaknesses': {'holy': 1.3},
+        'description': 'A hulking green brute wielding a massive axe.',
+        'attack_patterns': ['basic', 'cleave', 'charge', 'berserk'],
+        'loot_table': ['orc_axe', 'tusks', 'coarse_fur']
+    },
+    
+    'skeleton': {
+        'name': 'Skeleton Warrior',
+        'level': 4,
+        'base_health': 50,
+        'base_damage': 12,
+        'base_defense': 8,
+        'speed': 11,
+        'xp_reward': 55,
+        'gold_reward': (10, 20),
+        'abilities': ['slash', 'shield_block', 'bone_shield'],
+        'resistances': {'physical': 0.7, 'poison': 0.0},
+        'weaknesses': {'holy': 2.0, 'bludgeoning': 1.3},
+        'description': 'An animated skeleton in rusted chainmail. Its eye sockets glow with blue light.',
+        'attack_patterns': ['basic', 'slash', 'shield_block', 'bone_shield'],
+        'loot_table': ['bone_fragments', 'rusted_sword', 'skull']
+    },
+    
+    'dark_cultist': {
+        'name': 'Dark Cultist',
+        'level': 5,
+        'base_health': 55,
+        'base_damage': 10,
+        'base_defense': 7,
+        'speed': 12,
+        'xp_reward': 75,
+        'gold_reward': (20, 40),
+        'abilities': ['shadow_bolt', 'life_drain', 'summon', 'curse'],
+        'resistances': {'dark': 0.5},
+        'weaknesses': {'holy': 1.8, 'fire': 1.2},
+        'description': 'A robed figure chanting in an ancient tongue. Shadows writhe around them.',
+        'attack_patterns': ['shadow_bolt', 'basic', 'life_drain', 'curse'],
+        'loot_table': ['cultist_robes', 'dark_tome', 'ritual_dagger']
+    },
+    
+    # Tier 3 enemies (level 7-9)
+    'troll': {
+        'name': 'Troll',
+        'level': 7,
+        'base_health': 120,
+        'base_damage': 20,
+        'base_defense': 12,
+        'speed': 6,
+        'xp_reward': 120,
+        'gold_reward': (30, 60),
+        'abilities': ['club_smash', 'regeneration', 'throw_rock', 'rage'],
+        'resistances': {'physical': 0.6, 'fire': 0.5},
+        'weaknesses': {'acid': 1.5, 'fire': 0.8},  # Fire stops regen
+        'description': 'A massive, ugly creature with warty green skin and a foul odor.',
+        'attack_patterns': ['club_smash', 'basic', 'regeneration', 'rage'],
+        'loot_table': ['troll_hide', 'giant_club', 'troll_blood']
+    },
+    
+    'wraith': {
+        'name': 'Wraith',
+        'level': 8,
+        'base_health': 85,
+        'base_damage': 18,
+        'base_defense': 15,
+        'speed': 14,
+        'xp_reward': 150,
+        'gold_reward': (40, 80),
+        'abilities': ['life_drain', 'possess', 'invisibility', 'scream'],
+        'resistances': {'physical': 0.3, 'fire': 0.5, 'ice': 0.5},
+        'weaknesses': {'holy': 2.5, 'lightning': 1.3},
+        'description': 'A ghostly figure that radiates intense cold. It seems to phase in and out of reality.',
+        'attack_patterns': ['life_drain', 'invisibility', 'scream', 'life_drain'],
+        'loot_table': ['ectoplasm', 'soul_shard', 'ethereal_dust']
+    },
+    
+    # Boss enemies
+    'troll_king': {
+        'name': 'Troll King',
+        'level': 10,
+        'base_health': 250,
+        'base_damage': 30,
+        'base_defense': 18,
+        'speed': 8,
+        'xp_reward': 500,
+        'gold_reward': (200, 500),
+        'abilities': ['mighty_smash', 'regeneration', 'earth_shake', 'roar', 'enrage'],
+        'resistances': {'physical': 0.5, 'fire': 0.4},
+        'weaknesses': {'acid': 1.3},
+        'description': 'A colossal troll wearing a crown of bones. The ground shakes with each step.',
+        'attack_patterns': ['mighty_smash', 'roar', 'earth_shake', 'regeneration', 'enrage'],
+        'loot_table': ['troll_crown', 'giant_tooth', 'kingly_trophy']
+    },
+    
+    'dragon': {
+        'name': 'Young Dragon',
+        'level': 12,
+        'base_health': 400,
+        'base_damage': 40,
+        'base_defense': 25,
+        'speed': 12,
+        'xp_reward': 1000,
+        'gold_reward': (500, 1000),
+        'abilities': ['fire_breath', 'claw', 'tail_whip', 'fly', 'fear'],
+        'resistances': {'physical': 0.6, 'fire': 0.2, 'ice': 0.5},
+        'weaknesses': {'lightning': 1.3, 'holy': 1.2},
+        'description': 'A majestic dragon with gleaming scales. Its eyes burn with ancient intelligence.',
+        'attack_patterns': ['fire_breath', 'claw', 'fly', 'fire_breath', 'fear'],
+        'loot_table': ['dragon_scale', 'dragon_heart', 'golden_hoard']
+    }
+})
+
+class Ability(NamedTuple):
+    """A combat ability; fields an ability's data leaves out take these defaults"""
+    name: str
+    description: str = ''
+    damage_mult: float = 1.0
+    accuracy: int = 85
+    damage_type: DamageType = DamageType.PHYSICAL
+    effect: Optional[str] = None
+    effect_power: Optional[float] = None
+    duration: int = 2
+    aoe: bool = False
+    lifesteal: float = 0.0
+    mana_cost: int = 0
+    heal: int = 0
+    self_effect: Optional[str] = None
+    self_damage: float = 0.0
+    self_damage_effect: Optional[str] = None
+    condition: Optional[str] = None
+
+def make_ability(data: Dict) -> Ability:
+    """Build an Ability from its data, turning the damage type name into a DamageType"""
+    return Ability(**{**data, 'damage_type': DamageType(data.get('damage_type', 'physical'))})
+
+def build_abilities(table: Dict[str, Dict]) -> MappingProxyType:
+    """Build a read-only table of Abilities from ability data keyed by ability name"""
+    return MappingProxyType({name: make_ability(data) for name, data in table.items()})
+
+# All combat abilities for enemies and players
+COMBAT_ABILITIES = build_abilities({
+    # Basic abilities
+    'scratch': {
+        'name': 'Scratch',
+        'damage_mult': 0.8,
+        'accuracy': 90,
+        'description': 'A quick, weak attack.',
+        'effect': None
+    },
+    
+    'bite': {
+        'name': 'Bite',
+        'damage_mult': 1.2,
+        'accuracy': 85,
+        'description': 'A powerful bite with sharp teeth.',
+        'effect': 'bleed'  # Causes bleeding over time
+    },
+    
+    'stab': {
+        'name': 'Stab',
+        'damage_mult': 1.3,
+        'accuracy': 80,
+        'description': 'A precise thrust with a blade.',
+        'effect': 'wound'  # Reduces healing
+    },
+    
+    # Special abilities
+    'howl': {
+        'name': 'Howl',
+        'damage_mult': 0,
+        'accuracy': 100,
+        'description': 'A terrifying howl that reduces enemy defense.',
+        'effect': 'reduce_defense',
+        'effect_power': 0.8,  # 20% defense reduction
+        'duration': 3
+    },
+    
+    'pack_tactics': {
+        'name': 'Pack Tactics',
+        'damage_mult': 1.5,
+        'accuracy': 90,
+        'description': 'Coordinate attack for extra damage.',
+        'condition': 'has_ally',
+        'effect': None
+    },
+    
+    'web': {
+        'name': 'Web Shot',
+        'damage_mult': 0.5,
+        'accuracy': 75,
+        'description': 'Shoots sticky webbing to slow the target.',
+        'effect': 'slow',
+        'duration': 2
+    },
+    
+    'poison': {
+        'name': 'Poison Bite',
+        'damage_mult': 0.9,
+        'accuracy': 70,
+        'description': 'A venomous attack that poisons the target.',
+        'effect': 'poison',
+        'effect_power': 3,  # Damage per turn
+        'duration': 4
+    },
+    
+    'cleave': {
+        'name': 'Cleave',
+        'damage_mult': 1.4,
+        'accuracy': 80,
+        'description': 'A sweeping attack that hits multiple targets.',
+        'aoe': True,
+        'effect': None
+    },
+    
+    'charge': {
+        'name': 'Charge',
+        'damage_mult': 1.8,
+        'accuracy': 70,
+        'description': 'A powerful charging attack.',
+        'effect': 'stun',
+        'duration': 1
+    },
+    
+    'berserk': {
+        'name': 'Berserk',
+        'damage_mult': 1.3,
+        'accuracy': 90,
+        'description': 'Attacks wildly, trading defense for damage.',
+        'self_effect': 'increase_damage',
+        'self_damage': 0.1,  # Takes 10% damage
+        'duration': 3
+    },
+    
+    'shield_block': {
+        'name': 'Shield Block',
+        'damage_mult': 0,
+        'accuracy': 100,
+        'description': 'Raise shield to block incoming damage.',
+        'self_effect': 'increase_defense',
+        'effect_power': 1.5,  # 50% defense increase
+        'duration': 2
+    },
+    
+    'bone_shield': {
+        'name': 'Bone Shield',
+        'damage_mult': 0,
+        'accuracy': 100,
+        'description': 'Summon floating bones to protect yourself.',
+        'self_effect': 'damage_shield',
+        'effect_power': 20,  # Absorbs 20 damage
+        'duration': 3
+    },
+    
+    'shadow_bolt': {
+        'name': 'Shadow Bolt',
+        'damage_mult': 1.5,
+        'accuracy': 85,
+        'description': 'A bolt of dark magic.',
+        'damage_type': 'dark',
+        'effect': None
+    },
+    
+    'life_drain': {
+        'name': 'Life Drain',
+        'damage_mult': 1.1,
+        'accuracy': 80,
+        'description': 'Drains life from the target.',
+        'damage_type': 'dark',
+        'lifesteal': 0.5,  # Heals for 50% of damage
+        'effect': None
+    },
+    
+    'curse': {
+        'name': 'Curse',
+        'damage_mult': 0,
+        'accuracy': 70,
+        'description': 'Curses the target, reducing all stats.',
+        'effect': 'reduce_all',
+        'effect_power': 0.7,  # 30% reduction
+        'duration': 3
+    },
+    
+    'regeneration': {
+        'name': 'Regeneration',
+        'damage_mult': 0,
+        'accuracy': 100,
+        'description': 'Rapidly regenerate health.',
+        'self_effect': 'heal_over_time',
+        'effect_power': 10,  # Heal 10 per turn
+        'duration': 3
+    },
+    
+    'rage': {
+        'name': 'Rage',
+        'damage_mult': 1.0,
+        'accuracy': 100,
+        'description': 'Enter a rage, increasing damage but decreasing defense.',
+        'self_effect': 'berserk_mode',
+        'effect_power': 1.3,  # 30% damage increase
+        'self_damage_effect': 'reduce_defense',
+        'duration': 4
+    },
+    
+    'fire_breath': {
+        'name': 'Fire Breath',
+        'damage_mult': 2.0,
+        'accuracy': 80,
+        'description': 'Breathes a cone of searing flame.',
+        'damage_type': 'fire',
+        'aoe': True,
+        'effect': 'burn',
+        'effect_power': 8,  # Burn damage per turn
+        'duration': 3
+    },
+    
+    'fear': {
+        'name': 'Fearsome Presence',
+        'damage_mult': 0,
+        'accuracy': 60,
+        'description': 'Instills fear in the target.',
+        'effect': 'fear',  # Chance to skip turn
+        'duration': 2
+    }
+})
+
+# Used in place of abilities that aren't in COMBAT_ABILITIES
+DEFAULT_ABILITY = COMBAT_ABILITIES['scratch']
+
+def resolve_abilities(names: List[str]) -> Tuple[Ability, ...]:
+    """Look up each ability by name, using Scratch for unknown abilities"""
+    return tuple(COMBAT_ABILITIES.get(name, DEFAULT_ABILITY) for name in names)
+
+# Abilities the player can learn
+PLAYER_ABILITIES = build_abilities({
+    'power_attack': {
+        'name': 'Power Attack',
+        'damage_mult': 1.5,
+        'mana_cost': 5,
+        'accuracy': 75,
+        'description': 'A powerful but slower attack'
+    },
+    'quick_strike': {
+        'name': 'Quick Strike',
+        'damage_mult': 0.8,
+        'mana_cost': 3,
+        'accuracy': 95,
+        'description': 'A fast attack that\'s hard to dodge'
+    },
+    'shield_bash': {
+        'name': 'Shield Bash',
+        'damage_mult': 1.0,
+        'mana_cost': 4,
+        'accuracy': 80,
+        'effect': 'stun',
+        'description': 'Bash with your shield to stun the enemy'
+    },
+    'healing_light': {
+        'name': 'Healing Light',
+        'damage_mult': 0,
+        'mana_cost': 10,
+        'heal': 25,
+        'description': 'Heal yourself with holy light'
+    },
+    'fireball': {
+        'name': 'Fireball',
+        'damage_mult': 1.8,
+        'mana_cost': 15,
+        'damage_type': 'fire',
+        'accuracy': 70,
+        'description': 'Hurl a ball of fire at your enemy'
+    }
+})
+
+# Effects of items usable in combat; damage types are DamageType members, so resistances apply
+ITEM_EFFECTS = MappingProxyType({
+    'health_potion': (
+        {'type': 'heal', 'amount': 30},
+    ),
+    'mana_potion': (
+        {'type': 'mana', 'amount': 20},
+    ),
+    'bomb': (
+        {'type': 'damage', 'amount': 25, 'damage_type': DamageType.FIRE},
+    ),
+    'poison_dagger': (
+        {'type': 'damage', 'amount': 15},
+        {'type': 'effect', 'effect': 'poison', 'duration': 3},
+    )
+})
+
+@lru_cache(maxsize=None)
+def enemy_attack_pattern(enemy_type: str) -> Tuple[Ability, ...]:
+    """Resolve an enemy type's attack pattern to abilities the first time it is fought"""
+    return resolve_abilities(ENEMY_TYPES[enemy_type]['attack_patterns'])
+
+# All status effects and their mechanics. 'on_turn' is a (kind, amount, damage type)
+# tuple: 'damage' deals the amount once per stack, 'skip' makes the target lose its turn
+STATUS_EFFECTS = MappingProxyType({
+    'bleed': {
+        'name': 'Bleeding',
+        'description': 'Taking damage over time',
+        'on_turn': ('damage', 5, DamageType.TRUE),
+        'on_end': None,
+        'stack': True,
+        'max_stacks': 3
+    },
+    
+    'poison': {
+        'name': 'Poisoned',
+        'description': 'Taking poison damage over time',
+        'on_turn': ('damage', 4, DamageType.POISON),
+        'on_end': None,
+        'stack': True,
+        'max_stacks': 5
+    },
+    
+    'burn': {
+        'name': 'Burning',
+        'description': 'Consumed by flames',
+        'on_turn': ('damage', 8, DamageType.FIRE),
+        'on_end': None,
+        'stack': False
+    },
+    
+    'slow': {
+        'name': 'Slowed',
+        'description': 'Movement and attacks are sluggish',
+        'modifier': {'speed': 0.5, 'accuracy': 0.8},
+        'stack': False
+    },
+    
+    'stun': {
+        'name': 'Stunned',
+        'description': 'Unable to act',
+        'on_turn': ('skip', None, None),
+        'stack': False
+    },
+    
+    'fear': {
+        'name': 'Frightened',
+        'description': 'Chance to skip turn',
+        'modifier': {'accuracy': 0.7},
+        'on_turn_roll': 0.3,  # 30% chance to skip
+        'stack': False
+    },
+    
+    'wound': {
+        'name': 'Wounded',
+        'description': 'Healing is less effective',
+        'modifier': {'healing_received': 0.5},
+        'stack': False
+    },
+    
+    'bless': {
+        'name': 'Blessed',
+        'description': 'Holy power increases all stats',
+        'modifier': {'damage': 1.2, 'defense': 1.2, 'accuracy': 1.1},
+        'stack': False
+    },
+    
+    'fortify': {
+        'name': 'Fortified',
+        'description': 'Increased defenses',
+        'modifier': {'defense': 1.5},
+        'stack': False
+    },
+    
+    'haste': {
+        'name': 'Hasted',
+        'description': 'Increased speed and reflexes',
+        'modifier': {'speed': 1.5, 'accuracy': 1.2},
+        'stack': False
+    }
+})
+
+# Message shown when each status effect is applied, filled in with the target's name
+STATUS_MESSAGES = MappingProxyType({
+    name: f"{{}} is now {data['name']}!" for name, data in STATUS_EFFECTS.items()
+})
+
+# Damage multipliers are fixed-point integers: damage taken is (amount * multiplier) >> DAMAGE_SHIFT
+DAMAGE_SHIFT = 16
+
+def fixed_multiplier(multiplier: float) -> int:
+    """Convert a damage multiplier to fixed point, rounding up so whole results aren't truncated"""
+    return math.ceil(round(multiplier * (1 << DAMAGE_SHIFT), 6))
+
+# Damage profile (multiplier, flat reduction, minimum) for damage types an enemy has no entry for
+UNRESISTED_DAMAGE = (1 << DAMAGE_SHIFT, 0, 0)
+
+# Title and divider at the top of the combat status
+COMBAT_STATUS_HEADER = f"\n{Colors.COMBAT}⚔️ COMBAT STATUS{Colors.RESET}\n" + TextFormatter.divider('-', 40)
+
+# Help text listing the combat actions
+COMBAT_ACTIONS = "\n".join([
+    f"\n{Colors.INFO}⚡ Available Actions:{Colors.RESET}",
+    "  attack  - Perform a basic attack",
+    "  defend  - Take defensive stance",
+    "  ability - Use special ability",
+    "  use     - Use an item",
+    "  flee    - Attempt to run away",
+    ""
+])
+
+# Shared empty default for missing player lists, so lookups don't allocate one
+NOTHING = ()
+
+# Number of recent combat log entries kept, all of which are shown
+COMBAT_LOG_SIZE = 5
+
+# Bytes of randomness drawn at a time for combat rolls (two per roll)
+ROLL_BUFFER_BYTES = 4096
+
+def take_aoe_damage(enemies: List, amount: int, damage_type: DamageType = DamageType.PHYSICAL) -> List[int]:
+    """Deal an area attack to every enemy in one vectorized step, returning the damage each took"""
+    if not enemies:
+        return []
+    
+    # One row of (multiplier, reduction, minimum) per enemy, same formula as Enemy.take_damage
+    profiles = np.array([enemy.damage_profile.get(damage_type, UNRESISTED_DAMAGE) for enemy in enemies],
+                        dtype=np.int64)
+    multipliers, reductions, minimums = profiles.T
+    damage = np.maximum(minimums, (amount * multipliers >> DAMAGE_SHIFT) - reductions).tolist()
+    
+    for enemy, taken in zip(enemies, damage):
+        enemy.health -= taken
+    
+    return damage
+
+def scale_enemy_stats(data: Dict, level_mult: float) -> Tuple:
+    """Scale an enemy's stats by its level multiplier and build its damage profile"""
+    defense = int(data['base_defense'] * level_mult)
+    resistances = data.get('resistances', {})
+    weaknesses = data.get('weaknesses', {})
+    
+    # How each damage type is taken: (fixed-point multiplier, flat reduction, minimum).
+    # The multiplier combines resistance and weakness; only physical
+    # damage is reduced by defense, and it always deals at least 1.
+    damage_profile = MappingProxyType({
+        damage_type: (
+            fixed_multiplier(resistances.get(damage_type, 1.0) * weaknesses.get(damage_type, 1.0)),
+            defense if damage_type is DamageType.PHYSICAL else 0,
+            1 if damage_type is DamageType.PHYSICAL else 0
+        )
+        for damage_type in DamageType
+    })
+    
+    return (
+        int(data['base_health'] * level_mult),
+        int(data['base_damage'] * level_mult),
+        defense,
+        int(data['xp_reward'] * level_mult),
+        int(data['gold_reward'][1] * level_mult),
+        damage_profile
+    )
+
+@lru_cache(maxsize=256)
+def scaled_enemy_stats(enemy_type: str, level_mult: float) -> Tuple:
+    """Scaled stats for a standard enemy type, computed once per level multiplier"""
+    return scale_enemy_stats(ENEMY_TYPES[enemy_type], level_mult)
+
+class StatusState:
+    """A status effect active on an enemy: turns left, stacks and the effect's data"""
+    
+    __slots__ = ('duration', 'stacks', 'data')
+    
+    def __init__(self, duration: int, data: Dict):
+        self.duration = duration
+        self.stacks = 1
+        self.data = data
+
+class Enemy:
+    """Enemy class for combat instances"""
+    
+    __slots__ = (
+        'type', 'data', 'max_health', 'health', 'damage', 'defense', 'speed',
+        'name', 'abilities', 'attack_patterns', 'pattern_abilities', 'pattern_cycle',
+        'status_effects', 'buffs', 'debuffs', 'xp_reward', 'gold_min', 'gold_max',
+        'gold_reward', 'description', 'resistances', 'weaknesses', 'damage_profile',
+        'stunned', 'fleeing', 'taunted', 'taunt_target'
+    )
+    
+    def __init__(self, enemy_type: str, level_mult: float = 1.0, enemy_data: Dict = ENEMY_TYPES):
+        self.type = enemy_type
+        self.data = enemy_data[enemy_type]
+        if enemy_data is not ENEMY_TYPES:
+            self.data = normalize_enemy_data(self.data)
+        
+        # Scale stats based on level, shared between spawns of standard enemies
+        if enemy_data is ENEMY_TYPES:
+            stats = scaled_enemy_stats(enemy_type, level_mult)
+        else:
+            stats = scale_enemy_stats(self.data, level_mult)
+        
+        (self.max_health, self.damage, self.defense,
+         self.xp_reward, gold_max_scaled, self.damage_profile) = stats
+        self.health = self.max_health
+        self.speed = self.data['speed']
+        
+        self.name = self.data['name']
+        self.abilities = self.data['abilities']
+        self.attack_patterns = self.data['attack_patterns']
+        if enemy_data is ENEMY_TYPES:
+            self.pattern_abilities = enemy_attack_pattern(enemy_type)
+        else:
+            self.pattern_abilities = resolve_abilities(self.attack_patterns)
+        self.pattern_cycle = cycle(self.pattern_abilities)
+        
+        self.status_effects = {}  # effect name -> StatusState
+        self.buffs = []
+        self.debuffs = []
+        
+        self.gold_min, self.gold_max = self.data['gold_reward']
+        self.gold_reward = random.randint(self.gold_min, gold_max_scaled)
+        
+        self.description = self.data['description']
+        self.resistances = self.data.get('resistances', {})
+        self.weaknesses = self.data.get('weaknesses', {})
+        
+        self.stunned = False
+        self.fleeing = False
+        self.taunted = False
+        self.taunt_target = None
+        
+    def take_damage(self, amount: int, damage_type: DamageType = DamageType.PHYSICAL) -> int:
+        """Calculate damage taken with resistances/weaknesses"""
+        
+        # Apply resistances, weaknesses and defense in one step
+        multiplier, reduction, minimum = self.damage_profile.get(damage_type, UNRESISTED_DAMAGE)
+        final_damage = max(minimum, (amount * multiplier >> DAMAGE_SHIFT) - reduction)
+        
+        self.health -= final_damage
+        return final_damage
+    
+    def heal(self, amount: int) -> int:
+        """Heal the enemy"""
+        old_health = self.health
+        self.health = min(self.max_health, self.health + amount)
+        return self.health - old_health
+    
+    def is_alive(self) -> bool:
+        return self.health > 0
+    
+    def get_next_ability(self) -> Ability:
+        """Get the next ability in the attack pattern"""
+        return next(self.pattern_cycle)
+    
+    def apply_status(self, effect: str, duration: int):
+        """Apply status effect"""
+        effect_data = STATUS_EFFECTS.get(effect)
+        if effect_data is None:
+            return
+        
+        state = self.status_effects.get(effect)
+        if state is None:
+            self.status_effects[effect] = StatusState(duration, effect_data)
+            return
+        
+        # Reapplying refreshes the effect, and adds a stack if it stacks
+        state.duration = max(state.duration, duration)
+        if effect_data.get('stack') and state.stacks < effect_data.get('max_stacks', 1):
+            state.stacks += 1
+    
+    def process_status_effects(self):
+        """Process status effects at turn start"""
+        for name, state in list(self.status_effects.items()):
+            effect_data = state.data
+            on_turn = effect_data.get('on_turn')
+            if on_turn:
+                kind, amount, damage_type = on_turn
+                if kind == 'damage':
+                    for _ in range(state.stacks):
+                        self.take_damage(amount, damage_type)
+                elif kind == 'skip':
+                    self.skip_turn()
+            
+            state.duration -= 1
+            if state.duration <= 0:
+                on_end = effect_data.get('on_end')
+                if on_end:
+                    on_end(self)
+                del self.status_effects[name]
+    
+    def skip_turn(self):
+        """Skip current turn (for stun)"""
+        self.stunned = True
+    
+    def get_status_string(self) -> str:
+        """Get formatted status effect string"""
+        if not self.status_effects:
+            return ""
+        
+        effects = []
+        for state in self.status_effects.values():
+            effects.append(f"{state.data['name']}({state.duration})")
+        
+        return f" [{', '.join(effects)}]"
+    
+    def __str__(self) -> str:
+        return f"{self.name} (HP: {self.health}/{self.max_health}){self.get_status_string()}"
+
+@lru_cache(maxsize=None)
+def enemy_class(enemy_type: str) -> type:
+    """
+    Build an Enemy subclass bound to one standard enemy type
+    Its __init__ takes only the level multiplier and defers to Enemy.__init__, so the
+    two can never disagree; the type's scaled stats and attack pattern are cached.
+    """
+    if enemy_type not in ENEMY_TYPES:
+        raise KeyError(enemy_type)
+    
+    def __init__(self, level_mult: float = 1.0):
+        Enemy.__init__(self, enemy_type, level_mult)
+    
+    class_name = ''.join(part.title() for part in enemy_type.split('_')) + 'Enemy'
+    return type(class_name, (Enemy,), {'__slots__': (), '__init__': __init__})
+
+def simulate_attacks(enemy_type: str, damage_base: int, hit_chance: float, fights: int,
+                     level_mult: float = 1.0, max_turns: int = 100) -> np.ndarray:
+    """Simulate many fights of basic attacks against one enemy type at once, for balance tuning.
+    
+    Follows player_attack: a d100 hit roll, damage_base + d5 damage, and a 1 in 20 critical
+    hit for half damage again. Returns the turn each fight was won on, or -1 if not won.
+    """
+    enemy = enemy_class(enemy_type)(level_mult)
+    multiplier, reduction, minimum = enemy.damage_profile[DamageType.PHYSICAL]
+    rng = np.random.default_rng(random.getrandbits(64))
+    
+    health = np.full(fights, enemy.max_health, dtype=np.int64)
+    won_on = np.full(fights, -1, dtype=np.int64)
+    
+    for turn in range(1, max_turns + 1):
+        fighting = health > 0
+        if not fighting.any():
+            break
+        
+        hits = fighting & (rng.integers(1, 101, fights) <= hit_chance)
+        crits = hits & (rng.integers(1, 21, fights) == 20)
+        damage = damage_base + rng.integers(1, 6, fights)
+        
+        dealt = np.maximum(minimum, (damage * multiplier >> DAMAGE_SHIFT) - reduction)
+        crit_dealt = np.maximum(minimum, (damage // 2 * multiplier >> DAMAGE_SHIFT) - reduction)
+        health -= np.where(hits, dealt, 0) + np.where(crits, crit_dealt, 0)
+        
+        won_on[fighting & (health <= 0)] = turn
+    
+    return won_on
+
+def flee_probability(player_speed: float, enemy_speed: float):
+    """
+    Chance of fleeing: 30%, plus 5% per point of speed over the enemy, capped between 10% and 70%
+    Works on single speeds and on numpy arrays of speeds alike, for batch simulations.
+    """
+    chance = 0.3 + (player_speed - enemy_speed) * 0.05
+    if isinstance(chance, np.ndarray):
+        return np.clip(chance, 0.1, 0.7)
+    return max(0.1, min(0.7, chance))
+
+@lru_cache(maxsize=128)
+def build_health_bar(filled: int, length: int, color: str) -> str:
+    """Build a colored health bar; there are only a few distinct bars, so each is built once"""
+    return f"{color}{'█' * filled}{'░' * (length - filled)}{Colors.RESET}"
+
 class CombatSystem:
     """
     Main combat system handling all battle mechanics
     """
     
+    __slots__ = (
+        'player', 'enemy', 'state', 'turn_count', 'combat_log', 'battle_flags',
+        'player_buffs', 'enemy_buffs', 'player_debuffs', 'enemy_debuffs',
+        'player_damage_mult', 'player_defense_mult',
+        'player_damage_base', 'player_hit_chance', 'player_abilities',
+        'roll_values', 'roll_position',
+        'enemy_types', 'abilities', 'status_effects'
+    )
+    
     def __init__(self, player: Dict):
         self.player = player
         self.enemy = None
         self.state = CombatState.ACTIVE
         self.turn_count = 0
-        self.combat_log = []
+        self.combat_log = deque(maxlen=COMBAT_LOG_SIZE)
         self.battle_flags = {}
         
         # Combat modifiers
@@ -50,598 +935,30 @@ class CombatSystem:
         self.player_debuffs = []
         self.enemy_debuffs = []
         
-        # Initialize combat data
-        self.setup_enemy_types()
-        self.setup_combat_abilities()
-        self.setup_status_effects()
-        
-    def setup_enemy_types(self):
-        """Define all possible enemy types and their stats"""
-        
-        self.enemy_types = {
-            # Tier 1 enemies (level 1-3)
-            'goblin': {
-                'name': 'Goblin',
-                'level': 1,
-                'base_health': 25,
-                'base_damage': 5,
-                'base_defense': 3,
-                'speed': 12,
-                'xp_reward': 15,
-                'gold_reward': (3, 8),
-                'abilities': ['scratch', 'dodge'],
-                'resistances': {},
-                'weaknesses': {'physical': 1.2},
-                'description': 'A small, green, cowardly creature with sharp teeth.',
-                'attack_patterns': ['basic', 'basic', 'dodge'],
-                'loot_table': ['goblin_ear', 'rusty_dagger', 'copper_coin']
-            },
-            
-            'wolf': {
-                'name': 'Wolf',
-                'level': 2,
-                'base_health': 35,
-                'base_damage': 8,
-                'base_defense': 4,
-                'speed': 15,
-                'xp_reward': 25,
-                'gold_reward': (5, 12),
-                'abilities': ['bite', 'howl', 'pack_tactics'],
-                'resistances': {},
-                'weaknesses': {'fire': 1.2},
-                'description': 'A lean, gray wolf with yellow eyes. Hunts in packs.',
-                'attack_patterns': ['basic', 'bite', 'howl'],
-                'loot_table': ['wolf_pelt', 'wolf_tooth', 'raw_meat']
-            },
-            
-            'bandit': {
-                'name': 'Bandit',
-                'level': 2,
-                'base_health': 40,
-                'base_damage': 7,
-                'base_defense': 5,
-                'speed': 10,
-                'xp_reward': 30,
-                'gold_reward': (10, 25),
-                'abilities': ['stab', 'intimidate', 'flee'],
-                'resistances': {},
-                'weaknesses': {},
-                'description': 'A rough-looking outlaw wearing tattered leather armor.',
-                'attack_patterns': ['basic', 'stab', 'basic', 'intimidate'],
-                'loot_table': ['leather_armor', 'short_sword', 'gold_coins']
-            },
-            
-            'giant_spider': {
-                'name': 'Giant Spider',
-                'level': 3,
-                'base_health': 45,
-                'base_damage': 10,
-                'base_defense': 6,
-                'speed': 14,
-                'xp_reward': 40,
-                'gold_reward': (8, 15),
-                'abilities': ['bite', 'web', 'poison'],
-                'resistances': {'poison': 0.5},
-                'weaknesses': {'fire': 1.5},
-                'description': 'A massive spider with glowing red eyes. Venom drips from its fangs.',
-                'attack_patterns': ['basic', 'bite', 'web', 'poison'],
-                'loot_table': ['spider_silk', 'venom_sac', 'chitin']
-            },
-            
-            # Tier 2 enemies (level 4-6)
-            'orc': {
-                'name': 'Orc',
-                'level': 4,
-                'base_health': 65,
-                'base_damage': 15,
-                'base_defense': 10,
-                'speed': 8,
-                'xp_reward': 60,
-                'gold_reward': (15, 30),
-                'abilities': ['cleave', 'charge', 'berserk'],
-                'resistances': {'physical': 0.8},
-                'weaknesses': {'holy': 1.3},
-                'description': 'A hulking green brute wielding a massive axe.',
-                'attack_patterns': ['basic', 'cleave', 'charge', 'berserk'],
-                'loot_table': ['orc_axe', 'tusks', 'coarse_fur']
-            },
-            
-            'skeleton': {
-                'name': 'Skeleton Warrior',
-                'level': 4,
-                'base_health': 50,
-                'base_damage': 12,
-                'base_defense': 8,
-                'speed': 11,
-                'xp_reward': 55,
-                'gold_reward': (10, 20),
-                'abilities': ['slash', 'shield_block', 'bone_shield'],
-                'resistances': {'physical': 0.7, 'poison': 0.0},
-                'weaknesses': {'holy': 2.0, 'bludgeoning': 1.3},
-                'description': 'An animated skeleton in rusted chainmail. Its eye sockets glow with blue light.',
-                'attack_patterns': ['basic', 'slash', 'shield_block', 'bone_shield'],
-                'loot_table': ['bone_fragments', 'rusted_sword', 'skull']
-            },
-            
-            'dark_cultist': {
-                'name': 'Dark Cultist',
-                'level': 5,
-                'base_health': 55,
-                'base_damage': 10,
-                'base_defense': 7,
-                'speed': 12,
-                'xp_reward': 75,
-                'gold_reward': (20, 40),
-                'abilities': ['shadow_bolt', 'life_drain', 'summon', 'curse'],
-                'resistances': {'dark': 0.5},
-                'weaknesses': {'holy': 1.8, 'fire': 1.2},
-                'description': 'A robed figure chanting in an ancient tongue. Shadows writhe around them.',
-                'attack_patterns': ['shadow_bolt', 'basic', 'life_drain', 'curse'],
-                'loot_table': ['cultist_robes', 'dark_tome', 'ritual_dagger']
-            },
-            
-            # Tier 3 enemies (level 7-9)
-            'troll': {
-                'name': 'Troll',
-                'level': 7,
-                'base_health': 120,
-                'base_damage': 20,
-                'base_defense': 12,
-                'speed': 6,
-                'xp_reward': 120,
-                'gold_reward': (30, 60),
-                'abilities': ['club_smash', 'regeneration', 'throw_rock', 'rage'],
-                'resistances': {'physical': 0.6, 'fire': 0.5},
-                'weaknesses': {'acid': 1.5, 'fire': 0.8},  # Fire stops regen
-                'description': 'A massive, ugly creature with warty green skin and a foul odor.',
-                'attack_patterns': ['club_smash', 'basic', 'regeneration', 'rage'],
-                'loot_table': ['troll_hide', 'giant_club', 'troll_blood']
-            },
-            
-            'wraith': {
-                'name': 'Wraith',
-                'level': 8,
-                'base_health': 85,
-                'base_damage': 18,
-                'base_defense': 15,
-                'speed': 14,
-                'xp_reward': 150,
-                'gold_reward': (40, 80),
-                'abilities': ['life_drain', 'possess', 'invisibility', 'scream'],
-                'resistances': {'physical': 0.3, 'fire': 0.5, 'ice': 0.5},
-                'weaknesses': {'holy': 2.5, 'lightning': 1.3},
-                'description': 'A ghostly figure that radiates intense cold. It seems to phase in and out of reality.',
-                'attack_patterns': ['life_drain', 'invisibility', 'scream', 'life_drain'],
-                'loot_table': ['ectoplasm', 'soul_shard', 'ethereal_dust']
-            },
-            
-            # Boss enemies
-            'troll_king': {
-                'name': 'Troll King',
-                'level': 10,
-                'base_health': 250,
-                'base_damage': 30,
-                'base_defense': 18,
-                'speed': 8,
-                'xp_reward': 500,
-                'gold_reward': (200, 500),
-                'abilities': ['mighty_smash', 'regeneration', 'earth_shake', 'roar', 'enrage'],
-                'resistances': {'physical': 0.5, 'fire': 0.4},
-                'weaknesses': {'acid': 1.3},
-                'description': 'A colossal troll wearing a crown of bones. The ground shakes with each step.',
-                'attack_patterns': ['mighty_smash', 'roar', 'earth_shake', 'regeneration', 'enrage'],
-                'loot_table': ['troll_crown', 'giant_tooth', 'kingly_trophy']
-            },
-            
-            'dragon': {
-                'name': 'Young Dragon',
-                'level': 12,
-                'base_health': 400,
-                'base_damage': 40,
-                'base_defense': 25,
-                'speed': 12,
-                'xp_reward': 1000,
-                'gold_reward': (500, 1000),
-                'abilities': ['fire_breath', 'claw', 'tail_whip', 'fly', 'fear'],
-                'resistances': {'physical': 0.6, 'fire': 0.2, 'ice': 0.5},
-                'weaknesses': {'lightning': 1.3, 'holy': 1.2},
-                'description': 'A majestic dragon with gleaming scales. Its eyes burn with ancient intelligence.',
-                'attack_patterns': ['fire_breath', 'claw', 'fly', 'fire_breath', 'fear'],
-                'loot_table': ['dragon_scale', 'dragon_heart', 'golden_hoard']
-            }
-        }
+        # Combined multipliers of the player's buffs, kept in step by apply_buff/expire_buff
+        self.player_damage_mult = 1.0
+        self.player_defense_mult = 1.0
         
-    def setup_combat_abilities(self):
-        """Define all combat abilities for enemies and players"""
-        
-        self.abilities = {
-            # Basic abilities
-            'scratch': {
-                'name': 'Scratch',
-                'damage_mult': 0.8,
-                'accuracy': 90,
-                'description': 'A quick, weak attack.',
-                'effect': None
-            },
-            
-            'bite': {
-                'name': 'Bite',
-                'damage_mult': 1.2,
-                'accuracy': 85,
-                'description': 'A powerful bite with sharp teeth.',
-                'effect': 'bleed'  # Causes bleeding over time
-            },
-            
-            'stab': {
-                'name': 'Stab',
-                'damage_mult': 1.3,
-                'accuracy': 80,
-                'description': 'A precise thrust with a blade.',
-                'effect': 'wound'  # Reduces healing
-            },
-            
-            # Special abilities
-            'howl': {
-                'name': 'Howl',
-                'damage_mult': 0,
-                'accuracy': 100,
-                'description': 'A terrifying howl that reduces enemy defense.',
-                'effect': 'reduce_defense',
-                'effect_power': 0.8,  # 20% defense reduction
-                'duration': 3
-            },
-            
-            'pack_tactics': {
-                'name': 'Pack Tactics',
-                'damage_mult': 1.5,
-                'accuracy': 90,
-                'description': 'Coordinate attack for extra damage.',
-                'condition': 'has_ally',
-                'effect': None
-            },
-            
-            'web': {
-                'name': 'Web Shot',
-                'damage_mult': 0.5,
-                'accuracy': 75,
-                'description': 'Shoots sticky webbing to slow the target.',
-                'effect': 'slow',
-                'duration': 2
-            },
-            
-            'poison': {
-                'name': 'Poison Bite',
-                'damage_mult': 0.9,
-                'accuracy': 70,
-                'description': 'A venomous attack that poisons the target.',
-                'effect': 'poison',
-                'effect_power': 3,  # Damage per turn
-                'duration': 4
-            },
-            
-            'cleave': {
-                'name': 'Cleave',
-                'damage_mult': 1.4,
-                'accuracy': 80,
-                'description': 'A sweeping attack that hits multiple targets.',
-                'aoe': True,
-                'effect': None
-            },
-            
-            'charge': {
-                'name': 'Charge',
-                'damage_mult': 1.8,
-                'accuracy': 70,
-                'description': 'A powerful charging attack.',
-                'effect': 'stun',
-                'duration': 1
-            },
-            
-            'berserk': {
-                'name': 'Berserk',
-                'damage_mult': 1.3,
-                'accuracy': 90,
-                'description': 'Attacks wildly, trading defense for damage.',
-                'self_effect': 'increase_damage',
-                'self_damage': 0.1,  # Takes 10% damage
-                'duration': 3
-            },
-            
-            'shield_block': {
-                'name': 'Shield Block',
-                'damage_mult': 0,
-                'accuracy': 100,
-                'description': 'Raise shield to block incoming damage.',
-                'self_effect': 'increase_defense',
-                'effect_power': 1.5,  # 50% defense increase
-                'duration': 2
-            },
-            
-            'bone_shield': {
-                'name': 'Bone Shield',
-                'damage_mult': 0,
-                'accuracy': 100,
-                'description': 'Summon floating bones to protect yourself.',
-                'self_effect': 'damage_shield',
-                'effect_power': 20,  # Absorbs 20 damage
-                'duration': 3
-            },
-            
-            'shadow_bolt': {
-                'name': 'Shadow Bolt',
-                'damage_mult': 1.5,
-                'accuracy': 85,
-                'description': 'A bolt of dark magic.',
-                'damage_type': 'dark',
-                'effect': None
-            },
-            
-            'life_drain': {
-                'name': 'Life Drain',
-                'damage_mult': 1.1,
-                'accuracy': 80,
-                'description': 'Drains life from the target.',
-                'damage_type': 'dark',
-                'lifesteal': 0.5,  # Heals for 50% of damage
-                'effect': None
-            },
-            
-            'curse': {
-                'name': 'Curse',
-                'damage_mult': 0,
-                'accuracy': 70,
-                'description': 'Curses the target, reducing all stats.',
-                'effect': 'reduce_all',
-                'effect_power': 0.7,  # 30% reduction
-                'duration': 3
-            },
-            
-            'regeneration': {
-                'name': 'Regeneration',
-                'damage_mult': 0,
-                'accuracy': 100,
-                'description': 'Rapidly regenerate health.',
-                'self_effect': 'heal_over_time',
-                'effect_power': 10,  # Heal 10 per turn
-                'duration': 3
-            },
-            
-            'rage': {
-                'name': 'Rage',
-                'damage_mult': 1.0,
-                'accuracy': 100,
-                'description': 'Enter a rage, increasing damage but decreasing defense.',
-                'self_effect': 'berserk_mode',
-                'effect_power': 1.3,  # 30% damage increase
-                'self_damage_effect': 'reduce_defense',
-                'duration': 4
-            },
-            
-            'fire_breath': {
-                'name': 'Fire Breath',
-                'damage_mult': 2.0,
-                'accuracy': 80,
-                'description': 'Breathes a cone of searing flame.',
-                'damage_type': 'fire',
-                'aoe': True,
-                'effect': 'burn',
-                'effect_power': 8,  # Burn damage per turn
-                'duration': 3
-            },
-            
-            'fear': {
-                'name': 'Fearsome Presence',
-                'damage_mult': 0,
-                'accuracy': 60,
-                'description': 'Instills fear in the target.',
-                'effect': 'fear',  # Chance to skip turn
-                'duration': 2
-            }
-        }
+        # Player stats read every turn, refreshed by sync_player_stats()
+        self.sync_player_stats()
         
-    def setup_status_effects(self):
-        """Define all status effects and their mechanics"""
-        
-        self.status_effects = {
-            'bleed': {
-                'name': 'Bleeding',
-                'description': 'Taking damage over time',
-                'on_turn': lambda target: target.take_damage(5, DamageType.TRUE),
-                'on_end': None,
-                'stack': True,
-                'max_stacks': 3
-            },
-            
-            'poison': {
-                'name': 'Poisoned',
-                'description': 'Taking poison damage over time',
-                'on_turn': lambda target: target.take_damage(4, DamageType.POISON),
-                'on_end': None,
-                'stack': True,
-                'max_stacks': 5
-            },
-            
-            'burn': {
-                'name': 'Burning',
-                'description': 'Consumed by flames',
-                'on_turn': lambda target: target.take_damage(8, DamageType.FIRE),
-                'on_end': None,
-                'stack': False
-            },
-            
-            'slow': {
-                'name': 'Slowed',
-                'description': 'Movement and attacks are sluggish',
-                'modifier': {'speed': 0.5, 'accuracy': 0.8},
-                'stack': False
-            },
-            
-            'stun': {
-                'name': 'Stunned',
-                'description': 'Unable to act',
-                'on_turn': lambda target: target.skip_turn(),
-                'stack': False
-            },
-            
-            'fear': {
-                'name': 'Frightened',
-                'description': 'Chance to skip turn',
-                'modifier': {'accuracy': 0.7},
-                'on_turn_roll': 0.3,  # 30% chance to skip
-                'stack': False
-            },
-            
-            'wound': {
-                'name': 'Wounded',
-                'description': 'Healing is less effective',
-                'modifier': {'healing_received': 0.5},
-                'stack': False
-            },
-            
-            'bless': {
-                'name': 'Blessed',
-                'description': 'Holy power increases all stats',
-                'modifier': {'damage': 1.2, 'defense': 1.2, 'accuracy': 1.1},
-                'stack': False
-            },
-            
-            'fortify': {
-                'name': 'Fortified',
-                'description': 'Increased defenses',
-                'modifier': {'defense': 1.5},
-                'stack': False
-            },
-            
-            'haste': {
-                'name': 'Hasted',
-                'description': 'Increased speed and reflexes',
-                'modifier': {'speed': 1.5, 'accuracy': 1.2},
-                'stack': False
-            }
-        }
-    
-    class Enemy:
-        """Enemy class for combat instances"""
+        # Buffered 16-bit random values for dice rolls, refilled in bulk
+        self.roll_values = memoryview(b'').cast('H')
+        self.roll_position = 0
         
-        def __init__(self, enemy_type: str, level_mult: float = 1.0, enemy_data: Dict = None):
-            self.type = enemy_type
-            self.data = enemy_data[enemy_type]
-            
-            # Scale stats based on level
-            level = self.data['level'] * level_mult
-            
-            self.max_health = int(self.data['base_health'] * level_mult)
-            self.health = self.max_health
-            self.damage = int(self.data['base_damage'] * level_mult)
-            self.defense = int(self.data['base_defense'] * level_mult)
-            self.speed = self.data['speed']
-            
-            self.name = self.data['name']
-            self.abilities = self.data['abilities']
-            self.attack_patterns = self.data['attack_patterns']
-            self.pattern_index = 0
-            
-            self.status_effects = []
-            self.buffs = []
-            self.debuffs = []
-            
-            self.xp_reward = int(self.data['xp_reward'] * level_mult)
-            self.gold_min, self.gold_max = self.data['gold_reward']
-            self.gold_reward = random.randint(self.gold_min, int(self.gold_max * level_mult))
-            
-            self.description = self.data['description']
-            self.resistances = self.data.get('resistances', {})
-            self.weaknesses = self.data.get('weaknesses', {})
-            
-            self.stunned = False
-            self.fleeing = False
-            self.taunted = False
-            self.taunt_target = None
-            
-        def take_damage(self, amount: int, damage_type: DamageType = DamageType.PHYSICAL) -> int:
-            """Calculate damage taken with resistances/weaknesses"""
-            
-            # Apply resistances
-            resist_mult = 1.0
-            if damage_type.value in self.resistances:
-                resist_mult *= self.resistances[damage_type.value]
-            
-            # Apply weaknesses
-            if damage_type.value in self.weaknesses:
-                resist_mult *= self.weaknesses[damage_type.value]
-            
-            final_damage = int(amount * resist_mult)
-            
-            # Apply defense
-            if damage_type == DamageType.PHYSICAL:
-                final_damage = max(1, final_damage - self.defense)
-            
-            self.health -= final_damage
-            return final_damage
-        
-        def heal(self, amount: int) -> int:
-            """Heal the enemy"""
-            old_health = self.health
-            self.health = min(self.max_health, self.health + amount)
-            return self.health - old_health
-        
-        def is_alive(self) -> bool:
-            return self.health > 0
-        
-        def get_next_ability(self) -> str:
-            """Get next ability based on attack pattern"""
-            ability = self.attack_patterns[self.pattern_index % len(self.attack_patterns)]
-            self.pattern_index += 1
-            return ability
-        
-        def apply_status(self, effect: str, duration: int):
-            """Apply status effect"""
-            self.status_effects.append({
-                'name': effect,
-                'duration': duration,
-                'stacks': 1
-            })
-        
-        def process_status_effects(self):
-            """Process status effects at turn start"""
-            for effect in self.status_effects[:]:
-                if effect['name'] in combat_system.status_effects:
-                    effect_data = combat_system.status_effects[effect['name']]
-                    if 'on_turn' in effect_data:
-                        effect_data['on_turn'](self)
-                    
-                    effect['duration'] -= 1
-                    if effect['duration'] <= 0:
-                        if 'on_end' in effect_data:
-                            effect_data['on_end'](self)
-                        self.status_effects.remove(effect)
-        
-        def skip_turn(self):
-            """Skip current turn (for stun)"""
-            self.stunned = True
-        
-        def get_status_string(self) -> str:
-            """Get formatted status effect string"""
-            if not self.status_effects:
-                return ""
-            
-            effects = []
-            for effect in self.status_effects:
-                name = combat_system.status_effects[effect['name']]['name']
-                effects.append(f"{name}({effect['duration']})")
-            
-            return f" [{', '.join(effects)}]"
-        
-        def __str__(self) -> str:
-            return f"{self.name} (HP: {self.health}/{self.max_health}){self.get_status_string()}"
+        # Static combat data, shared by every combat
+        self.enemy_types = ENEMY_TYPES
+        self.abilities = COMBAT_ABILITIES
+        self.status_effects = STATUS_EFFECTS
     
     def start_combat(self, enemy_type: str, level_mult: float = 1.0):
         """Start combat with an enemy"""
         
-        self.enemy = self.Enemy(enemy_type, level_mult, self.enemy_types)
+        self.enemy = enemy_class(enemy_type)(level_mult)
+        self.sync_player_stats()
         self.state = CombatState.PLAYER_TURN
         self.turn_count = 0
-        self.combat_log = []
+        self.combat_log = deque(maxlen=COMBAT_LOG_SIZE)
         
         # Initialize battle flags
         self.battle_flags = {
@@ -655,11 +972,39 @@ class CombatSystem:
         self.add_to_log(f"⚔️ Combat started with {self.enemy.name}!")
         self.add_to_log(self.enemy.description)
         
+    def sync_player_stats(self):
+        """
+        Cache the player stats that every turn reads
+        Call again whenever the player's strength, accuracy or abilities change
+        """
+        # Attacks deal strength - 2 to strength + 2, i.e. player_damage_base + roll(5)
+        self.player_damage_base = self.player.get('strength', 0) - 3
+        self.player_hit_chance = 85 * self.player.get('accuracy_mod', 1)  # Base 85% chance
+        self.player_abilities = {
+            name: self.get_player_ability(name) for name in self.player.get('abilities', NOTHING)
+        }
+    
+    def roll(self, sides: int) -> int:
+        """
+        Roll a die with the given number of sides (at most 65536)
+        Values come from a buffer filled by random.randbytes, so rolls still follow random.seed
+        """
+        position = self.roll_position
+        if position >= len(self.roll_values):
+            self.roll_values = memoryview(random.randbytes(ROLL_BUFFER_BYTES)).cast('H')
+            position = 0
+        self.roll_position = position + 1
+        
+        # Scale the 16-bit value down to 1..sides
+        return (self.roll_values[position] * sides >> 16) + 1
+    
+    def chance(self, probability: float) -> bool:
+        """Return True with the given probability, drawing from the same buffer as roll()"""
+        return self.roll(65536) <= probability * 65536
+    
     def add_to_log(self, message: str):
         """Add message to combat log"""
         self.combat_log.append(message)
-        if len(self.combat_log) > 10:
-            self.combat_log.pop(0)
     
     def process_player_turn(self, action: str, target: str = None, item: str = None) -> str:
         """Process player's turn in combat"""
@@ -668,6 +1013,7 @@ class CombatSystem:
             return "It's not your turn!"
         
         result = []
+        self.tick_player_buffs()
         
         # Process action
         if action == 'attack':
@@ -683,6 +1029,10 @@ class CombatSystem:
         else:
             return "Invalid combat action!"
         
+        # A successful escape ends combat before the enemy can act
+        if self.state == CombatState.FLEE:
+            return "\n".join(result)
+        
         # Check if enemy died
         if not self.enemy.is_alive():
             self.state = CombatState.VICTORY
@@ -709,29 +1059,43 @@ class CombatSystem:
         
         return "\n".join(result)
     
+    def apply_buff(self, buff: Dict):
+        """Give the player a buff and fold its multipliers into the combined ones"""
+        buff = dict(buff)  # Durations count down on the player's own copy
+        self.player_buffs.append(buff)
+        self.player_damage_mult *= buff.get('damage_mult', 1.0)
+        self.player_defense_mult *= buff.get('defense_mult', 1.0)
+    
+    def expire_buff(self, buff: Dict):
+        """Remove a player buff and recompute the combined multipliers"""
+        self.player_buffs.remove(buff)
+        self.player_damage_mult = 1.0
+        self.player_defense_mult = 1.0
+        for remaining in self.player_buffs:
+            self.player_damage_mult *= remaining.get('damage_mult', 1.0)
+            self.player_defense_mult *= remaining.get('defense_mult', 1.0)
+    
+    def tick_player_buffs(self):
+        """Count down buff durations at the start of the player's turn; buffs without one last the fight"""
+        for buff in list(self.player_buffs):
+            if 'duration' in buff:
+                buff['duration'] -= 1
+                if buff['duration'] <= 0:
+                    self.expire_buff(buff)
+    
     def player_attack(self) -> str:
         """Process player basic attack"""
         
-        # Calculate hit chance
-        base_hit = 85  # Base 85% chance
-        if 'accuracy_mod' in self.player:
-            base_hit *= self.player['accuracy_mod']
-        
-        if random.randint(1, 100) > base_hit:
+        # Check hit chance
+        if self.roll(100) > self.player_hit_chance:
             self.add_to_log("Your attack misses!")
             return "Your attack misses!"
         
         # Calculate damage
-        base_damage = random.randint(
-            self.player['strength'] - 2,
-            self.player['strength'] + 2
-        )
+        base_damage = self.player_damage_base + self.roll(5)
         
         # Apply damage modifiers
-        damage = base_damage
-        for buff in self.player_buffs:
-            if 'damage_mult' in buff:
-                damage *= buff['damage_mult']
+        damage = int(base_damage * self.player_damage_mult)
         
         # Apply to enemy
         actual_damage = self.enemy.take_damage(damage)
@@ -740,7 +1104,7 @@ class CombatSystem:
         self.add_to_log(result)
         
         # Check for critical hit
-        if random.randint(1, 20) == 20:  # 5% crit chance
+        if self.roll(20) == 20:  # 5% crit chance
             crit_damage = self.enemy.take_damage(damage // 2)
             result += f" Critical hit for additional {crit_damage} damage!"
         
@@ -750,7 +1114,7 @@ class CombatSystem:
         """Process player defend action"""
         
         # Add defense buff
-        self.player_buffs.append({
+        self.apply_buff({
             'name': 'defending',
             'defense_mult': 1.5,
             'duration': 2
@@ -764,20 +1128,21 @@ class CombatSystem:
         """Process player using a special ability"""
         
         # Check if player has ability
-        if ability_name not in self.player.get('abilities', []):
+        ability_data = self.player_abilities.get(ability_name)
+        if ability_data is None:
             return f"You don't have the ability '{ability_name}'!"
         
         # Check mana cost
-        ability_data = self.get_player_ability(ability_name)
-        if ability_data.get('mana_cost', 0) > self.player.get('mana', 0):
+        mana_cost = ability_data.mana_cost
+        if mana_cost > self.player.get('mana', 0):
             return "Not enough mana!"
         
         # Use ability
         result = self.use_ability(self.player, ability_name, self.enemy)
         
         # Deduct mana
-        if 'mana_cost' in ability_data:
-            self.player['mana'] -= ability_data['mana_cost']
+        if mana_cost:
+            self.player['mana'] -= mana_cost
         
         self.add_to_log(result)
         return result
@@ -786,7 +1151,7 @@ class CombatSystem:
         """Process player using an item"""
         
         # Check if player has item
-        if item_name not in self.player.get('inventory', []):
+        if item_name not in self.player.get('inventory', NOTHING):
             return f"You don't have {item_name}!"
         
         # Process item effects
@@ -807,7 +1172,7 @@ class CombatSystem:
                 result.append(f"Dealt {damage} damage to {self.enemy.name}!")
             
             elif effect['type'] == 'buff':
-                self.player_buffs.append(effect['buff'])
+                self.apply_buff(effect['buff'])
                 result.append(f"Gained {effect['buff']['name']}!")
         
         # Remove item from inventory
@@ -821,13 +1186,9 @@ class CombatSystem:
         """Attempt to flee from combat"""
         
         # Calculate flee chance
-        player_speed = self.player.get('speed', 10)
-        enemy_speed = self.enemy.speed
-        
-        flee_chance = 0.3 + (player_speed - enemy_speed) * 0.05
-        flee_chance = max(0.1, min(0.7, flee_chance))  # Cap between 10% and 70%
+        flee_chance = flee_probability(self.player.get('speed', 10), self.enemy.speed)
         
-        if random.random() < flee_chance:
+        if self.chance(flee_chance):
             self.state = CombatState.FLEE
             result = "You successfully flee from combat!"
             self.add_to_log(result)
@@ -852,11 +1213,10 @@ class CombatSystem:
         self.enemy.process_status_effects()
         
         # Get enemy action
-        ability_name = self.enemy.get_next_ability()
-        ability_data = self.abilities.get(ability_name, self.abilities['scratch'])
+        ability = self.enemy.get_next_ability()
         
         # Use ability
-        result = self.use_ability(self.enemy, ability_name, self.player)
+        result = self.perform_ability(self.enemy, ability, self.player)
         self.add_to_log(result)
         
         return result
@@ -864,101 +1224,93 @@ class CombatSystem:
     def use_ability(self, user, ability_name: str, target) -> str:
         """Use a combat ability"""
         
-        ability = self.abilities.get(ability_name, self.abilities['scratch'])
+        ability = self.abilities.get(ability_name, DEFAULT_ABILITY)
+        return self.perform_ability(user, ability, target)
+    
+    def perform_ability(self, user, ability: Ability, target) -> str:
+        """Use a combat ability"""
+        
+        # The player is a dict, enemies are Enemy objects
+        user_is_player = isinstance(user, dict)
+        user_name = "You" if user_is_player else user.name
         
         # Check accuracy
-        if random.randint(1, 100) > ability.get('accuracy', 85):
-            return f"{user.name if hasattr(user, 'name') else 'You'} tries to use {ability['name']} but misses!"
+        if self.roll(100) > ability.accuracy:
+            return f"{user_name} tries to use {ability.name} but misses!"
         
         # Calculate damage
-        damage_mult = ability.get('damage_mult', 1.0)
-        
-        if hasattr(user, 'damage'):  # Enemy
-            base_damage = user.damage
-            user_name = user.name
-        else:  # Player
-            base_damage = user['strength']
-            user_name = "You"
-        
-        damage = int(base_damage * damage_mult)
-        
-        # Apply damage type
-        damage_type = DamageType[ability.get('damage_type', 'PHYSICAL').upper()]
+        base_damage = user['strength'] if user_is_player else user.damage
+        damage = int(base_damage * ability.damage_mult)
         
         # Deal damage if applicable
         damage_dealt = 0
         if damage > 0:
-            damage_dealt = target.take_damage(damage, damage_type)
+            damage_dealt = target.take_damage(damage, ability.damage_type)
         
         # Build result message
         result_parts = []
         
         if damage_dealt > 0:
-            if hasattr(target, 'name'):
-                target_name = target.name
-            else:
-                target_name = "you"
-            
-            result_parts.append(f"{user_name} uses {ability['name']} on {target_name} for {damage_dealt} damage!")
+            target_name = "you" if isinstance(target, dict) else target.name
+            result_parts.append(f"{user_name} uses {ability.name} on {target_name} for {damage_dealt} damage!")
         else:
-            result_parts.append(f"{user_name} uses {ability['name']}!")
+            result_parts.append(f"{user_name} uses {ability.name}!")
         
         # Apply effects
-        if ability.get('effect'):
+        if ability.effect:
             effect_result = self.apply_effect(
-                ability['effect'],
+                ability.effect,
                 target,
-                ability.get('duration', 2),
-                ability.get('effect_power')
+                ability.duration,
+                ability.effect_power
             )
             if effect_result:
                 result_parts.append(effect_result)
         
         # Apply self effects
-        if ability.get('self_effect'):
+        if ability.self_effect:
             self_effect_result = self.apply_effect(
-                ability['self_effect'],
+                ability.self_effect,
                 user,
-                ability.get('duration', 2),
-                ability.get('effect_power')
+                ability.duration,
+                ability.effect_power
             )
             if self_effect_result:
                 result_parts.append(self_effect_result)
         
         # Apply lifesteal
-        if ability.get('lifesteal') and damage_dealt > 0:
-            if hasattr(user, 'heal'):  # Enemy
-                heal_amount = int(damage_dealt * ability['lifesteal'])
-                actual_heal = user.heal(heal_amount)
-                result_parts.append(f"{user_name} drains {actual_heal} health!")
-            else:  # Player
-                heal_amount = int(damage_dealt * ability['lifesteal'])
+        if ability.lifesteal and damage_dealt > 0:
+            heal_amount = int(damage_dealt * ability.lifesteal)
+            if user_is_player:
                 self.player['health'] = min(
                     self.player['max_health'],
                     self.player['health'] + heal_amount
                 )
                 result_parts.append(f"You drain {heal_amount} health!")
+            else:
+                actual_heal = user.heal(heal_amount)
+                result_parts.append(f"{user_name} drains {actual_heal} health!")
         
         return " ".join(result_parts)
     
     def apply_effect(self, effect_name: str, target, duration: int, power=None) -> Optional[str]:
         """Apply a status effect to target"""
         
-        if effect_name in self.status_effects:
-            if hasattr(target, 'apply_status'):
-                target.apply_status(effect_name, duration)
-            elif isinstance(target, dict):  # Player
-                # Apply player status effect
-                self.player_debuffs.append({
-                    'name': effect_name,
-                    'duration': duration,
-                    'power': power
-                })
-            
-            effect_data = self.status_effects[effect_name]
-            return f"{target.name if hasattr(target, 'name') else 'You'} is now {effect_data['name']}!"
+        message = STATUS_MESSAGES.get(effect_name)
+        if message is None:
+            return None
         
-        return None
+        if isinstance(target, dict):  # Player
+            # Apply player status effect
+            self.player_debuffs.append({
+                'name': effect_name,
+                'duration': duration,
+                'power': power
+            })
+            return message.format("You")
+        
+        target.apply_status(effect_name, duration)
+        return message.format(target.name)
     
     def process_victory(self) -> str:
         """Process victory in combat"""
@@ -999,14 +1351,9 @@ class CombatSystem:
     def get_loot(self) -> List[str]:
         """Generate loot from defeated enemy"""
         
-        loot = []
-        loot_table = self.enemy.data.get('loot_table', [])
-        
-        # Roll for each possible loot item
-        for item in loot_table:
-            if random.random() < 0.3:  # 30% chance per item
-                loot.append(item)
-                self.player['inventory'].append(item)
+        # Roll for each possible loot item, 30% chance each
+        loot = [item for item in self.enemy.data.get('loot_table', NOTHING) if self.chance(0.3)]
+        self.player['inventory'].extend(loot)
         
         return loot
     
@@ -1022,75 +1369,19 @@ class CombatSystem:
         self.player['health'] = self.player['max_health']
         self.player['strength'] += 2
         self.player['defense'] += 1
+        self.sync_player_stats()
         
         return f"\n{Colors.INFO}🌟 LEVEL UP! You are now level {self.player['level']}!{Colors.RESET}"
     
-    def get_player_ability(self, ability_name: str) -> Dict:
-        """Get player ability data"""
-        
-        # Define player abilities
-        player_abilities = {
-            'power_attack': {
-                'name': 'Power Attack',
-                'damage_mult': 1.5,
-                'mana_cost': 5,
-                'accuracy': 75,
-                'description': 'A powerful but slower attack'
-            },
-            'quick_strike': {
-                'name': 'Quick Strike',
-                'damage_mult': 0.8,
-                'mana_cost': 3,
-                'accuracy': 95,
-                'description': 'A fast attack that\'s hard to dodge'
-            },
-            'shield_bash': {
-                'name': 'Shield Bash',
-                'damage_mult': 1.0,
-                'mana_cost': 4,
-                'accuracy': 80,
-                'effect': 'stun',
-                'description': 'Bash with your shield to stun the enemy'
-            },
-            'healing_light': {
-                'name': 'Healing Light',
-                'damage_mult': 0,
-                'mana_cost': 10,
-                'heal': 25,
-                'description': 'Heal yourself with holy light'
-            },
-            'fireball': {
-                'name': 'Fireball',
-                'damage_mult': 1.8,
-                'mana_cost': 15,
-                'damage_type': 'fire',
-                'accuracy': 70,
-                'description': 'Hurl a ball of fire at your enemy'
-            }
-        }
+    def get_player_ability(self, ability_name: str) -> Ability:
+        """Get a player ability"""
         
-        return player_abilities.get(ability_name, {})
+        return PLAYER_ABILITIES.get(ability_name) or make_ability({'name': ability_name})
     
-    def get_item_effects(self, item_name: str) -> List[Dict]:
+    def get_item_effects(self, item_name: str) -> Tuple[Dict, ...]:
         """Get item effects"""
         
-        item_effects = {
-            'health_potion': [
-                {'type': 'heal', 'amount': 30}
-            ],
-            'mana_potion': [
-                {'type': 'mana', 'amount': 20}
-            ],
-            'bomb': [
-                {'type': 'damage', 'amount': 25, 'damage_type': 'fire'}
-            ],
-            'poison_dagger': [
-                {'type': 'damage', 'amount': 15},
-                {'type': 'effect', 'effect': 'poison', 'duration': 3}
-            ]
-        }
-        
-        return item_effects.get(item_name.lower(), [])
+        return ITEM_EFFECTS.get(item_name.lower(), NOTHING)
     
     def get_combat_status(self) -> str:
         """Get current combat status display"""
@@ -1098,13 +1389,12 @@ class CombatSystem:
         if not self.enemy:
             return "Not in combat"
         
-        status = f"\n{Colors.COMBAT}⚔️ COMBAT STATUS{Colors.RESET}\n"
-        status += TextFormatter.divider('-', 40) + "\n"
+        lines = [COMBAT_STATUS_HEADER]
         
         # Player status
         player_hp_pct = (self.player['health'] / self.player['max_health']) * 100
         player_bar = self.get_health_bar(player_hp_pct)
-        status += f"❤️ You:     {player_bar} {self.player['health']}/{self.player['max_health']}\n"
+        lines.append(f"❤️ You:     {player_bar} {self.player['health']}/{self.player['max_health']}")
         
         # Enemy status
         enemy_hp_pct = (self.enemy.health / self.enemy.max_health) * 100
@@ -1112,22 +1402,23 @@ class CombatSystem:
         enemy_name = self.enemy.name
         if self.enemy.status_effects:
             enemy_name += self.enemy.get_status_string()
-        status += f"💀 Enemy:   {enemy_bar} {self.enemy.health}/{self.enemy.max_health}\n"
+        lines.append(f"💀 Enemy:   {enemy_bar} {self.enemy.health}/{self.enemy.max_health}")
         
         # Turn info
-        status += f"\nTurn: {self.turn_count + 1} | "
         if self.state == CombatState.PLAYER_TURN:
-            status += f"{Colors.SUCCESS}Your turn!{Colors.RESET}"
+            turn = f"{Colors.SUCCESS}Your turn!{Colors.RESET}"
         elif self.state == CombatState.ENEMY_TURN:
-            status += f"{Colors.COMBAT}Enemy turn...{Colors.RESET}"
+            turn = f"{Colors.COMBAT}Enemy turn...{Colors.RESET}"
+        else:
+            turn = ""
+        lines.append(f"\nTurn: {self.turn_count + 1} | {turn}")
         
-        return status
+        return "\n".join(lines)
     
     def get_health_bar(self, percentage: float, length: int = 20) -> str:
         """Generate a health bar"""
         
         filled = int(percentage / 100 * length)
-        bar = "█" * filled + "░" * (length - filled)
         
         if percentage > 60:
             color = Colors.SUCCESS
@@ -1136,7 +1427,7 @@ class CombatSystem:
         else:
             color = Colors.ERROR
         
-        return f"{color}{bar}{Colors.RESET}"
+        return build_health_bar(filled, length, color)
     
     def get_combat_log(self) -> str:
         """Get recent combat log"""
@@ -1144,23 +1435,15 @@ class CombatSystem:
         if not self.combat_log:
             return ""
         
-        log = f"\n{Colors.INFO}📜 Combat Log:{Colors.RESET}\n"
-        for entry in self.combat_log[-5:]:  # Last 5 entries
-            log += f"  • {entry}\n"
+        lines = [f"\n{Colors.INFO}📜 Combat Log:{Colors.RESET}"]
+        lines.extend(f"  • {entry}" for entry in self.combat_log)
         
-        return log
+        return "\n".join(lines) + "\n"
     
     def get_available_actions(self) -> str:
         """Get available combat actions"""
         
-        actions = f"\n{Colors.INFO}⚡ Available Actions:{Colors.RESET}\n"
-        actions += "  attack  - Perform a basic attack\n"
-        actions += "  defend  - Take defensive stance\n"
-        actions += "  ability - Use special ability\n"
-        actions += "  use     - Use an item\n"
-        actions += "  flee    - Attempt to run away\n"
-        
-        return actions
+        return COMBAT_ACTIONS
     
     def process_turn(self, action: str) -> str:
         """Process a full turn (wrapper for main combat loop)"""
@@ -1176,7 +1459,7 @@ class CombatSystem:
     
     def in_combat(self) -> bool:
         """Check if currently in combat"""
-        return self.state not in [CombatState.VICTORY, CombatState.DEFEAT, CombatState.FLEE]
+        return self.enemy is not None and self.state not in COMBAT_OVER_STATES
     
     def get_enemy_status(self) -> str:
         """Get enemy status for prompt"""
@@ -1184,6 +1467,3 @@ class CombatSystem:
             return ""
         
         return f"{self.enemy.name} [{self.enemy.health}/{self.enemy.max_health} HP]"
-
-# Global instance for status effect callbacks
-combat_system = None
\ No newline at end of file
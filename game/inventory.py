@@ -3,11 +3,13 @@ Inventory system for AI Text Adventure Game
 Handles item management, equipment, crafting, and inventory operations
 """
 
-import random
 import json
-from typing import Dict, List, Optional, Tuple, Any
+from bisect import bisect_left
+from operator import mul
+from typing import Dict, List, Mapping, Optional, Tuple, Any
 from enum import Enum
 from collections import defaultdict
+from types import MappingProxyType
 
 from .utils import TextFormatter, Colors
 
@@ -49,6 +51,596 @@ class EquipmentSlot(Enum):
     FINGER = "finger"
     BACK = "back"
 
+# All possible items in the game
+ITEM_DATABASE = {
+    # Weapons
+    'dagger': {
+        'name': 'Dagger',
+        'type': ItemType.WEAPON,
+        'rarity': ItemRarity.COMMON,
+        'value': 10,
+        'weight': 1,
+        'damage': 4,
+        'damage_type': 'piercing',
+        'slot': EquipmentSlot.MAIN_HAND,
+        'requirements': {'strength': 5},
+        'description': 'A small, sharp blade. Good for stabbing.',
+        'tags': ['light', 'quick']
+    },
+    
+    'short_sword': {
+        'name': 'Short Sword',
+        'type': ItemType.WEAPON,
+        'rarity': ItemRarity.COMMON,
+        'value': 25,
+        'weight': 3,
+        'damage': 6,
+        'damage_type': 'slashing',
+        'slot': EquipmentSlot.MAIN_HAND,
+        'requirements': {'strength': 8},
+        'description': 'A standard short sword, well-balanced and reliable.',
+        'tags': ['versatile']
+    },
+    
+    'long_sword': {
+        'name': 'Long Sword',
+        'type': ItemType.WEAPON,
+        'rarity': ItemRarity.UNCOMMON,
+        'value': 50,
+        'weight': 5,
+        'damage': 8,
+        'damage_type': 'slashing',
+        'slot': EquipmentSlot.MAIN_HAND,
+        'requirements': {'strength': 12},
+        'description': 'A classic longsword. Deadly in skilled hands.',
+        'tags': ['heavy', 'two_handed']
+    },
+    
+    'battle_axe': {
+        'name': 'Battle Axe',
+        'type': ItemType.WEAPON,
+        'rarity': ItemRarity.UNCOMMON,
+        'value': 60,
+        'weight': 7,
+        'damage': 10,
+        'damage_type': 'slashing',
+        'slot': EquipmentSlot.TWO_HAND,
+        'requirements': {'strength': 14},
+        'description': 'A massive axe that can cleave through armor.',
+        'tags': ['heavy', 'two_handed', 'brutal']
+    },
+    
+    'bow': {
+        'name': 'Bow',
+        'type': ItemType.WEAPON,
+        'rarity': ItemRarity.COMMON,
+        'value': 35,
+        'weight': 3,
+        'damage': 6,
+        'damage_type': 'piercing',
+        'slot': EquipmentSlot.TWO_HAND,
+        'requirements': {'dexterity': 10},
+        'description': 'A simple wooden bow. Requires arrows.',
+        'tags': ['ranged', 'two_handed']
+    },
+    
+    'magic_staff': {
+        'name': 'Magic Staff',
+        'type': ItemType.WEAPON,
+        'rarity': ItemRarity.RARE,
+        'value': 120,
+        'weight': 4,
+        'damage': 6,
+        'damage_type': 'magic',
+        'slot': EquipmentSlot.TWO_HAND,
+        'requirements': {'intelligence': 14},
+        'description': 'A staff imbued with magical power.',
+        'tags': ['magic', 'focus'],
+        'spell_power': 10
+    },
+    
+    # Armor
+    'leather_armor': {
+        'name': 'Leather Armor',
+        'type': ItemType.ARMOR,
+        'rarity': ItemRarity.COMMON,
+        'value': 30,
+        'weight': 10,
+        'defense': 3,
+        'slot': EquipmentSlot.CHEST,
+        'requirements': {'strength': 5},
+        'description': 'Tough leather that offers basic protection.',
+        'tags': ['light']
+    },
+    
+    'chainmail': {
+        'name': 'Chainmail',
+        'type': ItemType.ARMOR,
+        'rarity': ItemRarity.UNCOMMON,
+        'value': 75,
+        'weight': 20,
+        'defense': 5,
+        'slot': EquipmentSlot.CHEST,
+        'requirements': {'strength': 10},
+        'description': 'Interlocking rings provide good protection.',
+        'tags': ['medium']
+    },
+    
+    'plate_armor': {
+        'name': 'Plate Armor',
+        'type': ItemType.ARMOR,
+        'rarity': ItemRarity.RARE,
+        'value': 200,
+        'weight': 35,
+        'defense': 8,
+        'slot': EquipmentSlot.CHEST,
+        'requirements': {'strength': 15},
+        'description': 'Solid steel plates offering maximum protection.',
+        'tags': ['heavy']
+    },
+    
+    'shield': {
+        'name': 'Shield',
+        'type': ItemType.ARMOR,
+        'rarity': ItemRarity.COMMON,
+        'value': 25,
+        'weight': 8,
+        'defense': 2,
+        'block_chance': 15,
+        'slot': EquipmentSlot.OFF_HAND,
+        'requirements': {'strength': 8},
+        'description': 'A wooden shield with metal reinforcement.',
+        'tags': ['defensive']
+    },
+    
+    'helmet': {
+        'name': 'Helmet',
+        'type': ItemType.ARMOR,
+        'rarity': ItemRarity.COMMON,
+        'value': 20,
+        'weight': 4,
+        'defense': 2,
+        'slot': EquipmentSlot.HEAD,
+        'requirements': {'strength': 5},
+        'description': 'Protects your head. Very important.',
+        'tags': ['light']
+    },
+    
+    'boots': {
+        'name': 'Leather Boots',
+        'type': ItemType.ARMOR,
+        'rarity': ItemRarity.COMMON,
+        'value': 15,
+        'weight': 3,
+        'defense': 1,
+        'slot': EquipmentSlot.FEET,
+        'description': 'Sturdy boots for long journeys.',
+        'tags': ['light']
+    },
+    
+    # Potions
+    'health_potion': {
+        'name': 'Health Potion',
+        'type': ItemType.POTION,
+        'rarity': ItemRarity.COMMON,
+        'value': 20,
+        'weight': 1,
+        'effects': [{'type': 'heal', 'value': 30}],
+        'description': 'A red potion that restores health.',
+        'tags': ['consumable', 'healing'],
+        'stackable': True
+    },
+    
+    'mana_potion': {
+        'name': 'Mana Potion',
+        'type': ItemType.POTION,
+        'rarity': ItemRarity.COMMON,
+        'value': 18,
+        'weight': 1,
+        'effects': [{'type': 'mana', 'value': 20}],
+        'description': 'A blue potion that restores mana.',
+        'tags': ['consumable', 'mana'],
+        'stackable': True
+    },
+    
+    'strength_potion': {
+        'name': 'Strength Potion',
+        'type': ItemType.POTION,
+        'rarity': ItemRarity.UNCOMMON,
+        'value': 35,
+        'weight': 1,
+        'effects': [{'type': 'buff', 'stat': 'strength', 'value': 3, 'duration': 5}],
+        'description': 'Grants temporary strength.',
+        'tags': ['consumable', 'buff'],
+        'stackable': True
+    },
+    
+    'invisibility_potion': {
+        'name': 'Invisibility Potion',
+        'type': ItemType.POTION,
+        'rarity': ItemRarity.RARE,
+        'value': 80,
+        'weight': 1,
+        'effects': [{'type': 'buff', 'effect': 'invisibility', 'duration': 3}],
+        'description': 'Makes you invisible for a short time.',
+        'tags': ['consumable', 'utility'],
+        'stackable': True
+    },
+    
+    # Food
+    'bread': {
+        'name': 'Bread',
+        'type': ItemType.FOOD,
+        'rarity': ItemRarity.COMMON,
+        'value': 3,
+        'weight': 1,
+        'effects': [{'type': 'heal', 'value': 5}],
+        'description': 'A fresh loaf of bread.',
+        'tags': ['consumable', 'food'],
+        'stackable': True
+    },
+    
+    'cheese': {
+        'name': 'Cheese',
+        'type': ItemType.FOOD,
+        'rarity': ItemRarity.COMMON,
+        'value': 4,
+        'weight': 1,
+        'effects': [{'type': 'heal', 'value': 8}],
+        'description': 'A wedge of aged cheese.',
+        'tags': ['consumable', 'food'],
+        'stackable': True
+    },
+    
+    'cooked_meat': {
+        'name': 'Cooked Meat',
+        'type': ItemType.FOOD,
+        'rarity': ItemRarity.COMMON,
+        'value': 6,
+        'weight': 2,
+        'effects': [{'type': 'heal', 'value': 12}],
+        'description': 'Savory cooked meat, still warm.',
+        'tags': ['consumable', 'food'],
+        'stackable': True
+    },
+    
+    # Scrolls
+    'scroll_fireball': {
+        'name': 'Scroll of Fireball',
+        'type': ItemType.SCROLL,
+        'rarity': ItemRarity.UNCOMMON,
+        'value': 45,
+        'weight': 1,
+        'spell': 'fireball',
+        'effects': [{'type': 'damage', 'value': 25, 'damage_type': 'fire', 'aoe': True}],
+        'description': 'A scroll inscribed with the Fireball spell.',
+        'tags': ['consumable', 'magic', 'aoe']
+    },
+    
+    'scroll_healing': {
+        'name': 'Scroll of Healing',
+        'type': ItemType.SCROLL,
+        'rarity': ItemRarity.UNCOMMON,
+        'value': 40,
+        'weight': 1,
+        'spell': 'heal',
+        'effects': [{'type': 'heal', 'value': 40}],
+        'description': 'A scroll inscribed with a powerful healing spell.',
+        'tags': ['consumable', 'magic', 'healing']
+    },
+    
+    'scroll_identify': {
+        'name': 'Scroll of Identify',
+        'type': ItemType.SCROLL,
+        'rarity': ItemRarity.COMMON,
+        'value': 25,
+        'weight': 1,
+        'spell': 'identify',
+        'description': 'Reveals the magical properties of an item.',
+        'tags': ['consumable', 'magic', 'utility']
+    },
+    
+    # Quest items
+    'goblin_ear': {
+        'name': 'Goblin Ear',
+        'type': ItemType.QUEST,
+        'rarity': ItemRarity.COMMON,
+        'value': 5,
+        'weight': 0.1,
+        'description': 'Proof of a goblin kill.',
+        'tags': ['quest', 'trophy'],
+        'stackable': True
+    },
+    
+    'ancient_key': {
+        'name': 'Ancient Key',
+        'type': ItemType.KEY,
+        'rarity': ItemRarity.RARE,
+        'value': 0,
+        'weight': 0.5,
+        'description': 'An old rusty key. It looks important.',
+        'tags': ['quest', 'key']
+    },
+    
+    'magic_crystal': {
+        'name': 'Magic Crystal',
+        'type': ItemType.QUEST,
+        'rarity': ItemRarity.EPIC,
+        'value': 200,
+        'weight': 2,
+        'description': 'A pulsing crystal radiating magical energy.',
+        'tags': ['quest', 'artifact']
+    },
+    
+    # Crafting materials
+    'iron_ore': {
+        'name': 'Iron Ore',
+        'type': ItemType.CRAFTING,
+        'rarity': ItemRarity.COMMON,
+        'value': 5,
+        'weight': 3,
+        'description': 'Raw iron ore. Needs smelting.',
+        'tags': ['crafting', 'ore'],
+        'stackable': True
+    },
+    
+    'leather': {
+        'name': 'Leather',
+        'type': ItemType.CRAFTING,
+        'rarity': ItemRarity.COMMON,
+        'value': 8,
+        'weight': 2,
+        'description': 'Treated animal hide.',
+        'tags': ['crafting', 'material'],
+        'stackable': True
+    },
+    
+    'herbs': {
+        'name': 'Herbs',
+        'type': ItemType.CRAFTING,
+        'rarity': ItemRarity.COMMON,
+        'value': 3,
+        'weight': 0.5,
+        'description': 'A bundle of medicinal herbs.',
+        'tags': ['crafting', 'alchemy'],
+        'stackable': True
+    },
+    
+    # Tools
+    'pickaxe': {
+        'name': 'Pickaxe',
+        'type': ItemType.TOOL,
+        'rarity': ItemRarity.COMMON,
+        'value': 15,
+        'weight': 5,
+        'description': 'Used for mining ore.',
+        'tags': ['tool', 'mining'],
+        'durability': 100
+    },
+    
+    'fishing_rod': {
+        'name': 'Fishing Rod',
+        'type': ItemType.TOOL,
+        'rarity': ItemRarity.COMMON,
+        'value': 12,
+        'weight': 3,
+        'description': 'Used for catching fish.',
+        'tags': ['tool', 'fishing'],
+        'durability': 50
+    },
+    
+    'lockpicks': {
+        'name': 'Lockpicks',
+        'type': ItemType.TOOL,
+        'rarity': ItemRarity.UNCOMMON,
+        'value': 25,
+        'weight': 0.2,
+        'description': 'Used for picking locks.',
+        'tags': ['tool', 'thieving'],
+        'durability': 30
+    },
+    
+    # Books
+    'bestiary': {
+        'name': 'Monster Bestiary',
+        'type': ItemType.BOOK,
+        'rarity': ItemRarity.UNCOMMON,
+        'value': 30,
+        'weight': 2,
+        'description': 'Contains information about various monsters.',
+        'tags': ['book', 'knowledge'],
+        'pages': 50
+    },
+    
+    'spellbook': {
+        'name': 'Spellbook',
+        'type': ItemType.BOOK,
+        'rarity': ItemRarity.RARE,
+        'value': 100,
+        'weight': 3,
+        'description': 'Contains magical formulas and spells.',
+        'tags': ['book', 'magic'],
+        'spells': ['magic_missile', 'shield', 'light']
+    },
+    
+    # Treasure
+    'gold_coins': {
+        'name': 'Gold Coins',
+        'type': ItemType.TREASURE,
+        'rarity': ItemRarity.COMMON,
+        'value': 1,
+        'weight': 0.01,
+        'description': 'Shiny gold coins.',
+        'tags': ['treasure', 'currency'],
+        'stackable': True
+    },
+    
+    'gemstone': {
+        'name': 'Gemstone',
+        'type': ItemType.TREASURE,
+        'rarity': ItemRarity.UNCOMMON,
+        'value': 50,
+        'weight': 0.1,
+        'description': 'A precious cut gemstone.',
+        'tags': ['treasure', 'valuable']
+    },
+    
+    'gold_bar': {
+        'name': 'Gold Bar',
+        'type': ItemType.TREASURE,
+        'rarity': ItemRarity.RARE,
+        'value': 100,
+        'weight': 5,
+        'description': 'A bar of pure gold.',
+        'tags': ['treasure', 'valuable']
+    }
+}
+
+def freeze_value(value: Any) -> Any:
+    """Recursively turn dicts into read-only mappings and lists into tuples"""
+    
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze_value(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze_value(v) for v in value)
+    return value
+
+def thaw_value(value: Any) -> Any:
+    """Make a private, mutable copy of a frozen value"""
+    
+    if isinstance(value, Mapping):
+        return {k: thaw_value(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [thaw_value(v) for v in value]
+    return value
+
+# Templates are shared by every item made from them, so freeze them all the way down
+ITEM_DATABASE = {key: freeze_value(item) for key, item in ITEM_DATABASE.items()}
+
+# Lowercased display name -> database key, for case-insensitive lookup
+ITEM_NAME_TO_KEY = {item['name'].lower(): key for key, item in ITEM_DATABASE.items()}
+
+# Template attributes only some items have
+OPTIONAL_ITEM_FIELDS = ('damage', 'defense', 'slot', 'requirements', 'effects',
+                        'spell', 'durability', 'pages', 'spells')
+
+def build_instance_fields(key: str, template: Mapping) -> Dict:
+    """Collect the fields every item created from a template starts with"""
+    
+    fields = {
+        'template': key,
+        'name': template['name'],
+        'name_lc': template['name'].lower(),
+        'type': template['type'],
+        'rarity': template['rarity'],
+        'value': template['value'],
+        'weight': template['weight'],
+        'description': template['description'],
+        'tags': template.get('tags', ()),
+        'equipped': False
+    }
+    fields.update((attr, template[attr]) for attr in OPTIONAL_ITEM_FIELDS if attr in template)
+    return fields
+
+# Lookup keys create_item derives from the template; not worth saving
+DERIVED_ITEM_FIELDS = frozenset({'template', 'name_lc'})
+
+# Database key -> starting fields for new item instances
+ITEM_INSTANCE_FIELDS = {key: build_instance_fields(key, item)
+                        for key, item in ITEM_DATABASE.items()}
+
+# Database key -> starting fields holding frozen lists/dicts, which each
+# new item gets its own mutable copy of
+ITEM_NESTED_FIELDS = {key: tuple(attr for attr, value in fields.items()
+                                 if isinstance(value, (tuple, MappingProxyType)))
+                      for key, fields in ITEM_INSTANCE_FIELDS.items()}
+
+# Crafting recipes, keyed by recipe ID
+CRAFTING_RECIPES = {
+    'iron_sword': {
+        'name': 'Iron Sword',
+        'result': 'short_sword',  # Using short_sword as base
+        'ingredients': {
+            'iron_ore': 3,
+            'coal': 2
+        },
+        'skill': 'smithing',
+        'skill_level': 1,
+        'time': 10
+    },
+    
+    'health_potion': {
+        'name': 'Health Potion',
+        'result': 'health_potion',
+        'ingredients': {
+            'herbs': 2,
+            'water_flask': 1
+        },
+        'skill': 'alchemy',
+        'skill_level': 1,
+        'time': 5
+    },
+    
+    'leather_armor': {
+        'name': 'Leather Armor',
+        'result': 'leather_armor',
+        'ingredients': {
+            'leather': 4,
+            'thread': 1
+        },
+        'skill': 'leatherworking',
+        'skill_level': 2,
+        'time': 15
+    },
+    
+    'strength_potion': {
+        'name': 'Strength Potion',
+        'result': 'strength_potion',
+        'ingredients': {
+            'herbs': 3,
+            'wolf_tooth': 1,
+            'water_flask': 1
+        },
+        'skill': 'alchemy',
+        'skill_level': 3,
+        'time': 8
+    },
+    
+    'chainmail': {
+        'name': 'Chainmail',
+        'result': 'chainmail',
+        'ingredients': {
+            'iron_ore': 6,
+            'coal': 4
+        },
+        'skill': 'smithing',
+        'skill_level': 3,
+        'time': 20
+    }
+}
+
+# What using a tool does, keyed by the tag that identifies its kind
+TOOL_MESSAGES = {
+    'mining': "You swing your pickaxe. (Use 'mine' command in mining areas)",
+    'fishing': "You cast your line. (Use 'fish' command near water)",
+    'thieving': "You ready your lockpicks. (Use 'pick' command on locked objects)"
+}
+
+def build_recipe_index(recipes: Dict[str, Dict]) -> Dict[str, List[str]]:
+    """Map each ingredient key to the recipes that use it"""
+    
+    index = defaultdict(list)
+    for recipe_id, recipe in recipes.items():
+        for ingredient in recipe['ingredients']:
+            index[ingredient].append(recipe_id)
+    return dict(index)
+
+RECIPES_BY_INGREDIENT = build_recipe_index(CRAFTING_RECIPES)
+
+# Recipe ID -> lowercased recipe name, for case-insensitive lookup
+RECIPE_NAMES = {recipe_id: recipe['name'].lower()
+                for recipe_id, recipe in CRAFTING_RECIPES.items()}
+
 class InventorySystem:
     """
     Main inventory management system
@@ -70,523 +662,43 @@ class InventorySystem:
         self.max_inventory_size = 20
         self.max_item_stack = 99
         
+        # Lowercased item name -> inventory positions, and item key -> total
+        # count held; both rebuilt on demand
+        self.name_index = defaultdict(list)
+        self.item_counts = defaultdict(int)
+        
+        # Per-slot unit weight and stack size, parallel to the inventory list
+        self.stack_weights = []
+        self.stack_counts = []
+        
+        # The inventory list and its length when last indexed; other systems
+        # that edit the list directly call invalidate_index() afterwards
+        self.indexed_inventory = None
+        self.indexed_size = 0
+        
+        # Last issued item ID; continues past IDs the player already holds
+        self.item_counter = 0
+        self.seed_item_counter()
+        
         # Initialize item database
         self.setup_item_database()
         self.setup_crafting_recipes()
         self.setup_item_effects()
         
     def setup_item_database(self):
-        """Define all possible items in the game"""
-        
-        self.item_database = {
-            # Weapons
-            'dagger': {
-                'name': 'Dagger',
-                'type': ItemType.WEAPON,
-                'rarity': ItemRarity.COMMON,
-                'value': 10,
-                'weight': 1,
-                'damage': 4,
-                'damage_type': 'piercing',
-                'slot': EquipmentSlot.MAIN_HAND,
-                'requirements': {'strength': 5},
-                'description': 'A small, sharp blade. Good for stabbing.',
-                'tags': ['light', 'quick']
-            },
-            
-            'short_sword': {
-                'name': 'Short Sword',
-                'type': ItemType.WEAPON,
-                'rarity': ItemRarity.COMMON,
-                'value': 25,
-                'weight': 3,
-                'damage': 6,
-                'damage_type': 'slashing',
-                'slot': EquipmentSlot.MAIN_HAND,
-                'requirements': {'strength': 8},
-                'description': 'A standard short sword, well-balanced and reliable.',
-                'tags': ['versatile']
-            },
-            
-            'long_sword': {
-                'name': 'Long Sword',
-                'type': ItemType.WEAPON,
-                'rarity': ItemRarity.UNCOMMON,
-                'value': 50,
-                'weight': 5,
-                'damage': 8,
-                'damage_type': 'slashing',
-                'slot': EquipmentSlot.MAIN_HAND,
-                'requirements': {'strength': 12},
-                'description': 'A classic longsword. Deadly in skilled hands.',
-                'tags': ['heavy', 'two_handed']
-            },
-            
-            'battle_axe': {
-                'name': 'Battle Axe',
-                'type': ItemType.WEAPON,
-                'rarity': ItemRarity.UNCOMMON,
-                'value': 60,
-                'weight': 7,
-                'damage': 10,
-                'damage_type': 'slashing',
-                'slot': EquipmentSlot.TWO_HAND,
-                'requirements': {'strength': 14},
-                'description': 'A massive axe that can cleave through armor.',
-                'tags': ['heavy', 'two_handed', 'brutal']
-            },
-            
-            'bow': {
-                'name': 'Bow',
-                'type': ItemType.WEAPON,
-                'rarity': ItemRarity.COMMON,
-                'value': 35,
-                'weight': 3,
-                'damage': 6,
-                'damage_type': 'piercing',
-                'slot': EquipmentSlot.TWO_HAND,
-                'requirements': {'dexterity': 10},
-                'description': 'A simple wooden bow. Requires arrows.',
-                'tags': ['ranged', 'two_handed']
-            },
-            
-            'magic_staff': {
-                'name': 'Magic Staff',
-                'type': ItemType.WEAPON,
-                'rarity': ItemRarity.RARE,
-                'value': 120,
-                'weight': 4,
-                'damage': 6,
-                'damage_type': 'magic',
-                'slot': EquipmentSlot.TWO_HAND,
-                'requirements': {'intelligence': 14},
-                'description': 'A staff imbued with magical power.',
-                'tags': ['magic', 'focus'],
-                'spell_power': 10
-            },
-            
-            # Armor
-            'leather_armor': {
-                'name': 'Leather Armor',
-                'type': ItemType.ARMOR,
-                'rarity': ItemRarity.COMMON,
-                'value': 30,
-                'weight': 10,
-                'defense': 3,
-                'slot': EquipmentSlot.CHEST,
-                'requirements': {'strength': 5},
-                'description': 'Tough leather that offers basic protection.',
-                'tags': ['light']
-            },
-            
-            'chainmail': {
-                'name': 'Chainmail',
-                'type': ItemType.ARMOR,
-                'rarity': ItemRarity.UNCOMMON,
-                'value': 75,
-                'weight': 20,
-                'defense': 5,
-                'slot': EquipmentSlot.CHEST,
-                'requirements': {'strength': 10},
-                'description': 'Interlocking rings provide good protection.',
-                'tags': ['medium']
-            },
-            
-            'plate_armor': {
-                'name': 'Plate Armor',
-                'type': ItemType.ARMOR,
-                'rarity': ItemRarity.RARE,
-                'value': 200,
-                'weight': 35,
-                'defense': 8,
-                'slot': EquipmentSlot.CHEST,
-                'requirements': {'strength': 15},
-                'description': 'Solid steel plates offering maximum protection.',
-                'tags': ['heavy']
-            },
-            
-            'shield': {
-                'name': 'Shield',
-                'type': ItemType.ARMOR,
-                'rarity': ItemRarity.COMMON,
-                'value': 25,
-                'weight': 8,
-                'defense': 2,
-                'block_chance': 15,
-                'slot': EquipmentSlot.OFF_HAND,
-                'requirements': {'strength': 8},
-                'description': 'A wooden shield with metal reinforcement.',
-                'tags': ['defensive']
-            },
-            
-            'helmet': {
-                'name': 'Helmet',
-                'type': ItemType.ARMOR,
-                'rarity': ItemRarity.COMMON,
-                'value': 20,
-                'weight': 4,
-                'defense': 2,
-                'slot': EquipmentSlot.HEAD,
-                'requirements': {'strength': 5},
-                'description': 'Protects your head. Very important.',
-                'tags': ['light']
-            },
-            
-            'boots': {
-                'name': 'Leather Boots',
-                'type': ItemType.ARMOR,
-                'rarity': ItemRarity.COMMON,
-                'value': 15,
-                'weight': 3,
-                'defense': 1,
-                'slot': EquipmentSlot.FEET,
-                'description': 'Sturdy boots for long journeys.',
-                'tags': ['light']
-            },
-            
-            # Potions
-            'health_potion': {
-                'name': 'Health Potion',
-                'type': ItemType.POTION,
-                'rarity': ItemRarity.COMMON,
-                'value': 20,
-                'weight': 1,
-                'effects': [{'type': 'heal', 'value': 30}],
-                'description': 'A red potion that restores health.',
-                'tags': ['consumable', 'healing'],
-                'stackable': True
-            },
-            
-            'mana_potion': {
-                'name': 'Mana Potion',
-                'type': ItemType.POTION,
-                'rarity': ItemRarity.COMMON,
-                'value': 18,
-                'weight': 1,
-                'effects': [{'type': 'mana', 'value': 20}],
-                'description': 'A blue potion that restores mana.',
-                'tags': ['consumable', 'mana'],
-                'stackable': True
-            },
-            
-            'strength_potion': {
-                'name': 'Strength Potion',
-                'type': ItemType.POTION,
-                'rarity': ItemRarity.UNCOMMON,
-                'value': 35,
-                'weight': 1,
-                'effects': [{'type': 'buff', 'stat': 'strength', 'value': 3, 'duration': 5}],
-                'description': 'Grants temporary strength.',
-                'tags': ['consumable', 'buff'],
-                'stackable': True
-            },
-            
-            'invisibility_potion': {
-                'name': 'Invisibility Potion',
-                'type': ItemType.POTION,
-                'rarity': ItemRarity.RARE,
-                'value': 80,
-                'weight': 1,
-                'effects': [{'type': 'buff', 'effect': 'invisibility', 'duration': 3}],
-                'description': 'Makes you invisible for a short time.',
-                'tags': ['consumable', 'utility'],
-                'stackable': True
-            },
-            
-            # Food
-            'bread': {
-                'name': 'Bread',
-                'type': ItemType.FOOD,
-                'rarity': ItemRarity.COMMON,
-                'value': 3,
-                'weight': 1,
-                'effects': [{'type': 'heal', 'value': 5}],
-                'description': 'A fresh loaf of bread.',
-                'tags': ['consumable', 'food'],
-                'stackable': True
-            },
-            
-            'cheese': {
-                'name': 'Cheese',
-                'type': ItemType.FOOD,
-                'rarity': ItemRarity.COMMON,
-                'value': 4,
-                'weight': 1,
-                'effects': [{'type': 'heal', 'value': 8}],
-                'description': 'A wedge of aged cheese.',
-                'tags': ['consumable', 'food'],
-                'stackable': True
-            },
-            
-            'cooked_meat': {
-                'name': 'Cooked Meat',
-                'type': ItemType.FOOD,
-                'rarity': ItemRarity.COMMON,
-                'value': 6,
-                'weight': 2,
-                'effects': [{'type': 'heal', 'value': 12}],
-                'description': 'Savory cooked meat, still warm.',
-                'tags': ['consumable', 'food'],
-                'stackable': True
-            },
-            
-            # Scrolls
-            'scroll_fireball': {
-                'name': 'Scroll of Fireball',
-                'type': ItemType.SCROLL,
-                'rarity': ItemRarity.UNCOMMON,
-                'value': 45,
-                'weight': 1,
-                'spell': 'fireball',
-                'effects': [{'type': 'damage', 'value': 25, 'damage_type': 'fire', 'aoe': True}],
-                'description': 'A scroll inscribed with the Fireball spell.',
-                'tags': ['consumable', 'magic', 'aoe']
-            },
-            
-            'scroll_healing': {
-                'name': 'Scroll of Healing',
-                'type': ItemType.SCROLL,
-                'rarity': ItemRarity.UNCOMMON,
-                'value': 40,
-                'weight': 1,
-                'spell': 'heal',
-                'effects': [{'type': 'heal', 'value': 40}],
-                'description': 'A scroll inscribed with a powerful healing spell.',
-                'tags': ['consumable', 'magic', 'healing']
-            },
-            
-            'scroll_identify': {
-                'name': 'Scroll of Identify',
-                'type': ItemType.SCROLL,
-                'rarity': ItemRarity.COMMON,
-                'value': 25,
-                'weight': 1,
-                'spell': 'identify',
-                'description': 'Reveals the magical properties of an item.',
-                'tags': ['consumable', 'magic', 'utility']
-            },
-            
-            # Quest items
-            'goblin_ear': {
-                'name': 'Goblin Ear',
-                'type': ItemType.QUEST,
-                'rarity': ItemRarity.COMMON,
-                'value': 5,
-                'weight': 0.1,
-                'description': 'Proof of a goblin kill.',
-                'tags': ['quest', 'trophy'],
-                'stackable': True
-            },
-            
-            'ancient_key': {
-                'name': 'Ancient Key',
-                'type': ItemType.KEY,
-                'rarity': ItemRarity.RARE,
-                'value': 0,
-                'weight': 0.5,
-                'description': 'An old rusty key. It looks important.',
-                'tags': ['quest', 'key']
-            },
-            
-            'magic_crystal': {
-                'name': 'Magic Crystal',
-                'type': ItemType.QUEST,
-                'rarity': ItemRarity.EPIC,
-                'value': 200,
-                'weight': 2,
-                'description': 'A pulsing crystal radiating magical energy.',
-                'tags': ['quest', 'artifact']
-            },
-            
-            # Crafting materials
-            'iron_ore': {
-                'name': 'Iron Ore',
-                'type': ItemType.CRAFTING,
-                'rarity': ItemRarity.COMMON,
-                'value': 5,
-                'weight': 3,
-                'description': 'Raw iron ore. Needs smelting.',
-                'tags': ['crafting', 'ore'],
-                'stackable': True
-            },
-            
-            'leather': {
-                'name': 'Leather',
-                'type': ItemType.CRAFTING,
-                'rarity': ItemRarity.COMMON,
-                'value': 8,
-                'weight': 2,
-                'description': 'Treated animal hide.',
-                'tags': ['crafting', 'material'],
-                'stackable': True
-            },
-            
-            'herbs': {
-                'name': 'Herbs',
-                'type': ItemType.CRAFTING,
-                'rarity': ItemRarity.COMMON,
-                'value': 3,
-                'weight': 0.5,
-                'description': 'A bundle of medicinal herbs.',
-                'tags': ['crafting', 'alchemy'],
-                'stackable': True
-            },
-            
-            # Tools
-            'pickaxe': {
-                'name': 'Pickaxe',
-                'type': ItemType.TOOL,
-                'rarity': ItemRarity.COMMON,
-                'value': 15,
-                'weight': 5,
-                'description': 'Used for mining ore.',
-                'tags': ['tool', 'mining'],
-                'durability': 100
-            },
-            
-            'fishing_rod': {
-                'name': 'Fishing Rod',
-                'type': ItemType.TOOL,
-                'rarity': ItemRarity.COMMON,
-                'value': 12,
-                'weight': 3,
-                'description': 'Used for catching fish.',
-                'tags': ['tool', 'fishing'],
-                'durability': 50
-            },
-            
-            'lockpicks': {
-                'name': 'Lockpicks',
-                'type': ItemType.TOOL,
-                'rarity': ItemRarity.UNCOMMON,
-                'value': 25,
-                'weight': 0.2,
-                'description': 'Used for picking locks.',
-                'tags': ['tool', 'thieving'],
-                'durability': 30
-            },
-            
-            # Books
-            'bestiary': {
-                'name': 'Monster Bestiary',
-                'type': ItemType.BOOK,
-                'rarity': ItemRarity.UNCOMMON,
-                'value': 30,
-                'weight': 2,
-                'description': 'Contains information about various monsters.',
-                'tags': ['book', 'knowledge'],
-                'pages': 50
-            },
-            
-            'spellbook': {
-                'name': 'Spellbook',
-                'type': ItemType.BOOK,
-                'rarity': ItemRarity.RARE,
-                'value': 100,
-                'weight': 3,
-                'description': 'Contains magical formulas and spells.',
-                'tags': ['book', 'magic'],
-                'spells': ['magic_missile', 'shield', 'light']
-            },
-            
-            # Treasure
-            'gold_coins': {
-                'name': 'Gold Coins',
-                'type': ItemType.TREASURE,
-                'rarity': ItemRarity.COMMON,
-                'value': 1,
-                'weight': 0.01,
-                'description': 'Shiny gold coins.',
-                'tags': ['treasure', 'currency'],
-                'stackable': True
-            },
-            
-            'gemstone': {
-                'name': 'Gemstone',
-                'type': ItemType.TREASURE,
-                'rarity': ItemRarity.UNCOMMON,
-                'value': 50,
-                'weight': 0.1,
-                'description': 'A precious cut gemstone.',
-                'tags': ['treasure', 'valuable']
-            },
-            
-            'gold_bar': {
-                'name': 'Gold Bar',
-                'type': ItemType.TREASURE,
-                'rarity': ItemRarity.RARE,
-                'value': 100,
-                'weight': 5,
-                'description': 'A bar of pure gold.',
-                'tags': ['treasure', 'valuable']
-            }
-        }
+        """Use the shared, read-only item database"""
+        
+        self.item_database = ITEM_DATABASE
+        self.name_to_key = ITEM_NAME_TO_KEY
+        self.instance_fields = ITEM_INSTANCE_FIELDS
+        self.nested_fields = ITEM_NESTED_FIELDS
     
     def setup_crafting_recipes(self):
-        """Define crafting recipes"""
-        
-        self.crafting_recipes = {
-            'iron_sword': {
-                'name': 'Iron Sword',
-                'result': 'short_sword',  # Using short_sword as base
-                'ingredients': {
-                    'iron_ore': 3,
-                    'coal': 2
-                },
-                'skill': 'smithing',
-                'skill_level': 1,
-                'time': 10
-            },
-            
-            'health_potion': {
-                'name': 'Health Potion',
-                'result': 'health_potion',
-                'ingredients': {
-                    'herbs': 2,
-                    'water_flask': 1
-                },
-                'skill': 'alchemy',
-                'skill_level': 1,
-                'time': 5
-            },
-            
-            'leather_armor': {
-                'name': 'Leather Armor',
-                'result': 'leather_armor',
-                'ingredients': {
-                    'leather': 4,
-                    'thread': 1
-                },
-                'skill': 'leatherworking',
-                'skill_level': 2,
-                'time': 15
-            },
-            
-            'strength_potion': {
-                'name': 'Strength Potion',
-                'result': 'strength_potion',
-                'ingredients': {
-                    'herbs': 3,
-                    'wolf_tooth': 1,
-                    'water_flask': 1
-                },
-                'skill': 'alchemy',
-                'skill_level': 3,
-                'time': 8
-            },
-            
-            'chainmail': {
-                'name': 'Chainmail',
-                'result': 'chainmail',
-                'ingredients': {
-                    'iron_ore': 6,
-                    'coal': 4
-                },
-                'skill': 'smithing',
-                'skill_level': 3,
-                'time': 20
-            }
-        }
+        """Use the shared crafting recipes"""
+        
+        self.crafting_recipes = CRAFTING_RECIPES
+        self.recipes_by_ingredient = RECIPES_BY_INGREDIENT
+        self.recipe_names = RECIPE_NAMES
     
     def setup_item_effects(self):
         """Define special item effects"""
@@ -601,6 +713,17 @@ class InventorySystem:
             'identify': self.effect_identify,
             'repair': self.effect_repair
         }
+        
+        # How use_item handles each item type
+        self.type_handlers = {
+            ItemType.POTION: self.use_consumable,
+            ItemType.FOOD: self.use_consumable,
+            ItemType.SCROLL: self.use_scroll,
+            ItemType.BOOK: self.use_book,
+            ItemType.TOOL: self.use_tool,
+            ItemType.WEAPON: self.equip_item,
+            ItemType.ARMOR: self.equip_item
+        }
     
     def add_item(self, item_name: str, count: int = 1) -> bool:
         """
@@ -611,16 +734,12 @@ class InventorySystem:
         # Check if item exists in database
         if item_name not in self.item_database:
             # Try to find by name (case-insensitive)
-            found = False
-            for key, item in self.item_database.items():
-                if item['name'].lower() == item_name.lower():
-                    item_name = key
-                    found = True
-                    break
+            key = self.name_to_key.get(item_name.lower())
             
-            if not found:
+            if key is None:
                 print(f"Item '{item_name}' not found in database")
                 return False
+            item_name = key
         
         item_template = self.item_database[item_name]
         
@@ -633,76 +752,141 @@ class InventorySystem:
     def add_stackable_item(self, item_name: str, count: int) -> bool:
         """Add stackable items to inventory"""
         
-        # Find existing stack
-        for item in self.player['inventory']:
-            if item.get('name') == item_name and item.get('count', 1) < self.max_item_stack:
-                # Add to existing stack
-                space = self.max_item_stack - item['count']
-                add_amount = min(count, space)
-                item['count'] += add_amount
+        # Top up existing stacks of this item first
+        inventory = self.player['inventory']
+        name_lc = self.item_database[item_name]['name'].lower()
+        for i in self.get_name_index().get(name_lc, ()):
+            item = inventory[i]
+            stack = item.get('count', 1)
+            if stack < self.max_item_stack:
+                add_amount = min(count, self.max_item_stack - stack)
+                item['count'] = stack + add_amount
+                self.stack_counts[i] = stack + add_amount
+                self.item_counts[item_name] += add_amount
                 count -= add_amount
                 
                 if count == 0:
                     return True
         
-        # Create new stacks if needed
-        while count > 0:
-            if len(self.player['inventory']) >= self.max_inventory_size:
-                return False
-            
+        # Create new stacks if needed, as many as there are free slots
+        new_stacks = []
+        free_slots = self.get_free_slots()
+        while count > 0 and len(new_stacks) < free_slots:
             stack_size = min(count, self.max_item_stack)
             new_item = self.create_item(item_name)
             new_item['count'] = stack_size
-            self.player['inventory'].append(new_item)
+            new_stacks.append(new_item)
             count -= stack_size
         
-        return True
+        self.extend_items(new_stacks)
+        return count == 0
     
     def add_single_item(self, item_name: str, count: int) -> bool:
         """Add non-stackable items to inventory"""
         
-        for _ in range(count):
-            if len(self.player['inventory']) >= self.max_inventory_size:
-                return False
-            
-            new_item = self.create_item(item_name)
-            self.player['inventory'].append(new_item)
+        added = min(count, self.get_free_slots())
+        self.extend_items([self.create_item(item_name) for _ in range(added)])
+        
+        return added == count
+    
+    def extend_items(self, items: List[Dict]):
+        """Append items to the inventory and record them in the name index"""
+        
+        index = self.get_name_index()
+        for i, item in enumerate(items, len(self.player['inventory'])):
+            index[item['name_lc']].append(i)
+            self.item_counts[item['template']] += item.get('count', 1)
+        
+        self.stack_weights.extend(item.get('weight', 0) for item in items)
+        self.stack_counts.extend(item.get('count', 1) for item in items)
+        self.player['inventory'].extend(items)
+        self.indexed_size += len(items)
+    
+    def rebuild_name_index(self):
+        """Map item names to inventory positions and tally item counts"""
+        
+        inventory = self.player['inventory']
+        self.name_index = defaultdict(list)
+        self.item_counts = defaultdict(int)
+        for i, item in enumerate(inventory):
+            # Items not made by create_item may lack the cached name
+            self.name_index[item.get('name_lc') or item['name'].lower()].append(i)
+            self.item_counts[self.get_count_key(item)] += item.get('count', 1)
+        
+        self.stack_weights = [item.get('weight', 0) for item in inventory]
+        self.stack_counts = [item.get('count', 1) for item in inventory]
+        
+        self.indexed_inventory = inventory
+        self.indexed_size = len(inventory)
+    
+    def invalidate_index(self):
+        """Mark the index stale after the inventory was edited outside this system"""
+        
+        self.indexed_inventory = None
+    
+    def is_index_current(self) -> bool:
+        """Cheap check that the inventory list is the one indexed, at the same length"""
+        
+        inventory = self.player['inventory']
+        return (inventory is self.indexed_inventory
+                and len(inventory) == self.indexed_size)
+    
+    def get_name_index(self) -> Dict[str, List[int]]:
+        """
+        Get the name index, rebuilding it if it was invalidated or the
+        inventory was replaced or resized elsewhere (loot, quest rewards, gifts)
+        """
         
-        return True
+        if not self.is_index_current():
+            self.rebuild_name_index()
+        return self.name_index
+    
+    def get_position(self, item: Dict) -> Optional[int]:
+        """Get an item's position in the inventory"""
+        
+        inventory = self.player['inventory']
+        for i in self.get_name_index().get(item.get('name_lc') or item['name'].lower(), ()):
+            if inventory[i] is item:
+                return i
+        return None
     
     def create_item(self, item_name: str) -> Dict:
         """Create a new item instance from template"""
         
-        template = self.item_database[item_name].copy()
-        
-        # Create item instance
-        item = {
-            'id': self.generate_item_id(),
-            'name': template['name'],
-            'type': template['type'],
-            'rarity': template['rarity'],
-            'value': template['value'],
-            'weight': template['weight'],
-            'description': template['description'],
-            'tags': template.get('tags', []),
-            'equipped': False
-        }
+        item = {'id': self.generate_item_id(), **self.instance_fields[item_name]}
+        for attr in self.nested_fields[item_name]:
+            item[attr] = thaw_value(item[attr])
+        return item
+    
+    def get_item_key(self, item: Dict) -> Optional[str]:
+        """Get the database key an item was created from"""
         
-        # Copy specific attributes
-        for attr in ['damage', 'defense', 'slot', 'requirements', 'effects', 
-                    'spell', 'durability', 'pages', 'spells']:
-            if attr in template:
-                item[attr] = template[attr]
+        return item.get('template') or self.name_to_key.get(item['name'].lower())
+    
+    def get_count_key(self, item: Dict) -> str:
+        """Get the key an item is tallied under in item_counts"""
         
-        return item
+        return self.get_item_key(item) or item.get('name_lc') or item['name'].lower()
+    
+    def get_template(self, item: Dict) -> Optional[Mapping]:
+        """Get the database template an item was created from"""
+        
+        return self.item_database.get(self.get_item_key(item))
     
     def generate_item_id(self) -> str:
         """Generate unique item ID"""
-        import hashlib
-        import time
         
-        unique = f"item_{time.time()}_{random.random()}"
-        return hashlib.md5(unique.encode()).hexdigest()[:8]
+        self.item_counter += 1
+        return format(self.item_counter, '08x')
+    
+    def seed_item_counter(self):
+        """Start item IDs after the highest hex ID already in the inventory"""
+        
+        for item in self.player['inventory']:
+            try:
+                self.item_counter = max(self.item_counter, int(item.get('id', ''), 16))
+            except (AttributeError, TypeError, ValueError):
+                continue
     
     def remove_item(self, item_name: str, count: int = 1) -> bool:
         """
@@ -710,54 +894,78 @@ class InventorySystem:
         Returns True if successful, False if not enough items
         """
         
+        item_name = item_name.lower()
+        if item_name in self.item_database:
+            item_name = self.item_database[item_name]['name'].lower()
+        
         items_removed = 0
+        inventory = self.player['inventory']
+        index = self.get_name_index()
+        positions = index.get(item_name, [])
+        popped = []
+        
+        # Walk matches from the back so earlier positions stay valid on pop
+        for i in reversed(positions):
+            item = inventory[i]
+            stack = item.get('count', 1)
+            remove_count = min(stack, count - items_removed)
+            self.item_counts[self.get_count_key(item)] -= remove_count
+            items_removed += remove_count
+            
+            if remove_count < stack:
+                # Draw down the stack
+                item['count'] -= remove_count
+                self.stack_counts[i] -= remove_count
+            else:
+                inventory.pop(i)
+                del self.stack_weights[i]
+                del self.stack_counts[i]
+                popped.append(i)
+            
+            if items_removed >= count:
+                break
         
-        for i in range(len(self.player['inventory']) - 1, -1, -1):
-            item = self.player['inventory'][i]
+        if popped:
+            # Emptied stacks are the tail of this name's positions
+            del positions[len(positions) - len(popped):]
+            if not positions:
+                del index[item_name]
             
-            if item['name'].lower() == item_name.lower():
-                if item.get('count', 1) > 1:
-                    # Stackable item
-                    remove_count = min(item['count'], count - items_removed)
-                    item['count'] -= remove_count
-                    items_removed += remove_count
-                    
-                    if item['count'] == 0:
-                        self.player['inventory'].pop(i)
-                else:
-                    # Single item
-                    self.player['inventory'].pop(i)
-                    items_removed += 1
-                
-                if items_removed >= count:
-                    return True
+            # Close the gaps left by the popped entries
+            popped.reverse()
+            for entries in index.values():
+                entries[:] = [p - bisect_left(popped, p) for p in entries]
+            self.indexed_size -= len(popped)
         
-        return items_removed == count
+        return items_removed >= count
     
     def get_item(self, item_name: str) -> Optional[Dict]:
         """Get item from inventory by name (partial match)"""
         
+        item_name = item_name.lower()
+        index = self.get_name_index()
+        
         # Try exact match first
-        for item in self.player['inventory']:
-            if item['name'].lower() == item_name.lower():
-                return item
+        positions = index.get(item_name)
         
-        # Then partial match
-        for item in self.player['inventory']:
-            if item_name.lower() in item['name'].lower():
-                return item
+        # Then partial match; names are indexed in order of first appearance
+        if not positions:
+            positions = next((p for name, p in index.items()
+                              if item_name in name), None)
         
-        return None
+        return self.player['inventory'][positions[0]] if positions else None
     
     def get_all_items(self, item_name: str) -> List[Dict]:
         """Get all items matching name"""
         
-        matches = []
-        for item in self.player['inventory']:
-            if item_name.lower() in item['name'].lower():
-                matches.append(item)
+        item_name = item_name.lower()
+        positions = []
+        for name, p in self.get_name_index().items():
+            if item_name in name:
+                positions.extend(p)
         
-        return matches
+        inventory = self.player['inventory']
+        return [inventory[i] for i in sorted(positions)]
     
     def use_item(self, item_name: str) -> str:
         """Use an item from inventory"""
@@ -768,23 +976,11 @@ class InventorySystem:
             return f"You don't have {item_name}."
         
         # Process based on item type
-        if item['type'] == ItemType.POTION or item['type'] == ItemType.FOOD:
-            return self.use_consumable(item)
-        
-        elif item['type'] == ItemType.SCROLL:
-            return self.use_scroll(item)
+        handler = self.type_handlers.get(item['type'])
+        if handler:
+            return handler(item)
         
-        elif item['type'] == ItemType.BOOK:
-            return self.use_book(item)
-        
-        elif item['type'] == ItemType.TOOL:
-            return self.use_tool(item)
-        
-        elif item['type'] == ItemType.WEAPON or item['type'] == ItemType.ARMOR:
-            return self.equip_item(item)
-        
-        else:
-            return f"You can't use the {item['name']} right now."
+        return f"You can't use the {item['name']} right now."
     
     def use_consumable(self, item: Dict) -> str:
         """Use a consumable item (potion/food)"""
@@ -801,7 +997,10 @@ class InventorySystem:
         
         # Remove used item
         if item.get('count', 1) > 1:
+            position = self.get_position(item)
             item['count'] -= 1
+            self.item_counts[self.get_count_key(item)] -= 1
+            self.stack_counts[position] -= 1
         else:
             self.player['inventory'].remove(item)
         
@@ -832,15 +1031,15 @@ class InventorySystem:
         
         if 'spells' in item:
             # Spellbook - learn spells
+            known = set(self.player.get('spells', ()))
             learned = []
             for spell in item['spells']:
-                if spell not in self.player.get('spells', []):
-                    if 'spells' not in self.player:
-                        self.player['spells'] = []
-                    self.player['spells'].append(spell)
+                if spell not in known:
+                    known.add(spell)
                     learned.append(spell)
             
             if learned:
+                self.player.setdefault('spells', []).extend(learned)
                 return f"You study the {item['name']} and learn: {', '.join(learned)}"
             else:
                 return f"You already know the spells in this book."
@@ -860,12 +1059,9 @@ class InventorySystem:
                 return f"The {item['name']} is broken and needs repair."
         
         # Tool-specific messages
-        if 'pickaxe' in item['name'].lower():
-            return "You swing your pickaxe. (Use 'mine' command in mining areas)"
-        elif 'fishing' in item['name'].lower():
-            return "You cast your line. (Use 'fish' command near water)"
-        elif 'lockpick' in item['name'].lower():
-            return "You ready your lockpicks. (Use 'pick' command on locked objects)"
+        for tag in item.get('tags', ()):
+            if tag in TOOL_MESSAGES:
+                return TOOL_MESSAGES[tag]
         
         return f"You examine your {item['name']}."
     
@@ -989,7 +1185,9 @@ class InventorySystem:
         
         # Condition multiplier (for durability)
         if 'durability' in item:
-            max_durability = item.get('max_durability', item['durability'])
+            template = self.get_template(item) or {}
+            max_durability = item.get('max_durability',
+                                      template.get('durability', item['durability']))
             condition = item['durability'] / max_durability
             mult *= condition
         
@@ -998,14 +1196,8 @@ class InventorySystem:
     def get_total_weight(self) -> float:
         """Calculate total inventory weight"""
         
-        total = 0
-        for item in self.player['inventory']:
-            weight = item.get('weight', 0)
-            if item.get('count', 1) > 1:
-                weight *= item['count']
-            total += weight
-        
-        return total
+        self.get_name_index()  # Rebuilds the columns if the index was invalidated
+        return sum(map(mul, self.stack_weights, self.stack_counts))
     
     def is_inventory_full(self) -> bool:
         """Check if inventory is full"""
@@ -1135,27 +1327,37 @@ class InventorySystem:
     def has_item(self, item_name: str, count: int = 1) -> bool:
         """Check if player has at least count of item"""
         
-        total = 0
+        return self.get_item_count(item_name) >= count
+    
+    def get_item_count(self, item_name: str) -> int:
+        """Get how many of an item are held, by database key or display name"""
+        
+        item_name = item_name.lower()
+        self.get_name_index()  # Re-tallies if the index was invalidated
+        return self.item_counts.get(self.name_to_key.get(item_name, item_name), 0)
+    
+    def get_craftable_recipes(self) -> List[str]:
+        """Get IDs of recipes the inventory holds all ingredients for"""
+        
+        # Only recipes using something we carry can possibly be crafted
+        candidates = set()
         for item in self.player['inventory']:
-            if item['name'].lower() == item_name.lower():
-                if item.get('count', 1) > 1:
-                    total += item['count']
-                else:
-                    total += 1
-                
-                if total >= count:
-                    return True
+            candidates.update(self.recipes_by_ingredient.get(self.get_item_key(item), ()))
         
-        return False
+        return [recipe_id for recipe_id in self.crafting_recipes
+                if recipe_id in candidates
+                and all(self.has_item(ingredient, amount) for ingredient, amount
+                        in self.crafting_recipes[recipe_id]['ingredients'].items())]
     
     def craft_item(self, recipe_name: str) -> str:
         """Craft an item from a recipe"""
         
         # Find recipe
         recipe = None
-        for rid, r in self.crafting_recipes.items():
-            if recipe_name.lower() in r['name'].lower():
-                recipe = r
+        needle = recipe_name.lower()
+        for rid, name in self.recipe_names.items():
+            if needle in name:
+                recipe = self.crafting_recipes[rid]
                 break
         
         if not recipe:
@@ -1190,16 +1392,18 @@ class InventorySystem:
             self.player['inventory'].sort(key=lambda x: x['type'].value)
         elif method == 'weight':
             self.player['inventory'].sort(key=lambda x: x.get('weight', 0))
+        
+        self.rebuild_name_index()
     
     def drop_all(self, item_name: str) -> List[Dict]:
         """Drop all of a specific item type"""
         
-        dropped = []
+        dropped = self.get_all_items(item_name)
         
-        for item in self.player['inventory'][:]:
-            if item_name.lower() in item['name'].lower():
-                self.player['inventory'].remove(item)
-                dropped.append(item)
+        if dropped:
+            dropped_ids = {id(item) for item in dropped}
+            self.player['inventory'][:] = [item for item in self.player['inventory']
+                                           if id(item) not in dropped_ids]
         
         return dropped
     
@@ -1207,12 +1411,20 @@ class InventorySystem:
         """Get inventory state for saving"""
         
         return {
-            'inventory': self.player['inventory'],
-            'equipment': self.player.get('equipment', {}),
+            'inventory': [self.get_saved_item(item) for item in self.player['inventory']],
+            'equipment': {slot: self.get_saved_item(item)
+                          for slot, item in self.player.get('equipment', {}).items()},
             'gold': self.player.get('gold', 0),
             'max_inventory_size': self.max_inventory_size
         }
     
+    def get_saved_item(self, item: Any) -> Any:
+        """Copy an item for saving, without the derived lookup keys"""
+        
+        if not isinstance(item, dict):
+            return item
+        return {k: v for k, v in item.items() if k not in DERIVED_ITEM_FIELDS}
+    
     def load_state(self, state: Dict):
         """Load inventory state from save"""
         
@@ -1220,6 +1432,8 @@ class InventorySystem:
         self.player['equipment'] = state.get('equipment', {})
         self.player['gold'] = state.get('gold', 0)
         self.max_inventory_size = state.get('max_inventory_size', 20)
+        self.seed_item_counter()
+        self.invalidate_index()
 
 # Global item database instance
 item_database = None
\ No newline at end of file
@@ -557,7 +557,7 @@ class Game:
         result = self.inventory.use_item(item_name)
         
         # Check if combat relevant
-        if self.combat.in_combat:
+        if self.combat.in_combat():
             self.combat.process_item_use(result)
         
         return result
@@ -899,7 +899,7 @@ Level {self.player['level']} {self.player['class']}
                     continue
                 
                 # Get player input
-                if self.combat.in_combat:
+                if self.combat.in_combat():
                     prompt = f"\n{Colors.COMBAT}⚔️ COMBAT [{self.combat.get_enemy_status()}] >{Colors.RESET} "
                 else:
                     location = self.world.get_current_location()
@@ -923,8 +923,12 @@ Level {self.player['level']} {self.player['class']}
                 if not command:
                     continue
                 
+                # Combat loot, quest rewards and NPC gifts edit the inventory
+                # list directly, so re-index it before this command uses it
+                self.inventory.invalidate_index()
+                
                 # Process command
-                if self.combat.in_combat:
+                if self.combat.in_combat():
                     # Combat commands go through combat system first
                     if command.lower() in ['attack', 'fight']:
                         result = self.combat.process_turn('attack')
@@ -932,8 +936,6 @@ Level {self.player['level']} {self.player['class']}
                         result = self.combat.process_turn('defend')
                     elif command.lower() == 'run':
                         result = self.combat.process_turn('flee')
-                        if 'fled' in result.lower():
-                            self.combat.in_combat = False
                     elif command.lower().startswith('use '):
                         item = command[4:].strip()
                         result = self.use_item(item)
@@ -943,7 +945,7 @@ Level {self.player['level']} {self.player['class']}
                     print(result)
                     
                     # Check if combat ended
-                    if not self.combat.in_combat:
+                    if not self.combat.in_combat():
                         print(self.world.get_location_description())
                 
                 else:
@@ -7,7 +7,7 @@ import random
 import math
 from typing import Dict, List, Optional, Tuple, Any
 from enum import Enum
-from datetime import datetime, time
+from datetime import datetime
 from collections import defaultdict
 
 from .utils import TextFormatter, Colors, Dice
@@ -797,11 +797,7 @@ class NPCSystem:
     
     def generate_npc_id(self) -> str:
         """Generate unique NPC ID"""
-        import hashlib
-        import time
-        
-        unique = f"npc_{time.time()}_{random.random()}"
-        return hashlib.md5(unique.encode()).hexdigest()[:8]
+        return format(random.getrandbits(32), '08x')
     
     def generate_personality(self) -> Dict:
         """Generate personality traits for NPC"""
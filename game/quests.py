@@ -718,11 +718,7 @@ class QuestManager:
     
     def generate_quest_id(self) -> str:
         """Generate unique quest ID"""
-        import hashlib
-        import time
-        
-        unique = f"{time.time()}{random.random()}"
-        return hashlib.md5(unique.encode()).hexdigest()[:8]
+        return format(random.getrandbits(32), '08x')
     
     def generate_story_flags(self, components: Dict) -> Dict:
         """Generate story-related flags for quest"""
@@ -1,3 +1,4 @@
+import math
 import random
 import json
 import yaml
@@ -123,4 +124,35 @@ class GameLogger:
             filename = f"game_log_{self.session_id}.json"
         
         with open(filename, 'w') as f:
-            json.dump(self.events, f, indent=2)
\ No newline at end of file
+            json.dump(self.events, f, indent=2)
+
+class BloomFilter:
+    """
+    Fixed-size set for membership tests
+    May report false positives (at roughly error_rate), never false negatives
+    """
+    
+    def __init__(self, capacity: int = 10000, error_rate: float = 0.01):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+    
+    def positions(self, item: Any):
+        """Bit positions for an item (double hashing)"""
+        h1 = hash(item)
+        h2 = hash((item, self.num_bits)) | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+    
+    def add(self, item: Any):
+        for pos in self.positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+    
+    def __contains__(self, item: Any) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self.positions(item))
+    
+    def __len__(self) -> int:
+        return self.count
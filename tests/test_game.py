@@ -7,19 +7,22 @@ import unittest
 import sys
 import os
 import json
+import random
 import tempfile
 import shutil
 from pathlib import Path
 from unittest.mock import Mock, patch, MagicMock
 from datetime import datetime, timedelta
 
+import numpy as np
+
 # Add parent directory to path to import game modules
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from game.utils import TextFormatter, Colors, Dice, GameLogger
+from game.utils import TextFormatter, Colors, Dice, GameLogger, BloomFilter
 from game.world import WorldGenerator, WorldManager
-from game.ai_engine import AIEngine
-from game.combat import CombatSystem, CombatState, DamageType
+from game.ai_engine import AIEngine, TemplateFields, compile_template, load_template_pools
+from game.combat import CombatSystem, CombatState, DamageType, Enemy, enemy_class, flee_probability, simulate_attacks, take_aoe_damage
 from game.quests import QuestManager, QuestType, QuestDifficulty, QuestStatus
 from game.npc import NPCSystem, NPCRole, NPCStatus, RelationshipLevel
 from game.inventory import InventorySystem, ItemType, ItemRarity, EquipmentSlot
@@ -77,6 +80,21 @@ class TestUtils(unittest.TestCase):
         finally:
             os.unlink(temp_file)
     
+    def test_bloom_filter(self):
+        """Test bloom filter membership"""
+        bloom = BloomFilter(capacity=100, error_rate=0.01)
+        for i in range(100):
+            bloom.add(f"fact {i}")
+        
+        # No false negatives
+        for i in range(100):
+            self.assertIn(f"fact {i}", bloom)
+        self.assertEqual(len(bloom), 100)
+        
+        # False positives stay rare
+        false_positives = sum(f"other {i}" in bloom for i in range(1000))
+        self.assertLess(false_positives, 50)
+    
     def test_text_formatter(self):
         """Test text formatting functions"""
         # Test header
@@ -233,6 +251,41 @@ class TestAIEngine(unittest.TestCase):
         # Test unknown command
         category, confidence = self.ai.analyze_command("asdfghjkl")
         self.assertEqual(category, 'unknown')
+        
+        # Keywords match whole words (and simple plurals) only
+        category, confidence = self.ai.analyze_command("this")
+        self.assertEqual(category, 'unknown')
+        category, confidence = self.ai.analyze_command("any quests")
+        self.assertEqual(category, 'quest_related')
+    
+    def test_classify_batch(self):
+        """Test batch classification matches one-at-a-time classification"""
+        commands = ["hello there", "goodbye", "who are you", "can you help me",
+                    "describe the area", "you're kind", "asdfghjkl", ""]
+        results = self.ai.classify_batch(commands)
+        
+        self.assertEqual(len(results), len(commands))
+        for command, result in zip(commands, results):
+            expected = self.ai.classify_command(self.ai.normalize_command(command))
+            self.assertEqual(result, expected)
+        self.assertEqual(results[2][0], 'about_self')
+        self.assertEqual(len(self.ai.memory['recent_topics']), 0)
+    
+    def test_intent_cache(self):
+        """Test repeated commands reuse cached classification"""
+        first = self.ai.analyze_command("Who are you")
+        self.assertIn("who are you", self.ai.intent_cache)
+        
+        second = self.ai.analyze_command("  who are YOU ")
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.ai.intent_cache), 1)
+        
+        # Cache is bounded
+        self.ai.max_cached_intents = 2
+        self.ai.analyze_command("hello")
+        self.ai.analyze_command("goodbye")
+        self.assertEqual(len(self.ai.intent_cache), 2)
+        self.assertNotIn("who are you", self.ai.intent_cache)
     
     def test_response_generation(self):
         """Test response generation"""
@@ -257,11 +310,69 @@ class TestAIEngine(unittest.TestCase):
         response = self.ai.interpret_command("help me", context)
         self.assertIsInstance(response, str)
     
+    def test_static_tables_shared(self):
+        """Test engines share the same read-only static tables"""
+        other = AIEngine(self.player, self.game_flags)
+        self.assertIs(other.knowledge_base, self.ai.knowledge_base)
+        self.assertIs(other.personalities, self.ai.personalities)
+        with self.assertRaises(TypeError):
+            self.ai.knowledge_base['locations']['tavern'] = {}
+        self.assertIsInstance(self.ai.patterns['greeting']['patterns'], tuple)
+    
+    def test_template_rotation(self):
+        """Test templates are not repeated until each one has been used"""
+        jokes = self.ai.response_templates['joke']
+        picked = [self.ai.pick_template('joke') for _ in jokes]
+        self.assertCountEqual(picked, jokes)
+        
+        friendly = self.ai.response_templates['help_request']['friendly']
+        picked = [self.ai.pick_template('help_request', 'friendly') for _ in friendly]
+        self.assertCountEqual(picked, friendly)
+    
+    def test_template_rendering(self):
+        """Test template filling tolerates missing placeholders"""
+        text = self.ai.render_template("Hello {player_name} from {location}", player_name='Bob')
+        self.assertEqual(text, "Hello Bob from {location}")
+    
+    def test_compiled_templates(self):
+        """Test compiled templates render like str.format"""
+        fields = {'player_name': 'Bob', 'location': 'Town', 'npc_name': 'Greta'}
+        for templates in load_template_pools().values():
+            for template in templates:
+                self.assertEqual(compile_template(template)(fields),
+                                 template.format_map(TemplateFields(fields)))
+        self.assertEqual(compile_template("{{braces}} {count}")({'count': 3}), "{braces} 3")
+    
+    def test_npc_relationship_memory(self):
+        """Test conversations are remembered per NPC"""
+        context = {'npc_name': 'Greta', 'npc_personality': 'friendly'}
+        self.ai.interpret_command("hello", context)
+        self.ai.interpret_command("you're kind", context)
+        self.ai.interpret_command("i hate you", context)
+        
+        rel = self.ai.get_relationship('Greta')
+        self.assertEqual(rel.times_talked, 1)
+        self.assertEqual(rel.favor, -1)
+        self.assertIs(self.ai.get_relationship('Greta'), rel)
+    
+    def test_recent_topics_bounded(self):
+        """Test conversation topics keep only the most recent entries"""
+        for _ in range(15):
+            self.ai.analyze_command("quest mission task")
+        self.assertEqual(len(self.ai.memory['recent_topics']), 10)
+        self.assertIn('quest_related', self.ai.get_conversation_summary())
+        
+        self.ai.reset_conversation()
+        self.assertEqual(len(self.ai.memory['recent_topics']), 0)
+    
     def test_keyword_extraction(self):
         """Test keyword extraction"""
         keywords = self.ai.extract_keywords("I need to find the ancient sword")
         self.assertIsInstance(keywords, list)
         self.assertIn('ancient', keywords)
+        
+        # Punctuation is not part of a keyword
+        self.assertEqual(self.ai.extract_keywords("Magic? Dragons!"), ['magic', 'dragons'])
     
     def test_emotion_detection(self):
         """Test emotion detection"""
@@ -273,6 +384,27 @@ class TestAIEngine(unittest.TestCase):
         
         emotion = self.ai.detect_emotion("No emotion words here")
         self.assertIsNone(emotion)
+        
+        # Keywords only match whole words
+        self.assertEqual(self.ai.detect_emotion("I feel so unhappy"), 'sad')
+        self.assertIsNone(self.ai.detect_emotion("I made it"))
+    
+    def test_formal_flourish(self):
+        """Test formal personalities spell out casual words"""
+        response = self.ai.add_emotional_flourish("I'm gonna help if you wanna pay.", 'wise')
+        self.assertTrue(response.startswith("I'm going to help if you want to pay."))
+        self.assertEqual(self.ai.add_emotional_flourish("gonna", 'neutral'), "gonna")
+    
+    def test_profession_service(self):
+        """Test profession services are looked up case-insensitively"""
+        self.assertEqual(self.ai.get_profession_service('Blacksmith'), 'weapons and armor')
+        self.assertEqual(self.ai.get_profession_service('juggler'), 'services')
+    
+    def test_time_response(self):
+        """Test time responses name the right part of the day"""
+        self.assertIn('early morning', self.ai.generate_time_response({'hour': 6, 'day': 2}))
+        self.assertIn('dead of night', self.ai.generate_time_response({'hour': 0}))
+        self.assertIn('day', self.ai.generate_time_response({'hour': 30}))
     
     def test_rumor_generation(self):
         """Test rumor generation"""
@@ -302,6 +434,167 @@ class TestCombat(unittest.TestCase):
         self.assertEqual(self.combat.state, CombatState.PLAYER_TURN)
         self.assertEqual(self.combat.enemy.name, 'Goblin')
         
+    def test_static_data_shared(self):
+        """Test combat data is shared between combat systems and read-only"""
+        other = CombatSystem(dict(self.player))
+        self.assertIs(other.enemy_types, self.combat.enemy_types)
+        self.assertIs(other.abilities, self.combat.abilities)
+        with self.assertRaises(TypeError):
+            self.combat.enemy_types['goblin'] = {}
+        
+        troll = self.combat.enemy_types['troll']
+        self.assertEqual(troll['resistances'][DamageType.FIRE], 0.5)
+        self.assertEqual(troll['weaknesses'], {DamageType.FIRE: 0.8})
+        
+        custom = Enemy('imp', enemy_data={'imp': {**self.combat.enemy_types['goblin'],
+                                                  'weaknesses': {'fire': 2.0}}})
+        self.assertEqual(custom.weaknesses, {DamageType.FIRE: 2.0})
+        
+    def test_enemy_attack_pattern(self):
+        """Test enemies cycle through their attack pattern"""
+        self.combat.start_combat('wolf')
+        names = [self.combat.enemy.get_next_ability().name for _ in range(4)]
+        
+        # 'basic' is not a known ability, so it falls back to Scratch
+        self.assertEqual(names, ['Scratch', 'Bite', 'Howl', 'Scratch'])
+        
+        # Patterns are resolved once per enemy type and shared between spawns
+        first = self.combat.enemy.pattern_abilities
+        self.combat.start_combat('wolf')
+        self.assertIs(self.combat.enemy.pattern_abilities, first)
+        
+        # Ability data is read through attributes, with defaults filled in
+        fire_breath = self.combat.abilities['fire_breath']
+        self.assertIs(fire_breath.damage_type, DamageType.FIRE)
+        self.assertEqual(self.combat.abilities['scratch'].duration, 2)
+        
+    def test_enemy_status_effects(self):
+        """Test status effects stack, tick and expire on enemies"""
+        self.combat.start_combat('troll')
+        enemy = self.combat.enemy
+        enemy.apply_status('bleed', 2)
+        enemy.apply_status('bleed', 1)
+        self.assertEqual(enemy.status_effects['bleed'].stacks, 2)
+        self.assertIn('Bleeding(2)', enemy.get_status_string())
+        
+        enemy.process_status_effects()
+        self.assertEqual(enemy.health, enemy.max_health - 10)
+        
+        enemy.process_status_effects()
+        self.assertEqual(enemy.status_effects, {})
+        
+        enemy.apply_status('stun', 1)
+        enemy.process_status_effects()
+        self.assertTrue(enemy.stunned)
+        
+    def test_damage_resistances(self):
+        """Test resistances, weaknesses and defense shape damage taken"""
+        self.combat.start_combat('dragon')
+        enemy = self.combat.enemy
+        self.assertEqual(enemy.take_damage(100, DamageType.FIRE), 20)
+        self.assertEqual(enemy.take_damage(100, DamageType.LIGHTNING), 130)
+        self.assertEqual(enemy.take_damage(100, DamageType.PHYSICAL), 100 * 0.6 - enemy.defense)
+        
+        # Spawns at the same level share their scaled stats
+        self.assertIs(Enemy('dragon').damage_profile, enemy.damage_profile)
+        stronger = Enemy('dragon', 1.5)
+        self.assertEqual(stronger.max_health, int(enemy.max_health * 1.5))
+        self.assertEqual(stronger.damage_profile[DamageType.PHYSICAL][1], stronger.defense)
+        
+    def test_dice_rolls(self):
+        """Test buffered combat rolls stay in range and follow the random seed"""
+        rolls = [self.combat.roll(20) for _ in range(5000)]
+        self.assertEqual(min(rolls), 1)
+        self.assertEqual(max(rolls), 20)
+        
+        random.seed(42)
+        first = [CombatSystem(self.player).roll(100) for _ in range(3)]
+        random.seed(42)
+        second = [CombatSystem(self.player).roll(100) for _ in range(3)]
+        self.assertEqual(first, second)
+        
+        hits = sum(self.combat.chance(0.3) for _ in range(5000))
+        self.assertTrue(1200 < hits < 1800)
+        self.assertFalse(any(self.combat.chance(0) for _ in range(100)))
+        
+    def test_player_stats_sync(self):
+        """Test cached player stats follow the player after a sync"""
+        self.player['abilities'] = ['power_attack']
+        self.player['mana'] = 10
+        self.combat.start_combat('goblin')
+        
+        self.combat.player_ability('power_attack')
+        self.assertEqual(self.player['mana'], 5)
+        
+        self.player['strength'] = 20
+        self.combat.sync_player_stats()
+        self.assertEqual(self.combat.player_damage_base, 17)
+        
+    def test_aoe_damage(self):
+        """Test area damage matches single-target damage for each enemy"""
+        enemies = [Enemy(name) for name in ('goblin', 'skeleton', 'troll', 'dragon')]
+        
+        for damage_type in (DamageType.PHYSICAL, DamageType.FIRE, DamageType.HOLY):
+            expected = [enemy.take_damage(40, damage_type) for enemy in enemies]
+            health = [enemy.health for enemy in enemies]
+            
+            self.assertEqual(take_aoe_damage(enemies, 40, damage_type), expected)
+            self.assertEqual([enemy.health for enemy in enemies],
+                             [hp - dealt for hp, dealt in zip(health, expected)])
+        
+        self.assertEqual(take_aoe_damage([], 40), [])
+        
+    def test_simulate_attacks(self):
+        """Test batch attack simulation against an enemy type"""
+        random.seed(7)
+        turns = simulate_attacks('goblin', 10, 85, 200)
+        
+        self.assertEqual(turns.shape, (200,))
+        self.assertTrue((turns >= 2).all())  # 25 health, at most 20 damage a turn
+        self.assertTrue((turns <= 20).all())
+        
+        # A hopeless matchup never finishes
+        turns = simulate_attacks('dragon', 0, 0, 10, max_turns=5)
+        self.assertTrue((turns == -1).all())
+        
+    def test_specialized_enemy_class(self):
+        """Test per-type enemy classes start out the same as generic enemies"""
+        random.seed(5)
+        generic = Enemy('troll_king', 1.5)
+        random.seed(5)
+        special = enemy_class('troll_king')(1.5)
+        
+        self.assertIsInstance(special, Enemy)
+        self.assertIs(enemy_class('troll_king'), type(special))
+        for attribute in Enemy.__slots__:
+            if attribute != 'pattern_cycle':
+                self.assertEqual(getattr(special, attribute), getattr(generic, attribute), attribute)
+        self.assertEqual(next(special.pattern_cycle), next(generic.pattern_cycle))
+        
+    def test_flee_probability(self):
+        """Test flee chance is capped, for single speeds and batches"""
+        self.assertAlmostEqual(flee_probability(10, 10), 0.3)
+        self.assertEqual(flee_probability(30, 10), 0.7)
+        self.assertEqual(flee_probability(10, 30), 0.1)
+        
+        chances = flee_probability(np.array([10, 30, 0]), 10)
+        self.assertEqual(chances.round(2).tolist(), [0.3, 0.7, 0.1])
+        
+    def test_combat_log_bounded(self):
+        """Test combat log keeps only the most recent entries"""
+        self.combat.start_combat('goblin')
+        
+        for i in range(15):
+            self.combat.add_to_log(f"entry {i}")
+        
+        self.assertEqual(len(self.combat.combat_log), 5)
+        self.assertEqual(self.combat.combat_log[0], "entry 10")
+        
+        log = self.combat.get_combat_log()
+        self.assertIn("entry 14", log)
+        self.assertIn("entry 10", log)
+        self.assertNotIn("entry 9", log)
+        
     def test_player_attack(self):
         """Test player attacking"""
         self.combat.start_combat('goblin')
@@ -321,6 +614,30 @@ class TestCombat(unittest.TestCase):
         self.assertIsInstance(result, str)
         self.assertTrue(len(self.combat.player_buffs) > 0)
         
+    def test_player_buffs(self):
+        """Test buffs keep combined multipliers and expire after their duration"""
+        self.combat.start_combat('goblin')
+        
+        self.combat.apply_buff({'name': 'rage', 'damage_mult': 1.5})
+        self.combat.player_defend()
+        self.assertEqual(self.combat.player_damage_mult, 1.5)
+        self.assertEqual(self.combat.player_defense_mult, 1.5)
+        
+        self.combat.tick_player_buffs()
+        self.combat.tick_player_buffs()
+        self.assertEqual([buff['name'] for buff in self.combat.player_buffs], ['rage'])
+        self.assertEqual(self.combat.player_defense_mult, 1.0)
+        self.assertEqual(self.combat.player_damage_mult, 1.5)
+        
+    def test_item_damage_type(self):
+        """Test item damage goes through the enemy's resistances"""
+        self.combat.start_combat('dragon')  # Dragons resist fire
+        self.player['inventory'] = ['bomb']
+        
+        health = self.combat.enemy.health
+        self.combat.player_use_item('bomb')
+        self.assertEqual(health - self.combat.enemy.health, 5)
+        
     def test_player_flee(self):
         """Test fleeing from combat"""
         self.combat.start_combat('goblin')
@@ -332,6 +649,22 @@ class TestCombat(unittest.TestCase):
         if 'successfully flee' in result.lower():
             self.assertEqual(self.combat.state, CombatState.FLEE)
         
+    def test_successful_flee_ends_combat(self):
+        """Test a successful flee ends combat without an enemy turn"""
+        self.assertFalse(self.combat.in_combat())
+        self.combat.start_combat('goblin')
+        self.assertTrue(self.combat.in_combat())
+        initial_player_health = self.player['health']
+        
+        with patch.object(CombatSystem, 'chance', return_value=True):
+            result = self.combat.process_turn('flee')
+        
+        self.assertIn('successfully flee', result)
+        self.assertEqual(self.combat.state, CombatState.FLEE)
+        self.assertFalse(self.combat.in_combat())
+        self.assertEqual(self.player['health'], initial_player_health)
+        self.assertEqual(self.combat.process_turn('attack'), "Not in combat!")
+        
     def test_enemy_turn(self):
         """Test enemy turn processing"""
         self.combat.start_combat('goblin')
@@ -692,6 +1025,80 @@ class TestInventory(unittest.TestCase):
         item = self.inventory.get_item('nonexistent')
         self.assertIsNone(item)
         
+    def test_add_item_by_display_name(self):
+        """Test display names resolve to database keys case-insensitively"""
+        self.assertTrue(self.inventory.add_item('LONG sword'))
+        self.assertEqual(self.player['inventory'][0]['name'], 'Long Sword')
+        self.assertFalse(self.inventory.add_item('Nonexistent Blade'))
+        
+        # Dicts added outside create_item are still matched
+        self.player['inventory'].append({'name': 'Old Map', 'type': 'misc'})
+        self.assertIsNotNone(self.inventory.get_item('old map'))
+        self.assertTrue(self.inventory.remove_item('OLD MAP'))
+        
+    def test_stackable_items_stack(self):
+        """Test stackable items top up existing stacks before adding new ones"""
+        self.inventory.add_item('bread', 3)
+        self.inventory.add_item('dagger')
+        self.inventory.add_item('bread', 2)
+        self.assertEqual(len(self.player['inventory']), 2)
+        self.assertEqual(self.player['inventory'][0]['count'], 5)
+        
+        self.inventory.add_item('bread', self.inventory.max_item_stack)
+        counts = [i['count'] for i in self.inventory.get_all_items('bread')]
+        self.assertEqual(counts, [self.inventory.max_item_stack, 5])
+        
+    def test_bulk_add_fills_free_slots(self):
+        """Test bulk adds stop at inventory capacity"""
+        self.inventory.add_item('dagger', 5)
+        self.assertFalse(self.inventory.add_item('long_sword', 30))
+        
+        self.assertEqual(len(self.player['inventory']), self.inventory.max_inventory_size)
+        self.assertEqual(len(self.inventory.get_all_items('long sword')), 15)
+        self.assertFalse(self.inventory.add_item('bread', 3))
+        
+    def test_name_index_tracks_inventory(self):
+        """Test lookups stay correct as the inventory changes"""
+        self.inventory.add_item('long_sword')
+        self.inventory.add_item('dagger')
+        self.inventory.add_item('long_sword')
+        
+        swords = self.inventory.get_all_items('long sword')
+        self.assertEqual(len(swords), 2)
+        self.assertIs(self.inventory.get_item('dag'), self.player['inventory'][1])
+        
+        self.assertTrue(self.inventory.remove_item('long sword', 2))
+        self.assertEqual([i['name'] for i in self.player['inventory']], ['Dagger'])
+        self.assertFalse(self.inventory.remove_item('long sword'))
+        
+        # Changes made outside the inventory system are picked up
+        self.player['inventory'].insert(0, {'name': 'Rope', 'type': 'misc'})
+        self.assertEqual(self.inventory.get_item('dagger')['name'], 'Dagger')
+        self.inventory.sort_inventory('name')
+        self.assertEqual(self.inventory.get_item('rope')['name'], 'Rope')
+        
+        # Same-length edits elsewhere are picked up once the index is invalidated
+        self.inventory.add_item('health_potion', 2)
+        dagger = self.inventory.get_item('dagger')
+        self.player['inventory'].remove(dagger)
+        self.player['inventory'].append(dagger)
+        self.inventory.invalidate_index()
+        self.assertIs(self.inventory.get_item('dagger'), dagger)
+        self.assertTrue(self.inventory.remove_item('dagger'))
+        self.assertEqual(self.inventory.get_item('health potion')['count'], 2)
+        
+    def test_item_ids_unique_across_load(self):
+        """Test item IDs keep counting past those in a loaded inventory"""
+        self.inventory.add_item('dagger', 3)
+        state = self.inventory.get_state()
+        
+        other = InventorySystem({'inventory': []})
+        other.load_state(state)
+        other.add_item('dagger')
+        
+        ids = [item['id'] for item in other.player['inventory']]
+        self.assertEqual(len(set(ids)), 4)
+        
     def test_use_consumable(self):
         """Test using consumable items"""
         self.inventory.add_item('health_potion')
@@ -704,6 +1111,29 @@ class TestInventory(unittest.TestCase):
         # Item should be gone
         self.assertIsNone(self.inventory.get_item('health_potion'))
         
+    def test_use_item_dispatch(self):
+        """Test items are handled according to their type"""
+        self.inventory.add_item('gemstone')
+        self.assertIn("can't use", self.inventory.use_item('gemstone'))
+        
+        self.inventory.add_item('pickaxe')
+        self.assertIn('pickaxe', self.inventory.use_item('pickaxe'))
+        
+        # Tools are told apart by their tags
+        self.inventory.add_item('lockpicks')
+        self.assertIn('lockpicks', self.inventory.use_item('lockpicks'))
+        self.assertIn('examine', self.inventory.use_tool({'name': 'Spoon', 'tags': ['tool']}))
+        
+    def test_use_book_learns_new_spells(self):
+        """Test spellbooks only teach spells the player doesn't know"""
+        self.player['spells'] = ['shield']
+        self.inventory.add_item('spellbook')
+        
+        result = self.inventory.use_item('spellbook')
+        self.assertIn('magic_missile', result)
+        self.assertEqual(self.player['spells'], ['shield', 'magic_missile', 'light'])
+        self.assertIn('already know', self.inventory.use_item('spellbook'))
+        
     def test_equip_item(self):
         """Test equipping items"""
         self.inventory.add_item('long_sword')
@@ -730,6 +1160,43 @@ class TestInventory(unittest.TestCase):
         value = self.inventory.get_item_value(item)
         self.assertGreater(value, 0)
         
+    def test_create_item_fields(self):
+        """Test new items get exactly the fields their template defines"""
+        sword = self.inventory.create_item('long_sword')
+        potion = self.inventory.create_item('health_potion')
+        
+        self.assertIn('damage', sword)
+        self.assertNotIn('damage', potion)
+        self.assertIn('effects', potion)
+        self.assertNotEqual(sword['id'], potion['id'])
+        
+        # Instances don't share mutable state
+        sword['equipped'] = True
+        self.assertFalse(self.inventory.create_item('long_sword')['equipped'])
+        
+    def test_item_templates_shared(self):
+        """Test items refer back to a frozen, shared template"""
+        self.inventory.add_item('pickaxe')
+        item = self.player['inventory'][0]
+        
+        template = self.inventory.get_template(item)
+        self.assertIs(template, self.inventory.item_database['pickaxe'])
+        with self.assertRaises(TypeError):
+            template['value'] = 0
+        
+        # Nested lists and dicts are frozen too, and items get their own copies
+        self.assertIsInstance(template['tags'], tuple)
+        item['tags'].append('cursed')
+        self.assertNotIn('cursed', template['tags'])
+        potion = self.inventory.item_database['health_potion']
+        with self.assertRaises(TypeError):
+            potion['effects'][0]['value'] = 0
+        
+        # Worn items are valued against the template's full durability
+        full_value = self.inventory.get_item_value(item)
+        item['durability'] = template['durability'] // 2
+        self.assertLess(self.inventory.get_item_value(item), full_value)
+        
     def test_inventory_weight(self):
         """Test inventory weight calculation"""
         self.inventory.add_item('long_sword')
@@ -738,6 +1205,21 @@ class TestInventory(unittest.TestCase):
         weight = self.inventory.get_total_weight()
         self.assertGreater(weight, 0)
         
+    def test_inventory_weight_tracks_changes(self):
+        """Test total weight follows stacking, removal and added slots"""
+        self.inventory.add_item('iron_ore', 4)
+        self.inventory.add_item('dagger')
+        ore = self.inventory.item_database['iron_ore']['weight']
+        dagger = self.inventory.item_database['dagger']['weight']
+        self.assertAlmostEqual(self.inventory.get_total_weight(), 4 * ore + dagger)
+        
+        self.inventory.add_item('iron_ore', 2)
+        self.inventory.remove_item('dagger')
+        self.assertAlmostEqual(self.inventory.get_total_weight(), 6 * ore)
+        
+        self.player['inventory'].append({'name': 'Anvil', 'weight': 50})
+        self.assertAlmostEqual(self.inventory.get_total_weight(), 6 * ore + 50)
+        
     def test_inventory_display(self):
         """Test inventory display"""
         self.inventory.add_item('health_potion', 2)
@@ -763,6 +1245,85 @@ class TestInventory(unittest.TestCase):
         
         # Should have crafted item
         self.assertIsNotNone(self.inventory.get_item('health_potion'))
+    
+    def test_remove_item_keeps_index(self):
+        """Test removals by database key leave later lookups correct"""
+        self.inventory.add_item('dagger')
+        self.inventory.add_item('iron_ore', 3)
+        self.inventory.add_item('dagger')
+        self.inventory.add_item('pickaxe')
+        
+        self.assertTrue(self.inventory.remove_item('iron_ore', 3))
+        self.assertTrue(self.inventory.remove_item('dagger'))
+        self.assertEqual([i['name'] for i in self.player['inventory']], ['Dagger', 'Pickaxe'])
+        self.assertIs(self.inventory.get_item('pickaxe'), self.player['inventory'][1])
+        self.assertIsNone(self.inventory.get_item('iron'))
+        self.assertEqual(self.inventory.get_item_count('dagger'), 1)
+        
+    def test_drop_all(self):
+        """Test dropping every item whose name matches"""
+        self.inventory.add_item('long_sword')
+        self.inventory.add_item('dagger')
+        self.inventory.add_item('short_sword')
+        
+        dropped = self.inventory.drop_all('SWORD')
+        self.assertEqual([i['name'] for i in dropped], ['Long Sword', 'Short Sword'])
+        self.assertEqual([i['name'] for i in self.player['inventory']], ['Dagger'])
+        self.assertIsNone(self.inventory.get_item('sword'))
+        
+    def test_item_counts(self):
+        """Test item counts follow adds, removals and outside changes"""
+        self.inventory.add_item('iron_ore', 5)
+        self.inventory.add_item('dagger', 2)
+        
+        self.assertEqual(self.inventory.get_item_count('iron_ore'), 5)
+        self.assertEqual(self.inventory.get_item_count('Iron Ore'), 5)
+        self.assertTrue(self.inventory.has_item('dagger', 2))
+        self.assertFalse(self.inventory.has_item('dagger', 3))
+        
+        self.inventory.remove_item('iron ore', 2)
+        self.assertEqual(self.inventory.get_item_count('iron_ore'), 3)
+        
+        self.player['inventory'].append({'name': 'Rope', 'count': 4})
+        self.assertEqual(self.inventory.get_item_count('rope'), 4)
+        
+        # Stack sizes changed in place elsewhere are re-tallied once invalidated
+        self.player['inventory'][0]['count'] = 1
+        self.inventory.invalidate_index()
+        self.assertEqual(self.inventory.get_item_count('iron_ore'), 1)
+        self.assertFalse(self.inventory.has_item('iron_ore', 2))
+        
+    def test_item_database_shared(self):
+        """Test inventories share one item database and recipe book"""
+        other = InventorySystem({'inventory': []})
+        self.assertIs(other.item_database, self.inventory.item_database)
+        self.assertIs(other.crafting_recipes, self.inventory.crafting_recipes)
+        
+    def test_items_not_shared_between_inventories(self):
+        """Test separate inventories never share an item's lists or dicts"""
+        other = InventorySystem({'inventory': []})
+        self.inventory.add_item('health_potion')
+        other.add_item('health_potion')
+        mine, theirs = self.player['inventory'][0], other.player['inventory'][0]
+        
+        self.assertIsNot(mine['tags'], theirs['tags'])
+        self.assertIsNot(mine['effects'][0], theirs['effects'][0])
+        
+        # Derived lookup keys stay out of saves
+        saved = self.inventory.get_state()['inventory'][0]
+        self.assertNotIn('name_lc', saved)
+        self.assertNotIn('template', saved)
+        self.assertIn('name_lc', mine)
+        
+    def test_recipes_by_ingredient(self):
+        """Test recipes are indexed by the ingredients they use"""
+        self.assertEqual(self.inventory.recipes_by_ingredient['herbs'],
+                         ['health_potion', 'strength_potion'])
+        self.assertEqual(self.inventory.get_craftable_recipes(), [])
+        
+        # One ingredient alone is not enough
+        self.inventory.add_item('leather', 4)
+        self.assertEqual(self.inventory.get_craftable_recipes(), [])
 
 class TestSaveSystem(unittest.TestCase):
     """Test save/load system"""